@@ -0,0 +1,59 @@
+"""Start latency of notification sounds through the shared audio backend.
+
+    python benchmarks/bench_audio.py [--count N] [--overlap POLICY] [--max-ms MS]
+
+Plays ``--count`` sounds in bursts of three, the way transition reminders
+arrive, and reports the median and worst start latency as measured by
+AudioPlayer.  ``--max-ms`` (default 20) turns the median into a pass/fail
+check.  Needs a sound server; the chosen backend is printed first.
+"""
+import argparse
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--count", type=int, default=30)
+    p.add_argument("--overlap", choices=["queue", "restart", "drop"], default="restart")
+    p.add_argument("--sound", default="bell")
+    p.add_argument("--max-ms", type=float, default=20)
+    args = p.parse_args()
+
+    from mittschema.audio import AudioPlayer
+    from gi.repository import GLib
+    player = AudioPlayer(overlap=args.overlap, preload=(args.sound,))
+    if player.backend is None:
+        return 1
+    if not player.backend.measures_start:
+        print(f"{player.backend.name}: this backend does not report when playback starts")
+        return 1
+    loop = GLib.MainLoop()
+    sent = [0]
+
+    def burst():
+        for _ in range(3):
+            if sent[0] < args.count:
+                player.play(args.sound)
+                sent[0] += 1
+        if sent[0] >= args.count:
+            GLib.timeout_add(1500, loop.quit)
+            return False
+        return True
+
+    GLib.timeout_add(300, burst)
+    loop.run()
+    samples = [s * 1000 for s in player.latencies]
+    if not samples:
+        print("no sound started")
+        return 1
+    median = statistics.median(samples)
+    print(f"{player.backend.name}: {len(samples)} sounds, median {median:.2f} ms, worst {max(samples):.2f} ms")
+    return 0 if median <= args.max_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
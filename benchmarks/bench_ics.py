@@ -0,0 +1,76 @@
+"""Timetable import: first sync, unchanged re-sync and a one-event change.
+
+    python benchmarks/bench_ics.py [--mb SIZE]
+
+Writes an ICS feed of about SIZE megabytes (default 10) of weekly lessons
+and syncs one week of it into an empty schedule store.  The re-syncs touch
+the file, so the content hash is what skips the parse, and then bump one
+event's SEQUENCE, which parses the feed but applies a single change.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mittschema import ics  # noqa: E402
+from mittschema.persistence import JournaledStore  # noqa: E402
+from mittschema.schedule import WEEKDAYS, empty_week  # noqa: E402
+
+
+def _feed(path, mb, monday):
+    n = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+        week = 0
+        while f.tell() < mb << 20:
+            for d in range(5):
+                day = monday + timedelta(days=7 * (week // 2 * (1 if week % 2 else -1)) + d)
+                for h in range(8, 15):
+                    n += 1
+                    f.write(f"BEGIN:VEVENT\r\nUID:lesson{n}@school\r\nDTSTAMP:20260101T000000Z\r\n"
+                            f"SEQUENCE:0\r\nDTSTART:{day:%Y%m%d}T{h:02d}0000\r\nDTEND:{day:%Y%m%d}T{h:02d}4500\r\n"
+                            f"SUMMARY:Lesson {h}\r\nLOCATION:Room {d}\r\nEND:VEVENT\r\n")
+            week += 1
+        f.write("END:VCALENDAR\r\n")
+    return n
+
+
+def _sync(store, feed, state, week):
+    t0 = time.perf_counter()
+    changes, state = ics.sync(feed, state, week)
+    n = ics.apply_changes(changes or [], store.data, store, ics.flat_slot(WEEKDAYS))
+    return (time.perf_counter() - t0) * 1000, n, state
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--mb", type=int, default=10)
+    args = p.parse_args()
+
+    root = tempfile.mkdtemp(prefix="mittschema-bench-")
+    feed = os.path.join(root, "school.ics")
+    week = ics.week_of(date.today())
+    events = _feed(feed, args.mb, week)
+    store = JournaledStore(os.path.join(root, "schedule.json"), empty_week)
+    print(f"{os.path.getsize(feed) / (1 << 20):.1f} MB, {events} events")
+
+    ms, n, state = _sync(store, feed, {}, week)
+    print(f"first sync:     {ms:8.1f} ms, {n} edits")
+    os.utime(feed)
+    ms, n, state = _sync(store, feed, state, week)
+    print(f"unchanged:      {ms:8.1f} ms, {n} edits")
+    with open(feed, "r+b") as f:
+        f.seek(f.read().index(b"SEQUENCE:0"))
+        f.write(b"SEQUENCE:1")
+    ms, n, state = _sync(store, feed, state, week)
+    print(f"one change:     {ms:8.1f} ms, {n} edits")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Time to get card textures for a week of picture activities.
+
+    python benchmarks/bench_images.py [--pictures N] [--size PX]
+
+Writes N large test pictures, then times three passes through the image
+cache: cold (decode and write thumbnails), warm disk (a fresh cache as on
+the next launch, reading thumbnails only) and warm memory (textures from
+the LRU).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import gi  # noqa: E402
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import GdkPixbuf  # noqa: E402
+
+from mittschema.images import ImageCache  # noqa: E402
+
+
+def _pictures(root, n):
+    paths = []
+    for i in range(n):
+        pixbuf = GdkPixbuf.Pixbuf.new(GdkPixbuf.Colorspace.RGB, False, 8, 2000, 1500)
+        pixbuf.fill((i * 0x01020304) & 0xffffff00 | 0xff)
+        path = os.path.join(root, f"picture{i}.png")
+        pixbuf.savev(path, "png", [], [])
+        paths.append(path)
+    return paths
+
+
+def _pass(cache, paths, size):
+    done = threading.Semaphore(0)
+    t0 = time.perf_counter()
+    for path in paths:
+        cache.request(path, size, lambda t: done.release())
+    for _ in paths:
+        done.acquire()
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--pictures", type=int, default=70)
+    p.add_argument("--size", type=int, default=96)
+    args = p.parse_args()
+
+    root = tempfile.mkdtemp(prefix="mittschema-bench-")
+    paths = _pictures(root, args.pictures)
+    thumbs = os.path.join(root, "thumbnails")
+    call_now = lambda fn, *a: fn(*a)  # noqa: E731
+
+    cache = ImageCache(thumbs, idle_add=call_now)
+    print(f"cold:        {_pass(cache, paths, args.size):8.1f} ms")
+    print(f"warm memory: {_pass(cache, paths, args.size):8.1f} ms")
+    cache = ImageCache(thumbs, idle_add=call_now)
+    print(f"warm disk:   {_pass(cache, paths, args.size):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
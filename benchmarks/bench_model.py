@@ -0,0 +1,83 @@
+"""Memory and insert cost of the typed model vs the plain dict schedule.
+
+    python benchmarks/bench_model.py
+
+For each size, activities with random times are inserted one at a time:
+the dict schedule appends and re-sorts the day by its time string (the old
+add path), the model bisects on parsed minutes.  Memory is what stays
+allocated (tracemalloc) once the week is built from freshly decoded JSON.
+"""
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mittschema.model import Activity, Week  # noqa: E402
+
+SIZES = [1000, 5000, 20000]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+NAMES = ["School", "Lunch", "Homework", "Play", "Dinner", "Bath", "Sleep", "Exercise", "Reading", "Free time"]
+
+
+def _activities(n, seed=0):
+    rng = random.Random(seed)
+    return [(rng.choice(DAYS), {"time": f"{rng.randrange(6, 22):02d}:{rng.randrange(0, 60, 5):02d}",
+                                "name": rng.choice(NAMES)}) for _ in range(n)]
+
+
+def _fresh(acts):
+    # Copy the strings the way json.loads would produce them, so interning counts.
+    return json.loads(json.dumps(acts))
+
+
+def _dict_week(acts):
+    week = {d: [] for d in DAYS}
+    for day, act in acts:
+        week[day].append(act)
+        week[day].sort(key=lambda a: a.get("time", ""))
+    return week
+
+
+def _model_week(acts):
+    week = Week()
+    for day, act in acts:
+        week.day(day).insert(Activity.from_json(act))
+    return week
+
+
+def _insert_us(build, acts):
+    samples = []
+    for _ in range(3):
+        t0 = time.perf_counter()
+        build(acts)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) / len(acts) * 1e6
+
+
+def _held_kib(build, acts):
+    tracemalloc.start()
+    acts = _fresh(acts)
+    week = build(acts)
+    del acts
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del week
+    return current / 1024
+
+
+def main():
+    print(f"{'activities':>10} {'dict µs/ins':>12} {'model µs/ins':>13} {'dict KiB':>10} {'model KiB':>10}")
+    for n in SIZES:
+        acts = _activities(n)
+        assert Week.from_json(_model_week(acts).to_json()).to_json() == _model_week(acts).to_json()
+        print(f"{n:>10} {_insert_us(_dict_week, acts):>12.2f} {_insert_us(_model_week, acts):>13.2f} "
+              f"{_held_kib(_dict_week, acts):>10.0f} {_held_kib(_model_week, acts):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Render time of the week-grid PDF export.
+
+    python benchmarks/bench_pdf.py [activities ...]
+
+Defaults to 100, 500 and 2000 activities spread over a week.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cairo  # noqa: E402
+
+from mittschema.pdf_layout import render_week_pdf  # noqa: E402
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+ROUNDS = 5
+
+
+def _items(n):
+    for i in range(n):
+        minutes = 7 * 60 + (i // len(DAYS)) * 5 % (14 * 60)
+        yield {"day": DAYS[i % len(DAYS)], "time": f"{minutes // 60:02d}:{minutes % 60:02d}",
+               "activity": f"\U0001f3eb Activity number {i} with a longer name"}
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [100, 500, 2000]
+    out = os.path.join(tempfile.mkdtemp(prefix="mittschema-bench-"), "week.pdf")
+    print(f"{'activities':>10} {'pages':>6} {'ms':>8}")
+    for n in sizes:
+        samples = []
+        for _ in range(ROUNDS):
+            t0 = time.perf_counter()
+            pages = render_week_pdf(cairo, _items(n), "Bench", out, "footer")
+            samples.append(time.perf_counter() - t0)
+        print(f"{n:>10} {pages:>6} {statistics.median(samples) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
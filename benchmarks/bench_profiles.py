@@ -0,0 +1,64 @@
+"""Load, switch and save latency of ProfileManager: JSON files vs SQLite.
+
+    python benchmarks/bench_profiles.py
+
+Each profile holds a full week (7 days × 3 periods × 4 activities).  Times
+are medians in milliseconds over ``ROUNDS`` operations.
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="mittschema-bench-")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from mittschema.profiles import ProfileManager  # noqa: E402
+
+SIZES = [10, 100, 1000]
+ROUNDS = 200
+
+
+def _week(seed):
+    return {str(d): {str(p): [{"name": f"Activity {seed}-{d}-{p}-{i}", "emoji": "⭐"} for i in range(4)]
+                     for p in range(3)} for d in range(7)}
+
+
+def _median_ms(fn):
+    samples = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def _bench(backend, n):
+    pm = ProfileManager(f"bench-{backend}-{n}", backend=backend)
+    for i in range(n):
+        pm.switch(f"child{i}")
+        pm.save_data(_week(i))
+    names = [f"child{i}" for i in range(n)]
+    rng = random.Random(n)
+    data = _week(0)
+    return {
+        "load": _median_ms(lambda: (pm.switch(rng.choice(names)), pm.load_data())),
+        "switch": _median_ms(lambda: pm.switch(rng.choice(names))),
+        "save": _median_ms(lambda: pm.save_data(data)),
+        "add": _median_ms(lambda: pm.add_activity("0", "0", {"name": "Play", "emoji": "\U0001f3ae"})),
+    }
+
+
+def main():
+    print(f"{'backend':>8} {'profiles':>8} {'load':>8} {'switch':>8} {'save':>8} {'add':>8}")
+    for n in SIZES:
+        for backend in ("json", "sqlite"):
+            r = _bench(backend, n)
+            print(f"{backend:>8} {n:>8} {r['load']:>8.3f} {r['switch']:>8.3f} {r['save']:>8.3f} {r['add']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Week expansion of repeating activities while paging through a year.
+
+    python benchmarks/bench_recurrence.py [rules ...]
+
+For each rule count, times expanding 52 weeks cold, paging through them
+again from the cache, and editing one rule, reporting how many cached weeks
+the edit dropped.
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mittschema.recurrence import RecurrenceSet, Rule, week_of  # noqa: E402
+
+RRULES = ["FREQ=WEEKLY", "FREQ=WEEKLY;INTERVAL=2", "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR", "FREQ=DAILY;COUNT=30",
+          "FREQ=MONTHLY;BYMONTHDAY=1,15", "FREQ=YEARLY", "FREQ=WEEKLY;BYDAY=SA;UNTIL=20270601"]
+
+
+def _rules(n, start):
+    rnd = random.Random(n)
+    for i in range(n):
+        first = start + timedelta(days=rnd.randrange(365))
+        breaks = [f"{first + timedelta(days=60)}/{first + timedelta(days=70)}"] if i % 3 == 0 else []
+        yield Rule(str(i), {"name": f"Activity {i}", "time": f"{8 + i % 12:02d}:{i % 4 * 15:02d}"},
+                   RRULES[i % len(RRULES)], first, breaks)
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10, 100, 1000]
+    start = week_of(date.today())
+    weeks = [start + timedelta(weeks=w) for w in range(52)]
+    print(f"{'rules':>6} {'cold ms/wk':>10} {'warm us/wk':>10} {'edit ms':>8} {'dropped':>8}")
+    for n in sizes:
+        rules = RecurrenceSet(_rules(n, start))
+        t0 = time.perf_counter()
+        for m in weeks:
+            rules.week(m)
+        cold = (time.perf_counter() - t0) * 1000 / len(weeks)
+        t0 = time.perf_counter()
+        for m in weeks:
+            rules.week(m)
+        warm = (time.perf_counter() - t0) * 1e6 / len(weeks)
+        before = rules.expanded
+        t0 = time.perf_counter()
+        rules.skip("1", rules.rules["1"].dtstart + timedelta(weeks=4))
+        edit = (time.perf_counter() - t0) * 1000
+        for m in weeks:
+            rules.week(m)
+        print(f"{n:>6} {cold:>10.2f} {warm:>10.1f} {edit:>8.2f} {rules.expanded - before:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Time to first frame of the main window.
+
+    python benchmarks/bench_startup.py [--runs N] [--max-ms MS] [--src]
+
+Each run starts a fresh interpreter, so imports are cold.  Without a
+display the runs are wrapped in ``xvfb-run``; set ``GDK_BACKEND=broadway``
+(with ``broadwayd`` running) to use broadway instead.  ``--max-ms`` turns
+the median into a pass/fail check for catching regressions.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _child(use_src):
+    # Runs inside the timed interpreter: start the app, stop at first paint.
+    sys.path.insert(0, str(ROOT / "src" if use_src else ROOT))
+    if use_src:
+        from mittschema.main import ScheduleApp as App
+    else:
+        from mittschema.main import App
+    from gi.repository import GLib  # after main, which pins the Gtk and Adw versions
+    app = App()
+
+    def on_window(app, win):
+        def on_map(win):
+            clock = win.get_frame_clock()
+            handler = None
+
+            def on_paint(clock):
+                clock.disconnect(handler)
+                print(f"FIRST_FRAME {time.time():.6f}", flush=True)
+                GLib.idle_add(app.quit)
+            handler = clock.connect("after-paint", on_paint)
+        win.connect("map", on_map)
+    app.connect("window-added", on_window)
+    app.run([])
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        return _child(len(sys.argv) > 2 and sys.argv[2] == "src")
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--runs", type=int, default=10)
+    p.add_argument("--max-ms", type=float)
+    p.add_argument("--src", action="store_true", help="measure the src/ ScheduleWindow variant")
+    args = p.parse_args()
+
+    cmd = [sys.executable, __file__, "--child", "src" if args.src else "main"]
+    if not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")
+            or os.environ.get("GDK_BACKEND") == "broadway"):
+        if not shutil.which("xvfb-run"):
+            sys.exit("no display: install xvfb-run or start broadwayd and set GDK_BACKEND=broadway")
+        cmd = ["xvfb-run", "-a"] + cmd
+    env = dict(os.environ, XDG_CONFIG_HOME=tempfile.mkdtemp(prefix="mittschema-bench-"))
+
+    samples = []
+    for _ in range(args.runs):
+        t0 = time.time()
+        out = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=60).stdout
+        stamp = [line.split()[1] for line in out.splitlines() if line.startswith("FIRST_FRAME")]
+        if not stamp:
+            sys.exit("app exited without painting a frame")
+        samples.append((float(stamp[0]) - t0) * 1000)
+    median = statistics.median(samples)
+    print(f"time to first frame: median {median:.0f} ms, min {min(samples):.0f} ms over {args.runs} runs")
+    if args.max_ms is not None and median > args.max_ms:
+        sys.exit(f"regression: {median:.0f} ms > {args.max_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Timer wakeups per hour: the old 1 Hz clock vs the timeline scheduler.
+
+    python benchmarks/bench_wakeups.py            # simulated week
+    python benchmarks/bench_wakeups.py --pid PID  # sample a running app
+
+The simulation drives Scheduler with a virtual clock over a full week of
+activities and counts its timer wakeups.  With ``--pid`` the voluntary
+context switches of a running window are sampled from /proc, the same
+counter powertop's "wakeups" column is derived from.
+"""
+import argparse
+import heapq
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mittschema.timeline import DAY, Scheduler, Timeline  # noqa: E402
+
+WEEK_S = 7 * DAY * 60
+
+
+def _week_timeline(per_day):
+    step = (22 - 7) * 60 // per_day
+    return Timeline((d, 7 * 60 + i * step, (d, i)) for d in range(7) for i in range(per_day))
+
+
+def simulate(per_day=8, clock=True):
+    """Return (wakeups, transitions, reminders) for one simulated week."""
+    now = [time.mktime((2024, 1, 1, 0, 0, 0, 0, 0, -1))]  # a Monday
+    timers = []
+    counts = {"change": 0, "reminder": 0}
+
+    def timeout_add(seconds, fn):
+        heapq.heappush(timers, (now[0] + seconds, id(fn), fn))
+        return len(timers)
+
+    sched = Scheduler(timeout_add, lambda source: None, on_tick=lambda lt: None,
+                      on_change=lambda p, c, t: t and counts.__setitem__("change", counts["change"] + 1),
+                      on_reminder=lambda n: counts.__setitem__("reminder", counts["reminder"] + 1),
+                      clock=clock, now=lambda: time.localtime(now[0]))
+    end = now[0] + WEEK_S
+    sched.set_timeline(_week_timeline(per_day))
+    while timers and timers[0][0] < end:
+        now[0], _, fn = heapq.heappop(timers)
+        fn()
+    return sched.wakeups, counts["change"], counts["reminder"]
+
+
+def sample_pid(pid, seconds):
+    def switches():
+        with open(f"/proc/{pid}/status") as f:
+            return sum(int(line.split()[1]) for line in f if line.startswith("voluntary_ctxt_switches"))
+    start = switches()
+    time.sleep(seconds)
+    return (switches() - start) / seconds * 3600
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--pid", type=int, help="sample a running process instead of simulating")
+    p.add_argument("--seconds", type=float, default=60)
+    args = p.parse_args()
+    if args.pid:
+        print(f"pid {args.pid}: {sample_pid(args.pid, args.seconds):.0f} wakeups/hour")
+        return
+    hours = WEEK_S / 3600
+    print(f"{'timer':>22} {'wakeups/hour':>13} {'transitions':>12} {'reminders':>10}")
+    print(f"{'1 Hz clock (old)':>22} {3600:>13.0f} {'-':>12} {'-':>10}")
+    for clock in (True, False):
+        wakeups, changes, reminders = simulate(clock=clock)
+        label = "scheduler, clock" if clock else "scheduler, no clock"
+        print(f"{label:>22} {wakeups / hours:>13.1f} {changes:>12} {reminders:>10}")
+
+
+if __name__ == "__main__":
+    main()
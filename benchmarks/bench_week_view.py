@@ -0,0 +1,81 @@
+"""Edit latency of the week view as the number of activities grows.
+
+Run under a display (or ``xvfb-run``)::
+
+    python benchmarks/bench_week_view.py
+
+Each size fills every day with N activities, then times single inserts and
+removes and counts the widgets in the window.  With the model-backed columns
+the per-edit cost stays flat, and since the list views recycle their cards the
+widget count stays bounded by what is on screen (1429 per day is about 10,000
+activities a week).
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["XDG_CONFIG_HOME"] = tempfile.mkdtemp(prefix="mittschema-bench-")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import gi  # noqa: E402
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Adw, GLib  # noqa: E402
+
+from mittschema.main import WEEKDAYS, App, MainWindow  # noqa: E402
+
+SIZES = [10, 100, 500, 1000, 1429]
+EDITS = 50
+
+
+def _drain():
+    ctx = GLib.MainContext.default()
+    while ctx.pending():
+        ctx.iteration(False)
+
+
+def _count(widget):
+    n, child = 1, widget.get_first_child()
+    while child is not None:
+        n += _count(child)
+        child = child.get_next_sibling()
+    return n
+
+
+def _bench(app, per_day):
+    win = MainWindow(app)
+    for day in WEEKDAYS:
+        for i in range(per_day):
+            win._insert_activity(day, {"time": f"{8 + i % 12:02d}:{i % 60:02d}", "name": f"Activity {i}"})
+    win.present()
+    _drain()
+    widgets = _count(win)
+    samples = []
+    for i in range(EDITS):
+        day = WEEKDAYS[i % len(WEEKDAYS)]
+        t0 = time.perf_counter()
+        pos = win._insert_activity(day, {"time": "12:00", "name": "Bench"})
+        _drain()
+        win._remove_activity(day, win.stores[day].get_item(pos))
+        _drain()
+        samples.append(time.perf_counter() - t0)
+    win.destroy()
+    _drain()
+    return statistics.median(samples) * 1000, widgets
+
+
+def main():
+    Adw.init()
+    app = App()
+    app.register(None)
+    print(f"{'per day':>8} {'total':>7} {'edit ms':>8} {'widgets':>8}")
+    for n in SIZES:
+        ms, widgets = _bench(app, n)
+        print(f"{n:>8} {n * len(WEEKDAYS):>7} {ms:>8.2f} {widgets:>8}")
+
+
+if __name__ == "__main__":
+    main()
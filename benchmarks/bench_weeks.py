@@ -0,0 +1,76 @@
+"""Startup cost of the week view as years of weeks pile up.
+
+    python benchmarks/bench_weeks.py [years ...]
+
+Writes one file per week for the given number of years, then times opening
+this week with its neighbours and measures the memory held, against
+parsing the same weeks from one combined file.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mittschema.recurrence import week_of  # noqa: E402
+from mittschema.schedule import WEEKDAYS  # noqa: E402
+from mittschema.weeks import WeekShards, week_key  # noqa: E402
+
+PER_DAY = 10
+
+
+def _week(n):
+    return {day: [{"time": f"{8 + i:02d}:00", "name": f"Activity {n}.{i}"} for i in range(PER_DAY)] for day in WEEKDAYS}
+
+
+def _measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    kept = fn()
+    ms = (time.perf_counter() - t0) * 1000
+    kb = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+    return ms, kb, kept
+
+
+def main():
+    years = [int(a) for a in sys.argv[1:]] or [1, 5, 20]
+    this = week_of(date.today())
+    print(f"{'years':>6} {'sharded ms':>10} {'KiB':>8} {'one file ms':>11} {'KiB':>8}")
+    for n in years:
+        root = tempfile.mkdtemp(prefix="mittschema-bench-")
+        weeks = [this - timedelta(weeks=w) for w in range(52 * n)]
+        combined = {}
+        os.makedirs(os.path.join(root, "weeks"))
+        for i, monday in enumerate(weeks):
+            combined[week_key(monday)] = _week(i)
+            with open(os.path.join(root, "weeks", week_key(monday) + ".json"), "w") as f:
+                json.dump(combined[week_key(monday)], f)
+        with open(os.path.join(root, "all.json"), "w") as f:
+            json.dump(combined, f)
+        del combined
+
+        def sharded():
+            shards = WeekShards(os.path.join(root, "weeks"), dict)
+            shards.get(this)
+            for monday in shards.neighbours(this):
+                shards.get(monday)
+            return shards
+
+        def one_file():
+            with open(os.path.join(root, "all.json"), "rb") as f:
+                return json.loads(f.read())
+
+        s_ms, s_kb, shards = _measure(sharded)
+        shards.close()
+        o_ms, o_kb, _ = _measure(one_file)
+        print(f"{n:>6} {s_ms:>10.2f} {s_kb:>8.0f} {o_ms:>11.2f} {o_kb:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Frame time while zooming continuously, as when Ctrl+plus is held.
+
+Run under a display (or ``xvfb-run``)::
+
+    python benchmarks/bench_zoom.py [--seconds S] [--max-ms MS]
+
+Zoom in and out is triggered at key-repeat rate (30 Hz) against a filled
+schedule window.  The work of each frame, from the frame clock's
+before-paint to after-paint, is reported.  ``--max-ms`` (default 16) fails
+the run if the 95th percentile goes over budget.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["XDG_CONFIG_HOME"] = tempfile.mkdtemp(prefix="mittschema-bench-")
+os.environ["HOME"] = os.environ["XDG_CONFIG_HOME"]
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import gi  # noqa: E402
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Adw, GLib  # noqa: E402
+
+from mittschema.accessibility import AccessibilityManager  # noqa: E402
+from mittschema.main import DEFAULT_ACTIVITIES, ScheduleApp, ScheduleWindow  # noqa: E402
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--seconds", type=float, default=5)
+    p.add_argument("--max-ms", type=float, default=16)
+    args = p.parse_args()
+
+    Adw.init()
+    app = ScheduleApp()
+    app.register(None)
+    win = ScheduleWindow(application=app)
+    win.schedule = {str(d): {str(q): [dict(a) for a in DEFAULT_ACTIVITIES[:4]] for q in range(3)} for d in range(7)}
+    for day, period in win._cells:
+        win._render_cell(day, period)
+    zoom = AccessibilityManager(win, app)
+    win.present()
+
+    loop = GLib.MainLoop()
+    samples = []
+    started = {}
+    step = [0]
+
+    def on_map(win):
+        clock = win.get_frame_clock()
+        clock.connect("before-paint", lambda c: started.__setitem__("t", time.perf_counter()))
+        clock.connect("after-paint", lambda c: "t" in started and samples.append(time.perf_counter() - started["t"]))
+
+    def press():
+        step[0] += 1
+        (zoom._zoom_in if (step[0] // 15) % 2 == 0 else zoom._zoom_out)()
+        return True
+
+    win.connect("map", on_map)
+    GLib.timeout_add(33, press)
+    GLib.timeout_add(int(args.seconds * 1000), loop.quit)
+    loop.run()
+    if not samples:
+        print("no frames painted")
+        return 1
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[int(len(ms) * 0.95) - 1] if len(ms) >= 20 else ms[-1]
+    print(f"{len(ms)} frames, {step[0]} zoom steps: median {statistics.median(ms):.2f} ms, "
+          f"p95 {p95:.2f} ms, worst {ms[-1]:.2f} ms")
+    return 0 if p95 <= args.max_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
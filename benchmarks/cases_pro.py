@@ -0,0 +1,131 @@
+"""Benchmark cases for the week view: schedule files, exporters and undo history.
+
+    python benchmarks/cases_pro.py [--quick] [--select NAME]
+
+Normally run by suite.py.  Files go to a temporary XDG_CONFIG_HOME.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = tempfile.mkdtemp(prefix="mittschema-bench-")
+atexit.register(shutil.rmtree, ROOT, ignore_errors=True)  # registered first, so it runs after the stores close
+os.environ["HOME"] = ROOT
+os.environ["XDG_CONFIG_HOME"] = os.path.join(ROOT, "config")
+os.environ["XDG_CACHE_HOME"] = os.path.join(ROOT, "cache")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import generators  # noqa: E402
+from harness import case, main  # noqa: E402
+from mittschema import schedule  # noqa: E402
+from mittschema.export import data_to_csv, data_to_json, export_data_pdf  # noqa: E402
+from mittschema.undo_redo import Insert, UndoRedoManager  # noqa: E402
+
+LAYOUTS = {"flat": generators.flat_schedule, "periods": generators.period_schedule}
+
+
+def _reopen():
+    if schedule._store is not None:
+        schedule._store.close()
+    schedule._store = None
+
+
+def _schedule_case(layout, op):
+    def setup(n):
+        _reopen()
+        data = LAYOUTS[layout](n)
+        schedule.save_schedule(data)
+        schedule.schedule_store().flush()
+        if op == "load":
+            def load():
+                _reopen()
+                schedule.load_schedule()
+            return load
+
+        def save():
+            schedule.save_schedule(data)
+            schedule.schedule_store().flush()
+        return save
+    return setup
+
+
+for _layout in LAYOUTS:
+    for _op in ("load", "save"):
+        case(f"schedule.{_op}.{_layout}", generators.ACTIVITIES)(_schedule_case(_layout, _op))
+
+
+@case("export.csv", generators.ACTIVITIES)
+def _csv(n):
+    items = generators.export_rows(n)
+    return lambda: data_to_csv(items)
+
+
+@case("export.json", generators.ACTIVITIES)
+def _json(n):
+    items = generators.export_rows(n)
+    return lambda: data_to_json(items)
+
+
+@case("export.pdf", generators.ACTIVITIES[:4])
+def _pdf(n):
+    items = generators.export_rows(n)
+    out = os.path.join(ROOT, "week.pdf")
+    if not export_data_pdf(items[:1], "Bench", out):
+        return None  # no cairo
+    return lambda: export_data_pdf(items, "Bench", out)
+
+
+class _Week:
+    """In-memory undo target, so the undo cases time the history and not the journal writer."""
+
+    def __init__(self):
+        self.data = {"Monday": []}
+
+    def insert(self, path, index, value):
+        self.data[path[0]].insert(index, value)
+
+    def delete(self, path, index):
+        return self.data[path[0]].pop(index)
+
+    def set(self, path, value):
+        self.data[path[0]][path[1]] = value
+
+
+def _history(n):
+    store = _Week()
+    history = UndoRedoManager(max_size=n, max_bytes=1 << 30, merge_window=0)
+    commands = [Insert(["Monday"], 0, {"time": "08:00", "name": f"Activity {i}", "emoji": "⭐"}) for i in range(n)]
+    return store, history, commands
+
+
+@case("undo.push", [100, 1000, 10000])
+def _push(n):
+    store, history, commands = _history(n)
+
+    def push():
+        history.clear()
+        for command in commands:
+            history.push(command)
+    return push
+
+
+@case("undo.undo_redo", [100, 1000, 10000])
+def _undo(n):
+    store, history, commands = _history(n)
+    for command in commands:
+        history.do(command, store)
+
+    def undo_redo():
+        while history.undo(store):
+            pass
+        while history.redo(store):
+            pass
+    return undo_redo
+
+
+if __name__ == "__main__":
+    main()
+    schedule.close_schedule_store()
@@ -0,0 +1,107 @@
+"""Benchmark cases for the period grid: profiles and its exporters.
+
+    python benchmarks/cases_src.py [--quick] [--select NAME]
+
+Normally run by suite.py.  Profiles go to a temporary HOME, which the
+batch export's worker processes share: they re-import this module.
+"""
+import atexit
+import os
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = os.environ.get("MITTSCHEMA_BENCH_ROOT")
+if ROOT is None:
+    ROOT = os.environ["MITTSCHEMA_BENCH_ROOT"] = tempfile.mkdtemp(prefix="mittschema-bench-")
+    atexit.register(shutil.rmtree, ROOT, ignore_errors=True)  # registered first, so it runs after the stores close
+os.environ["HOME"] = ROOT
+os.environ["XDG_CONFIG_HOME"] = os.path.join(ROOT, "config")
+os.environ["XDG_CACHE_HOME"] = os.path.join(ROOT, "cache")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import generators  # noqa: E402
+from harness import case, main  # noqa: E402
+from mittschema.batch import export_all_profiles  # noqa: E402
+from mittschema.export import export_csv, export_json, export_pdf, pdf_available  # noqa: E402
+from mittschema.profiles import ProfileManager  # noqa: E402
+
+_managers = {}
+
+
+def _profiles(n):
+    """A manager over n saved profiles, created once per n."""
+    if n not in _managers:
+        pm = _managers[n] = ProfileManager(f"bench-{n}", prefetch=False)
+        for i in range(n):
+            pm.switch(f"child{i}")
+            pm.save_data(generators.profile_week(i))
+    return _managers[n]
+
+
+@case("profiles.open", generators.PROFILES)
+def _open(n):
+    pm = _profiles(n)
+
+    def open_():
+        ProfileManager(f"bench-{n}", prefetch=False).list_profiles()
+    return open_
+
+
+@case("profiles.load", generators.PROFILES)
+def _load(n):
+    _profiles(n)
+    pm = ProfileManager(f"bench-{n}", cache_bytes=0, prefetch=False)  # every load reads the file
+    names = [f"child{i}" for i in range(n)]
+    rnd = random.Random(n)
+    return lambda: pm.load_data(rnd.choice(names))
+
+
+@case("profiles.switch", generators.PROFILES)
+def _switch(n):
+    pm = _profiles(n)
+    names = [f"child{i}" for i in range(n)]
+    rnd = random.Random(n)
+
+    def switch():
+        pm.switch(rnd.choice(names))
+        pm.load_data()
+    return switch
+
+
+@case("profiles.save", generators.PROFILES)
+def _save(n):
+    pm = _profiles(n)
+    data = generators.profile_week(0)
+    return lambda: pm.save_data(data)
+
+
+def _export_case(fn, ext):
+    def setup(n):
+        if ext == "pdf" and not pdf_available():
+            return None
+        rows = generators.history_rows(n)
+        out = os.path.join(ROOT, "export." + ext)
+        return lambda: fn(rows, out)
+    return setup
+
+
+for _fn, _ext in ((export_csv, "csv"), (export_json, "json"), (export_pdf, "pdf")):
+    case(f"src.export.{_ext}", generators.ACTIVITIES)(_export_case(_fn, _ext))
+
+
+BATCH_PROFILES = 16
+
+
+@case("batch.export_all", sorted({1, 2, 4, os.cpu_count() or 1}))
+def _batch(workers):
+    """All profiles into one zip with a pool of this many processes; compare across sizes for the speedup."""
+    _profiles(BATCH_PROFILES)
+    out = os.path.join(ROOT, "profiles.zip")
+    return lambda: export_all_profiles(f"bench-{BATCH_PROFILES}", out, workers=workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Synthetic schedules, export rows and profiles for the benchmark suite.
+
+Everything is generated from a seed, so runs are comparable.  Activities
+are spread evenly over the seven days; the period layout spreads each day
+over three periods.
+"""
+import random
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+NAMES = ["School", "Lunch", "Homework", "Play", "Dinner", "Bath", "Sleep", "Exercise", "Reading", "Free time"]
+EMOJI = ["\U0001f3eb", "\U0001f35d", "\U0001f4da", "\U0001f3ae", "\U0001f37d", "\U0001f6c1", "\U0001f634",
+         "\U0001f3c3", "\U0001f4d6", "⭐"]
+
+ACTIVITIES = [10, 100, 1000, 10000, 100000]
+PROFILES = [1, 10, 100, 1000]
+
+
+def _activity(rnd, i, timed=True):
+    k = rnd.randrange(len(NAMES))
+    act = {"name": f"{NAMES[k]} {i}", "emoji": EMOJI[k]}
+    if timed:
+        act = {"time": f"{6 + rnd.randrange(16):02d}:{rnd.randrange(12) * 5:02d}", **act}
+    return act
+
+
+def flat_schedule(n, seed=0):
+    """{weekday: [activity]} with n activities, each day in time order."""
+    rnd = random.Random(seed)
+    week = {day: [] for day in DAYS}
+    for i in range(n):
+        week[DAYS[i % 7]].append(_activity(rnd, i))
+    for acts in week.values():
+        acts.sort(key=lambda a: a["time"])
+    return week
+
+
+def period_schedule(n, seed=0):
+    """{"0".."6": {"0".."2": [activity]}} with n activities, as the period grid stores them."""
+    rnd = random.Random(seed)
+    week = {str(d): {str(p): [] for p in range(3)} for d in range(7)}
+    for i in range(n):
+        week[str(i % 7)][str(i // 7 % 3)].append(_activity(rnd, i, timed=False))
+    return week
+
+
+def export_rows(n, seed=0):
+    """Rows as the week view hands them to its exporters."""
+    return [{"day": day, "time": act["time"], "activity": act["name"], "image": ""}
+            for day, acts in flat_schedule(n, seed).items() for act in acts]
+
+
+def history_rows(n, seed=0):
+    """Rows as the period grid hands them to its exporters."""
+    rnd = random.Random(seed)
+    return [{"date": DAYS[i % 7], "details": f"Morning: {NAMES[rnd.randrange(len(NAMES))]}", "result": ""}
+            for i in range(n)]
+
+
+def profile_week(seed=0):
+    """One profile's data: a full period week of 84 activities."""
+    return period_schedule(84, seed)
@@ -0,0 +1,71 @@
+"""Minimal benchmark harness used by suite.py; needs no GTK and no extra packages.
+
+A case is a function registered with ``@case(name, params)``.  Called with
+one parameter it does its setup and returns the callable to time, or None
+to skip (for instance when an optional module is missing).  Each callable
+runs until ``min_time`` seconds or ``max_rounds`` calls have been spent,
+after one warm-up call, and the median and minimum are recorded.  As in
+timeit, the garbage collector is paused while a call is timed.
+"""
+import gc
+import json
+import statistics
+import sys
+import time
+
+CASES = []
+
+
+def case(name, params=(None,)):
+    def register(fn):
+        CASES.append((name, tuple(params), fn))
+        return fn
+    return register
+
+
+def measure(fn, min_time=0.2, min_rounds=3, max_rounds=1000):
+    fn()
+    samples = []
+    spent = 0.0
+    while len(samples) < min_rounds or (spent < min_time and len(samples) < max_rounds):
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            fn()
+            dt = time.perf_counter() - t0
+        finally:
+            gc.enable()
+        samples.append(dt)
+        spent += dt
+    return {"median_ms": statistics.median(samples) * 1000, "min_ms": min(samples) * 1000, "rounds": len(samples)}
+
+
+def result_name(name, param):
+    return name if param is None else f"{name}[{param}]"
+
+
+def run(select=None, quick=False, min_time=0.2):
+    """Run the registered cases; returns {name[param]: result}."""
+    results = {}
+    for name, params, fn in CASES:
+        for param in params[:2] if quick else params:
+            key = result_name(name, param)
+            if select and select not in key:
+                continue
+            timed = fn(param)
+            if timed is None:
+                continue
+            results[key] = measure(timed, min_time=min_time)
+            print(f"{key:<44} {results[key]['median_ms']:>10.3f} ms", file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    """Entry point for suite.py's subprocesses: run the imported cases, print JSON."""
+    import argparse
+    p = argparse.ArgumentParser()
+    p.add_argument("--select")
+    p.add_argument("--quick", action="store_true")
+    p.add_argument("--min-time", type=float, default=0.2)
+    args = p.parse_args(argv)
+    json.dump(run(args.select, args.quick, args.min_time), sys.stdout)
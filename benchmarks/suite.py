@@ -0,0 +1,119 @@
+"""Run the benchmark suite, write JSON and compare it with a baseline.
+
+    python benchmarks/suite.py [--quick] [--select NAME] [--output FILE]
+                               [--baseline FILE] [--threshold 0.4] [--repeat 5]
+
+The week view and the period grid are both packaged as ``mittschema``, so
+cases_pro.py and cases_src.py each run in their own interpreter and their
+results are merged.  Sizes run from 10 to 100k activities and 1 to 1000
+profiles; --quick keeps the two smallest of each.  Timings shift between
+interpreter processes, so each module runs --repeat times and a case's
+median is the median of its runs' medians.  With --baseline, a previous
+output file, the exit status is 1 when any case's median is more than
+--threshold slower and also slower by more than a noise floor: NOISE_MS,
+or IO_NOISE_MS for cases that write files, whose fsyncs vary by
+milliseconds.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+MODULES = ["cases_pro.py", "cases_src.py"]
+NOISE_MS = 1.0
+IO_NOISE_MS = 5.0
+ENV = dict(os.environ, PYTHONHASHSEED="0")  # string hashing otherwise shifts dict timings between runs
+IO_CASES = ("schedule.", "profiles.save", "src.export.", "export.pdf")
+
+
+def _run_module(name, args):
+    cmd = [sys.executable, str(HERE / name), "--min-time", str(args.min_time)]
+    if args.quick:
+        cmd.append("--quick")
+    if args.select:
+        cmd += ["--select", args.select]
+    runs = {}
+    for _ in range(args.repeat):
+        out = subprocess.run(cmd, stdout=subprocess.PIPE, check=True, env=ENV).stdout
+        for case, r in json.loads(out).items():
+            runs.setdefault(case, []).append(r)
+    return {case: {"median_ms": statistics.median(r["median_ms"] for r in rs),
+                   "min_ms": min(r["min_ms"] for r in rs),
+                   "rounds": sum(r["rounds"] for r in rs), "runs": len(rs)} for case, rs in runs.items()}
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Cases whose median is slower than baseline beyond threshold and noise: [(name, old_ms, new_ms)]."""
+    slower = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        a, b = old["median_ms"], new["median_ms"]
+        noise = IO_NOISE_MS if name.startswith(IO_CASES) else NOISE_MS
+        if b > a * (1 + threshold) and b - a > noise:
+            slower.append((name, a, b))
+    return slower
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--quick", action="store_true", help="only the two smallest sizes of each case")
+    p.add_argument("--select", help="only cases whose name contains this")
+    p.add_argument("--min-time", type=float, default=0.2, help="seconds to spend per case (default 0.2)")
+    p.add_argument("--repeat", type=int, default=5, help="runs per module (default 5)")
+    p.add_argument("--output", help="write results here instead of stdout")
+    p.add_argument("--baseline", help="earlier output to compare with")
+    p.add_argument("--threshold", type=float, default=0.4,
+                   help="allowed slowdown, 0.4 = 40%% (default; runs of one commit differ by up to 30%%)")
+    args = p.parse_args()
+
+    results = {}
+    for name in MODULES:
+        results.update(_run_module(name, args))
+    report = {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": args.quick,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    raw = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(raw + "\n")
+    else:
+        print(raw)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        slower = compare(results, baseline, args.threshold)
+        for name, a, b in slower:
+            print(f"REGRESSION {name}: {a:.3f} ms -> {b:.3f} ms (+{(b / a - 1) * 100:.0f}%)", file=sys.stderr)
+        if slower:
+            sys.exit(1)
+        print(f"no regressions over {args.threshold:.0%} against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
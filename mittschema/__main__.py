@@ -1,2 +1,9 @@
+import sys
+
+from mittschema.cli import COMMANDS
+
+if len(sys.argv) > 1 and (sys.argv[1] in COMMANDS or sys.argv[1].startswith("--schedule")):
+    from mittschema.cli import main
+    sys.exit(main())
 from mittschema.main import main
 main()
@@ -0,0 +1,242 @@
+"""Headless command line: ``python -m mittschema <command>``.
+
+Nothing here imports GTK, so scripted exports start fast and need no display.
+"""
+import os
+import sys
+
+COMMANDS = ("export", "import", "import-ics", "validate", "stats")
+
+
+def _parser():
+    import argparse
+    p = argparse.ArgumentParser(prog="mittschema", description="My Schedule Pro command line")
+    p.add_argument("--schedule", metavar="PATH", help="schedule file (default: ~/.config/mittschema/schedule.json)")
+    sub = p.add_subparsers(dest="command", required=True)
+    e = sub.add_parser("export", help="export the schedule")
+    e.add_argument("-f", "--format", choices=["csv", "json", "ndjson", "pdf"], default="csv")
+    e.add_argument("-o", "--output", help="output file (default: stdout; required for pdf)")
+    e.add_argument("-z", "--gzip", action="store_true", help="gzip-compress the output")
+    e.add_argument("--week", metavar="YYYY-MM-DD",
+                   help="a day in the week to export, with its repeating activities (default: this week)")
+    i = sub.add_parser("import", help="import activities from a schedule or export file")
+    i.add_argument("file")
+    i.add_argument("--replace", action="store_true", help="replace the schedule instead of merging")
+    t = sub.add_parser("import-ics", help="import or re-sync a school timetable from an ICS file")
+    t.add_argument("file")
+    t.add_argument("--week", metavar="YYYY-MM-DD", help="a day in the week to import (default: this week)")
+    v = sub.add_parser("validate", help="check a schedule file")
+    v.add_argument("file", nargs="?", help="file to check (default: the schedule)")
+    sub.add_parser("stats", help="print activity counts")
+    return p
+
+
+def _store(args):
+    from mittschema.schedule import schedule_store
+    return schedule_store(args.schedule)
+
+
+def _beside(store, name):
+    return os.path.join(os.path.dirname(os.path.abspath(store.path)), name)
+
+
+def _shards(store):
+    from mittschema.schedule import week_shards
+    return week_shards(_beside(store, "weeks"))
+
+
+def _read_items(path):
+    """Read activities from a schedule JSON, an export JSON/NDJSON or a CSV export."""
+    import csv
+    import gzip
+    import json
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        if ".csv" in path:
+            # The branding footer is a one-cell row: it has a day but no time column.
+            rows = [r for r in csv.DictReader(f) if r.get("day") and r.get("time") is not None]
+            return {"data": rows}
+        text = f.read()
+    try:
+        return json.loads(text)
+    except ValueError:
+        return {"data": [json.loads(line) for line in text.splitlines() if line.strip()]}
+
+
+def _as_schedule(doc):
+    if isinstance(doc, dict) and isinstance(doc.get("data"), list):
+        schedule = {}
+        for row in doc["data"]:
+            act = {"time": row.get("time", ""), "name": row.get("activity", row.get("name", ""))}
+            if row.get("image"):
+                act["image"] = row["image"]
+            schedule.setdefault(row.get("day", ""), []).append(act)
+        return schedule
+    return doc
+
+
+def validate(schedule, check_order=True):
+    """Return a list of problems found in a {day: [activity]} schedule."""
+    from mittschema.model import Activity, Day
+    errors = []
+    if not isinstance(schedule, dict):
+        return ["top level is not an object"]
+    for day, acts in schedule.items():
+        if not isinstance(acts, list):
+            errors.append(f"{day}: not a list of activities")
+            continue
+        for i, act in enumerate(acts):
+            if not isinstance(act, dict):
+                errors.append(f"{day}[{i}]: not an object")
+            elif not str(act.get("name", "")).strip():
+                errors.append(f"{day}[{i}]: missing name")
+            elif not isinstance(act.get("time", ""), str):
+                errors.append(f"{day}[{i}]: time is not a string")
+        if check_order:
+            loaded = Day(day)
+            for act in acts:
+                if isinstance(act, dict):
+                    loaded.append(Activity.from_json(act))
+            if not loaded.is_ordered():
+                errors.append(f"{day}: activities are not in time order")
+    return errors
+
+
+def _cmd_export(args):
+    from datetime import date
+    from mittschema.export import APP_LABEL, export_data_pdf, export_to_file, WRITERS
+    from mittschema.recurrence import RecurrenceSet, week_of
+    from mittschema.schedule import export_items, rules_store
+    try:
+        monday = week_of(date.fromisoformat(args.week) if args.week else date.today())
+    except ValueError as e:
+        print(f"--week: {e}", file=sys.stderr)
+        return 2
+    store = _store(args)
+    rules = RecurrenceSet.from_store(rules_store(_beside(store, "rules.json")))
+    shards = _shards(store)
+    items = export_items(shards.get(monday).data if shards.exists(monday) else store.data, rules, monday)
+    if args.format == "pdf":
+        if not args.output:
+            print("mittschema: pdf export needs --output", file=sys.stderr)
+            return 2
+        if not export_data_pdf(items, APP_LABEL, args.output):
+            print("mittschema: pdf export needs pycairo", file=sys.stderr)
+            return 1
+        return 0
+    if args.output:
+        export_to_file(items, args.output, args.format, args.gzip or None)
+    elif args.gzip:
+        import gzip
+        import io
+        with gzip.open(sys.stdout.buffer, "wb") as raw, io.TextIOWrapper(raw, "utf-8", newline="") as f:
+            WRITERS[args.format](items, f)
+    else:
+        WRITERS[args.format](items, sys.stdout)
+    return 0
+
+
+def _cmd_import(args):
+    from mittschema.model import Activity, Week
+    incoming = _as_schedule(_read_items(args.file))
+    errors = validate(incoming, check_order=False)
+    if errors:
+        print("\n".join(errors), file=sys.stderr)
+        return 1
+    store = _store(args)
+    if args.replace:
+        week = Week()
+        for day, acts in incoming.items():
+            for act in acts:
+                week.day(day).insert(Activity.from_json(act))
+        store.set([], week.to_json())
+    else:
+        week = Week.from_json(store.data)
+        for day, acts in week.to_json().items():
+            if acts != store.data.get(day):  # put an older file in order first, so indexes match
+                store.set([day], acts)
+        for day, acts in incoming.items():
+            for act in acts:
+                store.insert([day], week.day(day).insert(Activity.from_json(act)), act)
+    print(f"imported {sum(len(a) for a in incoming.values())} activities")
+    return 0
+
+
+def _cmd_import_ics(args):
+    from datetime import date
+    from mittschema import ics
+    from mittschema.schedule import WEEKDAYS
+    from mittschema.weeks import week_key
+    try:
+        week = ics.week_of(date.fromisoformat(args.week) if args.week else date.today())
+    except ValueError as e:
+        print(f"--week: {e}", file=sys.stderr)
+        return 2
+    template = _store(args)
+    store = _shards(template).get(week)
+    state_path = ics.state_path(template.path)
+    states = ics.load_state(state_path)
+    feed = os.path.abspath(args.file)
+    weeks = states.setdefault(feed, {})
+    try:
+        changes, weeks[week_key(week)] = ics.sync(feed, weeks.get(week_key(week), {}), week)
+    except OSError as e:
+        print(f"{args.file}: {e}", file=sys.stderr)
+        return 1
+    n = ics.apply_changes(changes or [], store.data, store, ics.flat_slot(WEEKDAYS))
+    ics.save_state(state_path, states)
+    print(f"{len(changes or [])} events changed, {n} edits")
+    return 0
+
+
+def _read_schedule(args, path=None):
+    """Read a schedule for a read-only command, or print why not and return None.
+
+    The schedule itself is read directly rather than through schedule_store(),
+    whose recovery would move a damaged file aside; a missing one is empty.
+    """
+    from mittschema.schedule import empty_week, schedule_path
+    path = path or args.schedule or schedule_path()
+    try:
+        return _as_schedule(_read_items(path))
+    except FileNotFoundError:
+        if path == getattr(args, "file", None):
+            print(f"{path}: no such file", file=sys.stderr)
+            return None
+        return empty_week()
+    except (OSError, ValueError) as e:
+        print(f"{path}: {e}", file=sys.stderr)
+        return None
+
+
+def _cmd_validate(args):
+    schedule = _read_schedule(args, args.file)
+    if schedule is None:
+        return 1
+    errors = validate(schedule)
+    for e in errors:
+        print(e)
+    return 1 if errors else 0
+
+
+def _cmd_stats(args):
+    schedule = _read_schedule(args)
+    if schedule is None:
+        return 1
+    total = 0
+    for day, acts in schedule.items():
+        n = len(acts) if isinstance(acts, list) else 0
+        total += n
+        print(f"{day}\t{n}")
+    print(f"total\t{total}")
+    return 0
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    try:
+        return {"export": _cmd_export, "import": _cmd_import, "import-ics": _cmd_import_ics,
+                "validate": _cmd_validate, "stats": _cmd_stats}[args.command](args)
+    finally:
+        from mittschema.schedule import close_schedule_store
+        close_schedule_store()
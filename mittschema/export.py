@@ -1,51 +1,110 @@
 """Export functionality for My Schedule Pro."""
 
 import csv
+import gzip
 import io
+import itertools
 import json
+import os
 from datetime import datetime
 
 import gettext
 _ = gettext.gettext
 
-from mittschema import __version__
+from mittschema import __version__, trace
+from mittschema.tasks import Cancelled, TaskQueue
 
 APP_LABEL = _("My Schedule Pro")
 AUTHOR = "Daniel Nylander"
 WEBSITE = "www.autismappar.se"
 
-import gi
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, Gio, GLib
 
+def _gi():
+    # GTK is only needed by the dialog; the writers stay usable headless.
+    import gi
+    gi.require_version('Gtk', '4.0')
+    gi.require_version('Adw', '1')
+    from gi.repository import Gtk, Adw, GLib
+    return Gtk, Adw, GLib
 
-def data_to_csv(items, label=""):
-    """Export data as CSV."""
-    output = io.StringIO()
-    writer = csv.writer(output)
-    if items and isinstance(items[0], dict):
-        writer.writerow(items[0].keys())
-        for item in items:
+
+def _idle_add(fn, *args):
+    _gi()[2].idle_add(fn, *args)
+
+
+EXPORTS = TaskQueue(_idle_add, name="mittschema-export")
+
+
+def _open_output(path, compress=None):
+    """Open path for text writing, gzip-compressed if asked or if it ends in .gz."""
+    if compress is None:
+        compress = str(path).endswith(".gz")
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+@trace.traced("export csv", "export")
+def write_csv(items, f):
+    """Stream items (any iterable of dicts) to a text file as CSV."""
+    writer = csv.writer(f)
+    items = iter(items)
+    first = next(items, None)
+    if isinstance(first, dict):
+        writer.writerow(first.keys())
+        for item in itertools.chain([first], items):
             writer.writerow(item.values())
     writer.writerow([])
     writer.writerow([f"{APP_LABEL} v{__version__} — {WEBSITE}"])
+
+
+@trace.traced("export json", "export")
+def write_json(items, f):
+    """Stream items to a text file as one JSON document, one item per line."""
+    f.write('{"data": [')
+    sep = "\n"
+    for item in items:
+        f.write(sep)
+        f.write(json.dumps(item, ensure_ascii=False))
+        sep = ",\n"
+    meta = {"_exported_by": f"{APP_LABEL} v{__version__}", "_author": AUTHOR, "_website": WEBSITE}
+    f.write("\n], " + json.dumps(meta, ensure_ascii=False)[1:] + "\n")
+
+
+@trace.traced("export ndjson", "export")
+def write_ndjson(items, f):
+    """Stream items to a text file as newline-delimited JSON."""
+    for item in items:
+        f.write(json.dumps(item, ensure_ascii=False))
+        f.write("\n")
+
+
+WRITERS = {"csv": write_csv, "json": write_json, "ndjson": write_ndjson}
+
+
+def export_to_file(items, path, fmt, compress=None):
+    """Stream items to path in fmt ("csv", "json" or "ndjson")."""
+    with _open_output(path, compress) as f:
+        WRITERS[fmt](items, f)
+
+
+def data_to_csv(items, label=""):
+    """Export data as CSV."""
+    output = io.StringIO()
+    write_csv(items, output)
     return output.getvalue()
 
 
 def data_to_json(items, label=""):
     """Export data as JSON."""
-    data = {
-        "data": items,
-        "_exported_by": f"{APP_LABEL} v{__version__}",
-        "_author": AUTHOR,
-        "_website": WEBSITE,
-    }
-    return json.dumps(data, indent=2, ensure_ascii=False)
+    output = io.StringIO()
+    write_json(items, output)
+    return output.getvalue()
 
 
+@trace.traced("export pdf", "export")
 def export_data_pdf(items, title, output_path):
-    """Export data as PDF."""
+    """Export data as PDF: a week grid for day/time items, else a plain list."""
     try:
         import cairo
     except ImportError:
@@ -54,6 +113,14 @@ def export_data_pdf(items, title, output_path):
         except ImportError:
             return False
 
+    items = iter(items)
+    first = next(items, None)
+    items = itertools.chain([first], items) if first is not None else iter(())
+    if isinstance(first, dict) and "day" in first:
+        from mittschema.pdf_layout import render_week_pdf
+        render_week_pdf(cairo, items, title, output_path, f"{APP_LABEL} v{__version__} — {WEBSITE}")
+        return True
+
     width, height = 595, 842
     surface = cairo.PDFSurface(output_path, width, height)
     ctx = cairo.Context(surface)
@@ -90,12 +157,15 @@ def export_data_pdf(items, title, output_path):
     return True
 
 
+@trace.traced("dialog: export", "dialog")
 def show_export_dialog(window, items, title="", status_callback=None):
     """Show export dialog."""
+    Adw = _gi()[1]
     dialog = Adw.AlertDialog.new(_("Export"), _("Choose export format:"))
     dialog.add_response("cancel", _("Cancel"))
     dialog.add_response("csv", _("CSV"))
     dialog.add_response("json", _("JSON"))
+    dialog.add_response("ndjson", _("NDJSON"))
     dialog.add_response("pdf", _("PDF"))
     dialog.set_default_response("csv")
     dialog.set_close_response("cancel")
@@ -107,7 +177,7 @@ def _on_response(dialog, response, window, items, title, status_callback):
     if response == "cancel":
         return
     ext = response
-    fd = Gtk.FileDialog.new()
+    fd = _gi()[0].FileDialog.new()
     fd.set_title(_("Save Export"))
     fd.set_initial_name(f"mittschema_{datetime.now().strftime('%Y-%m-%d')}.{ext}")
     fd.save(window, None, _on_save, items, title, ext, status_callback)
@@ -116,20 +186,37 @@ def _on_response(dialog, response, window, items, title, status_callback):
 def _on_save(dialog, result, items, title, ext, status_callback):
     try:
         gfile = dialog.save_finish(result)
-    except GLib.Error:
+    except _gi()[2].Error:
         return
-    path = gfile.get_path()
-    try:
-        if ext == "csv":
-            with open(path, "w") as f:
-                f.write(data_to_csv(items))
-        elif ext == "json":
-            with open(path, "w") as f:
-                f.write(data_to_json(items))
-        elif ext == "pdf":
-            export_data_pdf(items, title or APP_LABEL, path)
-        if status_callback:
-            status_callback(_("Exported %s") % ext.upper())
-    except Exception as e:
+    run_export(items, gfile.get_path(), ext, title, status_callback)
+
+
+def run_export(items, path, ext, title="", status_callback=None):
+    """Queue an export on the background worker; returns the Task."""
+    def status(msg):
         if status_callback:
-            status_callback(_("Export error: %s") % str(e))
+            status_callback(msg)
+
+    def work(task):
+        rows = task.track(items)
+        if ext in WRITERS:
+            export_to_file(rows, path, ext)
+        elif ext == "pdf" and not export_data_pdf(rows, title or APP_LABEL, path):
+            raise RuntimeError(_("PDF export needs pycairo"))
+
+    def done(task, error):
+        if error is None:
+            status(_("Exported %s") % ext.upper())
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        if isinstance(error, Cancelled):
+            status(_("Export cancelled"))
+        else:
+            status(_("Export error: %s") % str(error))
+
+    if EXPORTS.busy:
+        status(_("Export queued"))
+    return EXPORTS.submit(ext, work, lambda task, n: status(_("Exporting %s… %d rows") % (ext.upper(), n)), done)
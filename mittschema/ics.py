@@ -0,0 +1,239 @@
+"""Streaming iCalendar (ICS) import of school timetables; imports no GTK.
+
+A feed is read one content line at a time, so large files are never held
+in memory.  Each VEVENT starting in the chosen week becomes an activity
+tagged with a ``uid``.  A sync compares every event's UID and SEQUENCE, and
+a hash of its lines, with the state saved by the previous sync and returns
+only the differences.  A file whose size and mtime are unchanged is not
+read at all, and one whose content hash is unchanged is not parsed.
+Changes are replayed with the JournaledStore edit API, so the store itself
+or a window's edit adapter can take them.
+"""
+import bisect
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from mittschema.model import Activity
+from mittschema.persistence import write_atomic
+from mittschema.recurrence import week_of  # noqa: F401  (re-exported for callers)
+
+Change = namedtuple("Change", "key day minutes activity")
+Change.__doc__ = "One sync edit; ``day`` is 0 for Monday and ``activity`` None removes ``key``."
+
+_ESCAPE = re.compile(r"\\([\\;,nN])")
+_NAME = re.compile(r"[^;:]*")
+_SKIP = {"DTSTAMP"}  # rewritten on every publish, so not part of an event's hash
+
+
+def state_path(schedule_path):
+    """Where sync state is kept: timetable.json next to the schedule, one entry per feed."""
+    return os.path.join(os.path.dirname(os.path.abspath(schedule_path)), "timetable.json")
+
+
+def load_state(path):
+    try:
+        with open(path, "rb") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(path, states):
+    write_atomic(path, json.dumps(states, ensure_ascii=False).encode())
+
+
+def unfold(lines):
+    """Yield logical content lines, joining folded continuations."""
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _split(line):
+    """Return (NAME, {PARAM: value}, value) for one content line."""
+    quoted = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            quoted = not quoted
+        elif ch == ":" and not quoted:
+            break
+    else:
+        return line.upper(), {}, ""
+    name, *params = line[:i].split(";")
+    return name.upper(), dict(p.split("=", 1) if "=" in p else (p, "") for p in params), line[i + 1:]
+
+
+def _text(value):
+    return _ESCAPE.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def events(lines):
+    """Yield ({NAME: content line}, digest) for each VEVENT, ignoring nested components.
+
+    Lines are only split into parameters and value when read with _prop.
+    """
+    props = digest = None
+    depth = 0
+    for line in unfold(lines):
+        if props is None:
+            if line.upper() == "BEGIN:VEVENT":
+                props, digest, depth = {}, hashlib.blake2b(digest_size=12), 0
+            continue
+        name = _NAME.match(line).group().upper()
+        if name == "BEGIN":
+            depth += 1
+        elif name == "END":
+            if depth:
+                depth -= 1
+            else:
+                yield props, digest.hexdigest()
+                props = None
+        elif not depth:
+            if name not in _SKIP:
+                digest.update(line.encode())
+                digest.update(b"\n")
+            props.setdefault(name, line)
+
+
+def _start(params, value):
+    """Return (date, minutes or None) of a DTSTART; UTC and TZID times become local time."""
+    value = value.strip()
+    if params.get("VALUE", "").upper() == "DATE" or "T" not in value:
+        return datetime.strptime(value[:8], "%Y%m%d").date(), None
+    dt = datetime.strptime(value.rstrip("Z")[:15], "%Y%m%dT%H%M%S")
+    zone = timezone.utc if value.endswith("Z") else None
+    if zone is None and "TZID" in params:
+        try:
+            from zoneinfo import ZoneInfo
+            zone = ZoneInfo(params["TZID"].strip('"'))
+        except (ImportError, ValueError, KeyError):
+            zone = None  # unknown zone: take the wall time as written
+    if zone is not None:
+        dt = dt.replace(tzinfo=zone).astimezone().replace(tzinfo=None)
+    return dt.date(), dt.hour * 60 + dt.minute
+
+
+def _prop(props, name):
+    """(params, value) of a property of an event from events()."""
+    return _split(props[name])[1:]
+
+
+def _value(props, name, default=""):
+    return _split(props[name])[2] if name in props else default
+
+
+def sync(path, state, week, task=None):
+    """Compare the feed at path with the state of the previous sync.
+
+    week is the Monday of the week to import.  Returns (changes, state),
+    with changes None when neither the file nor the week changed.  A Task
+    given as task gets progress in lines and may cancel the sync.
+    """
+    st = os.stat(path)
+    stamp = [st.st_size, st.st_mtime_ns, week.isoformat()]
+    if state.get("stamp") == stamp:
+        return None, state
+    h = hashlib.blake2b(week.isoformat().encode(), digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    if state.get("digest") == h.hexdigest():
+        return None, dict(state, stamp=stamp)
+    old = state.get("events", {})
+    seen, changes = {}, []
+    end = week + timedelta(days=7)
+    with open(path, encoding="utf-8", errors="replace", newline="") as f:
+        for props, digest in events(task.track(f) if task else f):
+            if "UID" not in props or "DTSTART" not in props:
+                continue
+            key = _value(props, "UID")
+            if "RECURRENCE-ID" in props:
+                key += "#" + _value(props, "RECURRENCE-ID")
+            try:
+                day, minutes = _start(*_prop(props, "DTSTART"))
+                seq = int(_value(props, "SEQUENCE", "0") or 0)
+            except ValueError:
+                continue
+            if not week <= day < end or _value(props, "STATUS").upper() == "CANCELLED":
+                continue
+            prev = seen.get(key) or old.get(key)
+            if prev and (seq < prev[0] or (seq == prev[0] and digest == prev[1])):
+                seen[key] = prev  # unchanged, or an older copy
+                continue
+            seen[key] = [seq, digest]
+            act = {"time": f"{minutes // 60:02d}:{minutes % 60:02d}" if minutes is not None else "",
+                   "name": _text(_value(props, "SUMMARY")), "uid": key}
+            if "LOCATION" in props:
+                act["location"] = _text(_value(props, "LOCATION"))
+            changes.append(Change(key, day.weekday(), minutes, act))
+    changes.extend(Change(key, None, None, None) for key in old if key not in seen)
+    return changes, {"stamp": stamp, "digest": h.hexdigest(), "events": seen}
+
+
+def _lists(node, path=()):
+    if isinstance(node, list):
+        yield list(path), node
+    elif isinstance(node, dict):
+        for key, child in node.items():
+            yield from _lists(child, path + (key,))
+
+
+def _get(node, path):
+    for key in path:
+        node = node[key]
+    return node
+
+
+def flat_slot(days):
+    """Place activities by time in a {day: [activity]} schedule; days are the keys for Monday on."""
+    def slot(schedule, change):
+        acts = schedule.get(days[change.day], [])
+        keys = [Activity.from_json(a).key for a in acts]
+        return [days[change.day]], bisect.bisect_right(keys, Activity.from_json(change.activity).key)
+    return slot
+
+
+def period_slot(starts, days=tuple(str(d) for d in range(7))):
+    """Append activities to the period they start in, in a {day: {period: [activity]}} schedule."""
+    def slot(schedule, change):
+        minutes = change.minutes if change.minutes is not None else starts[0]
+        period = str(max(bisect.bisect_right(starts, minutes) - 1, 0))
+        return [days[change.day], period], len(schedule.get(days[change.day], {}).get(period, []))
+    return slot
+
+
+def apply_changes(changes, schedule, target, slot):
+    """Replay changes on target with ``delete(path, i)`` and ``insert(path, i, value)``.
+
+    schedule is the document target edits; it is read to find the
+    activities tagged with a key.  slot(schedule, change) returns the
+    (path, index) a new activity goes to.  Returns the number of edits.
+    """
+    where = {a["uid"]: path for path, acts in _lists(schedule) for a in acts
+             if isinstance(a, dict) and a.get("uid")}
+    n = 0
+    for change in changes:
+        path = where.pop(change.key, None)
+        if path is not None:
+            acts = _get(schedule, path)
+            target.delete(path, next(i for i, a in enumerate(acts) if a.get("uid") == change.key))
+            n += 1
+        if change.activity is not None:
+            path, i = slot(schedule, change)
+            target.insert(path, i, dict(change.activity))
+            where[change.key] = path
+            n += 1
+    return n
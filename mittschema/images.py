@@ -0,0 +1,145 @@
+"""Pictures for activities, decoded off the main loop and cached twice.
+
+An activity with an ``"image"`` key (a file path) is shown as a picture
+card.  Pictures are decoded on worker threads at the size they are shown,
+into textures held in an LRU with a byte budget.  Each scaled picture is
+also written as a PNG thumbnail under the user cache directory, named by
+the file's content hash and the size, so later launches and the PDF export
+read the small thumbnail instead of decoding the original again.
+"""
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from mittschema.persistence import write_atomic
+
+BUDGET = 64 << 20  # bytes of decoded textures kept in memory
+
+
+def cache_dir(app_name="mittschema"):
+    """Return the thumbnail directory, honouring XDG_CACHE_HOME like GLib does."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, app_name, "thumbnails")
+
+
+def _gi():
+    import gi
+    gi.require_version("Gdk", "4.0")
+    gi.require_version("GdkPixbuf", "2.0")
+    from gi.repository import Gdk, GdkPixbuf, GLib
+    return Gdk, GdkPixbuf, GLib
+
+
+class ImageCache:
+    """Thumbnails on disk and textures in memory, shared by all views of a process."""
+
+    def __init__(self, root=None, budget=BUDGET, workers=2, idle_add=None):
+        self.root = root or cache_dir()
+        self._budget = budget
+        self._bytes = 0
+        self._textures = OrderedDict()  # (path, size) -> (texture, nbytes)
+        self._digests = {}  # path -> (mtime_ns, size, digest)
+        self._waiting = {}  # (path, size) -> callbacks
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="mittschema-images")
+        self._idle_add = idle_add
+
+    def digest(self, path):
+        """Content hash of path, recomputed only when its size or mtime change."""
+        st = os.stat(path)
+        with self._lock:
+            hit = self._digests.get(path)
+        if hit and hit[:2] == (st.st_mtime_ns, st.st_size):
+            return hit[2]
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+        with self._lock:
+            self._digests[path] = (st.st_mtime_ns, st.st_size, h.hexdigest())
+        return h.hexdigest()
+
+    def thumbnail(self, path, size):
+        """Path of a PNG of path scaled to fit size×size pixels; blocks, so call it off the main loop."""
+        thumb = os.path.join(self.root, f"{self.digest(path)}-{size}.png")
+        if not os.path.exists(thumb):
+            pixbuf = _gi()[1].Pixbuf.new_from_file_at_scale(path, size, size, True)
+            ok, data = pixbuf.save_to_bufferv("png", [], [])
+            os.makedirs(self.root, exist_ok=True)
+            write_atomic(thumb, data)
+        return thumb
+
+    def lookup(self, path, size):
+        """The texture for path at size if it is in memory, else None."""
+        with self._lock:
+            hit = self._textures.get((path, size))
+            if hit is None:
+                return None
+            self._textures.move_to_end((path, size))
+            return hit[0]
+
+    def request(self, path, size, callback):
+        """Call callback(texture) on the main loop once path is decoded at size.
+
+        A texture already in memory is passed at once and also returned.
+        callback gets None if the file cannot be read.
+        """
+        texture = self.lookup(path, size)
+        if texture is not None:
+            callback(texture)
+            return texture
+        key = (path, size)
+        with self._lock:
+            waiting = self._waiting.get(key)
+            if waiting is not None:
+                waiting.append(callback)  # already being decoded
+                return None
+            self._waiting[key] = [callback]
+        self._pool.submit(self._decode, key)
+        return None
+
+    def _decode(self, key):
+        path, size = key
+        try:
+            texture = _gi()[0].Texture.new_from_filename(self.thumbnail(path, size))
+        except Exception as e:  # GLib.Error, OSError
+            print(f"{path}: {e}", file=sys.stderr)
+            texture = None
+        with self._lock:
+            if texture is not None:
+                nbytes = texture.get_width() * texture.get_height() * 4
+                self._textures[key] = (texture, nbytes)
+                self._bytes += nbytes
+                while self._bytes > self._budget and len(self._textures) > 1:
+                    self._bytes -= self._textures.popitem(last=False)[1][1]
+            callbacks = self._waiting.pop(key, [])
+        (self._idle_add or _gi()[2].idle_add)(self._deliver, callbacks, texture)
+
+    @staticmethod
+    def _deliver(callbacks, texture):
+        for fn in callbacks:
+            fn(texture)
+        return False
+
+    def clear(self):
+        """Drop the in-memory textures; thumbnails on disk are kept."""
+        with self._lock:
+            self._textures.clear()
+            self._bytes = 0
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+
+_cache = None
+
+def get_image_cache():
+    """The process-wide cache, created on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ImageCache()
+    return _cache
@@ -1,58 +1,94 @@
 """Mitt schema Pro — Weekly visual schedule."""
 
+import copy
 import gettext
-import json
 import locale
-from datetime import datetime, timedelta
-from pathlib import Path
+import os
+import sys
+from datetime import date, timedelta
 
 import gi
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Adw, Gdk, Gio, GLib, Gtk
-
-from mittschema import __version__
-from mittschema.export import show_export_dialog
-
-try:
-    locale.setlocale(locale.LC_ALL, "")
-except locale.Error:
-    pass
-for d in [Path(__file__).parent.parent / "po", Path("/usr/share/locale")]:
-    if d.is_dir():
-        locale.bindtextdomain("mittschema", str(d))
-        gettext.bindtextdomain("mittschema", str(d))
-        break
-gettext.textdomain("mittschema")
+from gi.repository import Adw, Gdk, Gio, GLib, GObject, Gtk
+
+from mittschema import __version__, ics, trace
+from mittschema.images import get_image_cache
+from mittschema.model import UNTIMED, Activity, Week, parse_time
+from mittschema.recurrence import RecurrenceSet, new_rule, week_of
+from mittschema.schedule import (WEEKDAYS, close_schedule_store, export_items, rules_path, rules_store,
+                                 schedule_path, schedule_store, week_shards)
+from mittschema.tasks import Cancelled, TaskQueue
+from mittschema.timeline import Scheduler, Timeline
+from mittschema.undo_redo import Delete, Insert, Move, Set, UndoRedoManager
+from mittschema.weeks import week_key
+
 _ = gettext.gettext
 
 APP_ID = "se.danielnylander.mittschema"
 
-WEEKDAYS = [_("Monday"), _("Tuesday"), _("Wednesday"), _("Thursday"), _("Friday"), _("Saturday"), _("Sunday")]
+IMPORTS = TaskQueue(GLib.idle_add, name="mittschema-import")
+
+REPEATS = [(_("Does not repeat"), None), (_("Every week"), "FREQ=WEEKLY"),
+           (_("Every other week"), "FREQ=WEEKLY;INTERVAL=2"),
+           (_("Every weekday"), "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"), (_("Every month"), "FREQ=MONTHLY")]
+
+CARD_IMAGE = 96  # picture height on a card, in logical pixels
 DEFAULT_COLORS = ["#3584e4", "#2ec27e", "#e66100", "#9141ac", "#e01b24", "#f5c211", "#62a0ea"]
 
 
-def _config_dir():
-    p = Path(GLib.get_user_config_dir()) / "mittschema"
-    p.mkdir(parents=True, exist_ok=True)
-    return p
+class ActivityItem(GObject.Object):
+    """One activity card in a day column's list model."""
+    __gtype_name__ = "MittschemaActivityItem"
+
+    time = GObject.Property(type=str, default="")
+    name = GObject.Property(type=str, default="")
+    image = GObject.Property(type=str, default="")
+    rule = GObject.Property(type=str, default="")  # id of the repeating rule this is an occurrence of
+    current = GObject.Property(type=bool, default=False)
+
+    def __init__(self, time="", name="", image="", rule=""):
+        super().__init__(time=time, name=name, image=image, rule=rule)
+        minutes = parse_time(time)
+        self.minutes = UNTIMED if minutes is None else minutes  # times change by replacing the item
+
+    @classmethod
+    def from_json(cls, act, rule=""):
+        return cls(act.get("time", ""), act.get("name", ""), act.get("image") or "", rule)
+
+
+def _by_time(a, b, *_):
+    return (a.minutes > b.minutes) - (a.minutes < b.minutes)
+
 
-def _load_schedule():
-    path = _config_dir() / "schedule.json"
-    if path.exists():
-        try: return json.loads(path.read_text())
-        except Exception: pass
-    return {day: [] for day in WEEKDAYS}
+class _WeekEdits:
+    """Undo target: store-style edits applied to the store, the model and the cards."""
 
-def _save_schedule(schedule):
-    (_config_dir() / "schedule.json").write_text(json.dumps(schedule, indent=2, ensure_ascii=False))
+    def __init__(self, win):
+        self._win = win
+
+    def insert(self, path, index, value):
+        self._win._insert_at(path[0], index, value)
+
+    def delete(self, path, index):
+        return self._win._delete_at(path[0], index)
+
+    def set(self, path, value):
+        self._win._set_at(path[0], path[1], path[2], value)
 
 
 class MainWindow(Adw.ApplicationWindow):
     def __init__(self, app):
         super().__init__(application=app, title=_("My Schedule Pro"))
         self.set_default_size(800, 600)
-        self.schedule = _load_schedule()
+        self.schedule = {}
+        self.store = None  # the displayed week's JournaledStore, once loaded
+        self.week = Week()
+        self.rules = None
+        self.monday = week_of(date.today())
+        self.history = UndoRedoManager()
+        self.edits = _WeekEdits(self)
+        self.shards = week_shards(dispatch=GLib.idle_add)
 
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         self.set_content(main_box)
@@ -60,17 +96,39 @@ class MainWindow(Adw.ApplicationWindow):
         header = Adw.HeaderBar()
         main_box.append(header)
 
-        add_btn = Gtk.Button(icon_name="list-add-symbolic", tooltip_text=_("Add Activity"))
-        add_btn.add_css_class("suggested-action")
-        add_btn.connect("clicked", self._on_add)
-        header.pack_start(add_btn)
+        self.add_btn = Gtk.Button(icon_name="list-add-symbolic", tooltip_text=_("Add Activity"), sensitive=False)
+        self.add_btn.add_css_class("suggested-action")
+        self.add_btn.connect("clicked", self._on_add)
+        header.pack_start(self.add_btn)
+
+        nav = Gtk.Box(css_classes=["linked"])
+        nav.append(Gtk.Button(icon_name="go-previous-symbolic", tooltip_text=_("Previous Week"),
+                              action_name="win.previous-week"))
+        self.calendar = Gtk.Calendar()
+        self.calendar.connect("day-selected", self._on_day_selected)
+        self.week_btn = Gtk.MenuButton(popover=Gtk.Popover(child=self.calendar), tooltip_text=_("Go to Date"))
+        nav.append(self.week_btn)
+        nav.append(Gtk.Button(icon_name="go-next-symbolic", tooltip_text=_("Next Week"),
+                              action_name="win.next-week"))
+        header.set_title_widget(nav)
+        today_btn = Gtk.Button(label=_("Today"), action_name="win.this-week")
+        header.pack_start(today_btn)
 
         export_btn = Gtk.Button(icon_name="document-save-symbolic", tooltip_text=_("Export (Ctrl+E)"))
         export_btn.connect("clicked", lambda *_: self._on_export())
         header.pack_end(export_btn)
 
+        self.cancel_btn = Gtk.Button(icon_name="process-stop-symbolic", tooltip_text=_("Cancel Export"), visible=False)
+        header.pack_end(self.cancel_btn)
+
         menu = Gio.Menu()
+        menu.append(_("Undo"), "win.undo")
+        menu.append(_("Redo"), "win.redo")
+        menu.append(_("Use as Default Week"), "win.set-default-week")
+        menu.append(_("Import Timetable…"), "win.import-ics")
         menu.append(_("Export Schedule"), "win.export")
+        if trace.enabled():
+            menu.append(_("Performance Trace"), "app.trace")
         menu.append(_("About My Schedule Pro"), "app.about")
         menu.append(_("Quit"), "app.quit")
         menu_btn = Gtk.MenuButton(icon_name="open-menu-symbolic", menu_model=menu)
@@ -80,12 +138,30 @@ class MainWindow(Adw.ApplicationWindow):
         ea.connect("activate", lambda *_: self._on_export())
         self.add_action(ea)
 
+        ia = Gio.SimpleAction.new("import-ics", None)
+        ia.connect("activate", lambda *_: self._on_import_ics())
+        self.add_action(ia)
+
+        for name in ("undo", "redo"):
+            a = Gio.SimpleAction.new(name, None)
+            a.connect("activate", lambda a, p, name=name: getattr(self.history, name)(self.edits))
+            a.set_enabled(False)
+            self.add_action(a)
+
+        for name, fn in (("previous-week", lambda: self._show_week(self.monday - timedelta(weeks=1))),
+                         ("next-week", lambda: self._show_week(self.monday + timedelta(weeks=1))),
+                         ("this-week", lambda: self._show_week(date.today())),
+                         ("set-default-week", self._set_default_week)):
+            a = Gio.SimpleAction.new(name, None)
+            a.connect("activate", lambda a, p, fn=fn: fn())
+            self.add_action(a)
+
         ctrl = Gtk.EventControllerKey()
         ctrl.connect("key-pressed", self._on_key)
         self.add_controller(ctrl)
 
-        # Week view
-        scroll = Gtk.ScrolledWindow(vexpand=True)
+        # Week view; each day column scrolls on its own
+        scroll = Gtk.ScrolledWindow(vexpand=True, vscrollbar_policy=Gtk.PolicyType.NEVER)
         self.week_box = Gtk.Box(spacing=4)
         self.week_box.set_homogeneous(True)
         self.week_box.set_margin_top(8)
@@ -100,9 +176,179 @@ class MainWindow(Adw.ApplicationWindow):
         self.status.set_margin_start(12)
         self.status.set_margin_bottom(4)
         main_box.append(self.status)
-        GLib.timeout_add_seconds(1, lambda: (self.status.set_label(GLib.DateTime.new_now_local().format("%Y-%m-%d %H:%M:%S")), True)[-1])
+        self._current_item = None
+        self.clock = Scheduler(GLib.timeout_add_seconds, GLib.source_remove, on_tick=self._on_tick,
+                               on_change=self._on_current_changed, on_reminder=self._on_reminder)
+        self.clock.start()
+        self.connect("destroy", lambda *_: self.clock.stop())
+        self.connect("close-request", self._on_close_request)
 
         self._build_week()
+        self._show_week(self.monday)
+        Gio.File.new_for_path(rules_path()).load_contents_async(None, self._on_rules_loaded)
+
+    def _show_week(self, day):
+        """Switch to the week containing day; its file is read off the main loop."""
+        self._save_history()
+        self.monday = week_of(day)
+        self.store = None
+        self._set_editable(False)
+        sunday = self.monday + timedelta(days=6)
+        self.week_btn.set_label(_("Week %d, %s – %s") % (self.monday.isocalendar()[1], self.monday.strftime("%d %b"),
+                                                          sunday.strftime("%d %b %Y")))
+        for i, label in enumerate(self.day_labels):
+            label.set_label(f"{WEEKDAYS[i]} {(self.monday + timedelta(days=i)).day}")
+        self.shards.get_async(self.monday, lambda store, monday=self.monday: self._on_week_loaded(monday, store))
+
+    def _set_editable(self, editable):
+        """Allow edits only while the displayed week's store and the rules are loaded."""
+        editable = editable and self.store is not None and self.rules is not None
+        self.add_btn.set_sensitive(editable)
+        self.week_box.set_sensitive(editable)  # cards' remove buttons and drag and drop
+        self.lookup_action("set-default-week").set_enabled(editable)
+        self._on_history_changed()
+
+    def _on_week_loaded(self, monday, store):
+        if monday != self.monday or store is self.store:
+            return  # the user has moved on already
+        if store is None:
+            self.status.set_label(_("Could not open week %d") % monday.isocalendar()[1])
+            return
+        self.store = store
+        self.schedule = store.data
+        self.week = Week.from_json(self.schedule)
+        for day, acts in self.week.to_json().items():
+            if acts != self.schedule.get(day):  # an older file out of time order; store indexes follow the model
+                store.set([day], acts)
+        for day in WEEKDAYS:
+            items = self.stores[day]
+            items.splice(0, items.get_n_items(), [ActivityItem.from_json(a) for a in self.schedule.get(day, [])])
+        if self.rules is not None:
+            self._show_rules()
+        else:
+            self._update_timeline()  # the repeating activities follow in _on_rules_loaded
+        self.history = UndoRedoManager(path=os.path.join(self.shards.root, week_key(monday) + ".undo.json"))
+        self.history.on_changed = self._on_history_changed
+        self.history.load(self.schedule)
+        self._set_editable(True)
+        self.shards.prefetch(self.shards.neighbours(monday))
+        self._sync_timetables()
+
+    def _on_rules_loaded(self, gfile, result):
+        try:
+            contents = gfile.load_contents_finish(result)[1]
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.NOT_FOUND):
+                # Opening the store on no rules would drop its journal: stay read-only.
+                self.status.set_label(_("Could not read the repeating activities: %s") % e.message)
+                return
+            contents = None
+        with trace.span("load rules", "io"):
+            self.rules = RecurrenceSet.from_store(rules_store(contents=contents))
+        if self.store is not None:
+            self._show_rules()
+            self._set_editable(True)
+
+    def _on_day_selected(self, calendar):
+        self.week_btn.popdown()
+        d = calendar.get_date()
+        self._show_week(date(d.get_year(), d.get_month(), d.get_day_of_month()))
+
+    def _save_history(self):
+        if self.store is not None and (self.history.can_undo() or self.history.can_redo()):
+            self.history.save(self.schedule)
+
+    def _set_default_week(self):
+        """Make the displayed week the one that weeks without their own file start from."""
+        schedule_store().set([], copy.deepcopy(self.schedule))
+        self.status.set_label(_("Default week updated"))
+
+    def _on_close_request(self, *_):
+        self._save_history()
+        return False
+
+    def _on_history_changed(self):
+        loaded = self.store is not None
+        self.lookup_action("undo").set_enabled(loaded and self.history.can_undo())
+        self.lookup_action("redo").set_enabled(loaded and self.history.can_redo())
+
+    def _update_timeline(self):
+        """Rebuild the timeline after an edit; the scheduler re-arms itself from it.
+
+        Payloads are (day, position) for the week's own activities and the
+        item itself for occurrences of repeating ones.  Only the current
+        week has a timeline, so browsing other weeks pauses reminders.
+        """
+        if self.monday != week_of(date.today()):
+            self.clock.set_timeline(Timeline())
+            return
+        entries = [(i, a.minutes, (day, pos)) for i, day in enumerate(WEEKDAYS)
+                   if day in self.week for pos, a in enumerate(self.week[day]) if a.minutes is not None]
+        for i, day in enumerate(WEEKDAYS):
+            repeats = self.rule_stores[day]
+            items = (repeats.get_item(j) for j in range(repeats.get_n_items()))
+            entries += [(i, item.minutes, item) for item in items if item.minutes != UNTIMED]
+        self.clock.set_timeline(Timeline(entries))
+
+    def _item_at(self, payload):
+        if isinstance(payload, ActivityItem):
+            return payload
+        day, pos = payload
+        return self.stores[day].get_item(pos)
+
+    def _show_rules(self):
+        """Show the repeating activities that fall in the displayed week."""
+        week = self.rules.week(self.monday)
+        for i, day in enumerate(WEEKDAYS):
+            store = self.rule_stores[day]
+            store.splice(0, store.get_n_items(), [ActivityItem.from_json(r.activity, r.id) for r in week[i]])
+        self._update_timeline()
+
+    def _add_rule(self, day, act, rrule):
+        self.rules.put(new_rule(act, rrule, self.monday + timedelta(days=WEEKDAYS.index(day))))
+        self._show_rules()
+
+    @trace.traced("dialog: remove repeating", "dialog")
+    def _remove_occurrence(self, day, item):
+        """Ask whether to skip this occurrence only or to delete the rule."""
+        rule = self.rules.rules[item.props.rule]
+        dialog = Adw.AlertDialog.new(_("Remove Repeating Activity"), rule.activity.get("name", ""))
+        dialog.add_response("cancel", _("Cancel"))
+        dialog.add_response("once", _("This Time Only"))
+        dialog.add_response("all", _("Every Time"))
+        dialog.set_response_appearance("all", Adw.ResponseAppearance.DESTRUCTIVE)
+
+        def on_response(d, r):
+            if r == "once":
+                self.rules.skip(rule.id, self.monday + timedelta(days=WEEKDAYS.index(day)))
+            elif r == "all":
+                self.rules.remove(rule.id)
+            else:
+                return
+            self._show_rules()
+            self.status.set_label(_("Removed: %s") % rule.activity.get("name", ""))
+        dialog.connect("response", on_response)
+        dialog.present(self)
+
+    def _on_tick(self, lt):
+        self.status.set_label(GLib.DateTime.new_now_local().format("%Y-%m-%d %H:%M"))
+
+    def _on_current_changed(self, prev, cur, transition):
+        if self._current_item is not None:
+            self._current_item.props.current = False
+            self._current_item = None
+        if cur is None:
+            return
+        self._current_item = self._item_at(cur[1])
+        self._current_item.props.current = True
+        if transition:
+            self.status.set_label(_("Now: %s") % self._current_item.props.name)
+
+    def _on_reminder(self, nxt):
+        item = self._item_at(nxt[1])
+        n = Gio.Notification.new(_("Coming up"))
+        n.set_body(f"{item.props.time} {item.props.name}")
+        self.get_application().send_notification("reminder", n)
 
     def _on_key(self, ctrl, keyval, keycode, state):
         if state & Gdk.ModifierType.CONTROL_MASK and keyval in (Gdk.KEY_e, Gdk.KEY_E):
@@ -111,52 +357,254 @@ class MainWindow(Adw.ApplicationWindow):
         return False
 
     def _on_export(self):
-        items = []
-        for day, activities in self.schedule.items():
-            for act in activities:
-                items.append({"day": day, "time": act.get("time", ""), "activity": act.get("name", "")})
-        show_export_dialog(self, items, _("My Schedule Pro"), lambda m: self.status.set_label(m))
-
+        from mittschema.export import EXPORTS, show_export_dialog
+        if EXPORTS.on_changed is None:
+            self.cancel_btn.connect("clicked", lambda *_: EXPORTS.cancel_all())
+            EXPORTS.on_changed = lambda: self.cancel_btn.set_visible(EXPORTS.busy)
+        show_export_dialog(self, export_items(self.schedule, self.rules, self.monday), _("My Schedule Pro"),
+                           lambda m: self.status.set_label(m))
+
+    @trace.traced("dialog: import timetable", "dialog")
+    def _on_import_ics(self):
+        calendars = Gtk.FileFilter(name=_("Calendars"))
+        calendars.add_suffix("ics")
+        calendars.add_mime_type("text/calendar")
+        filters = Gio.ListStore(item_type=Gtk.FileFilter)
+        filters.append(calendars)
+
+        def on_open(d, result):
+            try:
+                f = d.open_finish(result)
+            except GLib.Error:
+                return  # dismissed
+            if f is not None and f.get_path():
+                self._sync_timetables(f.get_path())
+        Gtk.FileDialog(title=_("Import Timetable"), filters=filters).open(self, None, on_open)
+
+    def _sync_timetables(self, feed=None):
+        """Re-read feed, or every feed imported before, on a worker and apply only the changes."""
+        state_path = ics.state_path(schedule_path())
+        week = self.monday
+        result = {}
+
+        def work(task):
+            states = ics.load_state(state_path)
+            changes = []
+            for path in [feed] if feed else list(states):
+                weeks = states.setdefault(path, {})
+                try:
+                    found, weeks[week_key(week)] = ics.sync(path, weeks.get(week_key(week), {}), week, task)
+                except OSError as e:
+                    if feed:
+                        raise
+                    print(f"{path}: {e}", file=sys.stderr)
+                    continue
+                changes += found or []
+            result.update(changes=changes, states=states)
+
+        def progress(task, n):
+            self.status.set_label(_("Importing timetable… %d lines") % n)
+
+        def done(task, error):
+            if isinstance(error, Cancelled):
+                self.status.set_label(_("Import cancelled"))
+            elif error is not None:
+                self.status.set_label(_("Import error: %s") % str(error))
+            elif week != self.monday:
+                pass  # another week is shown now; it is synced when shown again
+            else:
+                if result["changes"]:
+                    ics.apply_changes(result["changes"], self.schedule, self.edits, ics.flat_slot(WEEKDAYS))
+                    self.history.clear()  # positions in older steps no longer match
+                if result["states"]:
+                    IMPORTS.submit("state", lambda task: ics.save_state(state_path, result["states"]))
+                if feed or result["changes"]:
+                    self.status.set_label(_("Timetable: %d changes") % len(result["changes"]))
+
+        IMPORTS.submit(feed or "timetables", work, progress, done)
+
+    @trace.traced("build week", "ui")
     def _build_week(self):
-        child = self.week_box.get_first_child()
-        while child:
-            nc = child.get_next_sibling()
-            self.week_box.remove(child)
-            child = nc
-
-        for i, day in enumerate(WEEKDAYS):
+        """Build the day columns once: list views over per-day stores that recycle their cards.
+
+        Each column shows the day's own activities merged by time with the
+        occurrences of repeating ones, which are kept in a second store.
+        """
+        self.stores = {}
+        self.rule_stores = {}
+        self.day_labels = []
+        for day in WEEKDAYS:
             col = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
             lbl = Gtk.Label(label=day)
             lbl.add_css_class("heading")
             col.append(lbl)
+            self.day_labels.append(lbl)
 
             sep = Gtk.Separator()
             col.append(sep)
 
-            activities = self.schedule.get(day, [])
-            for act in activities:
-                card = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
-                card.add_css_class("card")
-                card.set_margin_top(2)
-                card.set_margin_start(2)
-                card.set_margin_end(2)
-                t = Gtk.Label(label=act.get("time", ""), xalign=0)
-                t.add_css_class("caption")
-                card.append(t)
-                n = Gtk.Label(label=act.get("name", ""), xalign=0, wrap=True)
-                n.add_css_class("body")
-                card.append(n)
-                col.append(card)
-
-            if not activities:
-                empty = Gtk.Label(label=_("No activities"))
-                empty.add_css_class("dim-label")
-                empty.set_margin_top(20)
-                col.append(empty)
+            store = Gio.ListStore(item_type=ActivityItem)
+            self.stores[day] = store
+            repeats = self.rule_stores[day] = Gio.ListStore(item_type=ActivityItem)
+            parts = Gio.ListStore(item_type=Gio.ListModel)
+            parts.append(store)
+            parts.append(repeats)
+            shown = Gtk.SortListModel(model=Gtk.FlattenListModel(model=parts), sorter=Gtk.CustomSorter.new(_by_time))
+
+            factory = Gtk.SignalListItemFactory()
+            factory.connect("setup", self._setup_card, day)
+            factory.connect("bind", self._bind_card)
+            factory.connect("unbind", self._unbind_card)
+            cards = Gtk.ListView(model=Gtk.NoSelection(model=shown), factory=factory)
+            drop = Gtk.DropTarget.new(str, Gdk.DragAction.MOVE)
+            drop.connect("drop", self._on_drop, day)
+            cards.add_controller(drop)
+            scroll = Gtk.ScrolledWindow(child=cards, vexpand=True, hscrollbar_policy=Gtk.PolicyType.NEVER)
+
+            empty = Gtk.Label(label=_("No activities"), valign=Gtk.Align.START)
+            empty.add_css_class("dim-label")
+            empty.set_margin_top(20)
+            empty.set_can_target(False)
+            shown.connect("items-changed", lambda s, *_, e=empty: e.set_visible(s.get_n_items() == 0))
+            overlay = Gtk.Overlay(child=scroll)
+            overlay.add_overlay(empty)
+            col.append(overlay)
 
             col.set_vexpand(True)
             self.week_box.append(col)
 
+    def _setup_card(self, factory, list_item, day):
+        """Build one reusable card; bind and unbind point it at an item."""
+        card = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        card.add_css_class("card")
+        card.set_margin_top(2)
+        card.set_margin_start(2)
+        card.set_margin_end(2)
+        top = Gtk.Box(spacing=2)
+        card.time_label = Gtk.Label(xalign=0, hexpand=True)
+        card.time_label.add_css_class("caption")
+        top.append(card.time_label)
+        rm = Gtk.Button(icon_name="edit-delete-symbolic", tooltip_text=_("Remove"))
+        rm.add_css_class("flat")
+        rm.connect("clicked", lambda *_: self._remove_card(day, list_item.get_item()))
+        top.append(rm)
+        card.append(top)
+        card.picture = Gtk.Picture(content_fit=Gtk.ContentFit.CONTAIN, height_request=CARD_IMAGE, visible=False)
+        card.picture.image = None
+        card.append(card.picture)
+        card.name_label = Gtk.Label(xalign=0, wrap=True)
+        card.name_label.add_css_class("body")
+        card.append(card.name_label)
+        drag = Gtk.DragSource(actions=Gdk.DragAction.MOVE)
+        drag.connect("prepare", lambda *_: self._drag_content(day, list_item.get_item()))
+        card.add_controller(drag)
+        list_item.set_child(card)
+
+    def _drag_content(self, day, item):
+        found, pos = self.stores[day].find(item)
+        if not found:
+            return None  # occurrences of repeating activities stay on their day
+        return Gdk.ContentProvider.new_for_value(f"{WEEKDAYS.index(day)}:{pos}")
+
+    def _remove_card(self, day, item):
+        if item.props.rule:
+            self._remove_occurrence(day, item)
+        else:
+            self._remove_activity(day, item)
+
+    def _bind_card(self, factory, list_item):
+        item, card = list_item.get_item(), list_item.get_child()
+
+        def on_current(*_):
+            (card.add_css_class if item.props.current else card.remove_css_class)("accent")
+        on_current()
+        self._show_picture(card.picture, item.props.image, item.props.name)
+        card.bound = (item, item.connect("notify::current", on_current),
+                      item.bind_property("time", card.time_label, "label", GObject.BindingFlags.SYNC_CREATE),
+                      item.bind_property("name", card.name_label, "label", GObject.BindingFlags.SYNC_CREATE))
+
+    def _unbind_card(self, factory, list_item):
+        card = list_item.get_child()
+        item, handler, *bindings = card.bound
+        item.disconnect(handler)
+        for b in bindings:
+            b.unbind()
+        card.bound = None
+        card.picture.image = None
+
+    def _show_picture(self, picture, path, name):
+        """Show path on a recycled card's picture once it is decoded, unless the card was rebound."""
+        picture.image = path or None
+        picture.set_paintable(None)
+        picture.set_visible(bool(path))
+        if not path:
+            return
+        picture.set_alternative_text(name)
+
+        def done(texture):
+            if picture.image == path:
+                picture.set_paintable(texture)
+        get_image_cache().request(path, CARD_IMAGE * picture.get_scale_factor(), done)
+
+    def _on_drop(self, target, value, x, y, day):
+        src, pos = value.split(":")
+        if WEEKDAYS[int(src)] != day:
+            self._move_activity(WEEKDAYS[int(src)], int(pos), day)
+        return True
+
+    # Edits at known positions; the undo history replays these.
+    def _insert_at(self, day, pos, act):
+        self.week.day(day).insert(Activity.from_json(act), pos)
+        self.store.insert([day], pos, act)
+        self.stores[day].insert(pos, ActivityItem.from_json(act))
+        self._update_timeline()
+
+    def _delete_at(self, day, pos):
+        self.stores[day].remove(pos)
+        self.week[day].pop(pos)
+        act = self.store.delete([day], pos)
+        self._update_timeline()
+        return act
+
+    def _set_at(self, day, pos, key, value):
+        setattr(self.week[day][pos], key, value)
+        self.store.set([day, pos, key], value)
+        self.stores[day].get_item(pos).set_property(key, value)
+
+    def _insert_activity(self, day, act):
+        """Insert act in time order, touching only its own card."""
+        pos = self.week.day(day).index_for(Activity.from_json(act))
+        self.history.do(Insert([day], pos, act), self.edits)
+        return pos
+
+    def _remove_activity(self, day, item):
+        found, pos = self.stores[day].find(item)
+        if not found:
+            return None
+        act = self.schedule[day][pos]
+        self.history.do(Delete([day], pos, act), self.edits)
+        self.status.set_label(_("Removed: %s") % act.get("name", ""))
+        return act
+
+    def _move_activity(self, day, pos, to_day, time=None):
+        """Move one activity to to_day and/or a new time, keeping time order."""
+        old = self.schedule[day][pos]
+        act = dict(old, time=time) if time is not None else old
+        dst = self.week.day(to_day).index_for(Activity.from_json(act))
+        if to_day == day and dst > pos:
+            dst -= 1  # counted the activity itself, which is removed first
+        self.history.do(Move([day], pos, [to_day], dst, act, old if time is not None else None), self.edits)
+        return dst
+
+    def _update_activity(self, day, pos, time=None, name=None):
+        """Change one activity; its card updates through property bindings."""
+        if name is not None and name != self.schedule[day][pos].get("name", ""):
+            self.history.do(Set([day, pos, "name"], name, self.schedule[day][pos].get("name", "")), self.edits)
+        if time is not None and time != self.schedule[day][pos].get("time", ""):
+            pos = self._move_activity(day, pos, day, time)
+        return pos
+
+    @trace.traced("dialog: add activity", "dialog")
     def _on_add(self, *_):
         dialog = Adw.AlertDialog.new(_("Add Activity"), _("Add a new activity to your schedule"))
 
@@ -165,6 +613,9 @@ class MainWindow(Adw.ApplicationWindow):
         day_combo = Gtk.DropDown.new_from_strings(WEEKDAYS)
         box.append(day_combo)
 
+        repeat_combo = Gtk.DropDown.new_from_strings([label for label, rrule in REPEATS])
+        box.append(repeat_combo)
+
         time_entry = Gtk.Entry()
         time_entry.set_placeholder_text(_("Time (e.g. 08:00)"))
         box.append(time_entry)
@@ -173,41 +624,106 @@ class MainWindow(Adw.ApplicationWindow):
         name_entry.set_placeholder_text(_("Activity name"))
         box.append(name_entry)
 
+        picked = {}
+        pic_btn = Gtk.Button(label=_("Picture…"))
+
+        def on_picked(path):
+            picked["image"] = path
+            pic_btn.set_label(os.path.basename(path))
+        pic_btn.connect("clicked", lambda *_: self._choose_picture(on_picked))
+        box.append(pic_btn)
+
         dialog.set_extra_child(box)
         dialog.add_response("cancel", _("Cancel"))
         dialog.add_response("add", _("Add"))
         dialog.set_response_appearance("add", Adw.ResponseAppearance.SUGGESTED)
 
         def on_response(d, r):
-            if r == "add" and name_entry.get_text().strip():
+            if r == "add" and (name_entry.get_text().strip() or picked):
                 day = WEEKDAYS[day_combo.get_selected()]
-                if day not in self.schedule:
-                    self.schedule[day] = []
-                self.schedule[day].append({
-                    "time": time_entry.get_text().strip(),
-                    "name": name_entry.get_text().strip(),
-                })
-                self.schedule[day].sort(key=lambda a: a.get("time", ""))
-                _save_schedule(self.schedule)
-                self._build_week()
-                self.status.set_label(_("Added: %s") % name_entry.get_text().strip())
+                name = name_entry.get_text().strip() or os.path.splitext(os.path.basename(picked["image"]))[0]
+                act = {"time": time_entry.get_text().strip(), "name": name, **picked}
+                rrule = REPEATS[repeat_combo.get_selected()][1]
+                if rrule:
+                    self._add_rule(day, act, rrule)
+                else:
+                    self._insert_activity(day, act)
+                self.status.set_label(_("Added: %s") % name)
 
         dialog.connect("response", on_response)
         dialog.present(self)
 
+    @trace.traced("dialog: choose picture", "dialog")
+    def _choose_picture(self, callback):
+        """Ask for a picture file and pass its path to callback."""
+        images = Gtk.FileFilter(name=_("Pictures"))
+        images.add_pixbuf_formats()
+        filters = Gio.ListStore(item_type=Gtk.FileFilter)
+        filters.append(images)
+        chooser = Gtk.FileDialog(title=_("Choose Picture"), filters=filters)
+
+        def on_open(d, result):
+            try:
+                f = d.open_finish(result)
+            except GLib.Error:
+                return  # dismissed
+            if f is not None and f.get_path():
+                callback(f.get_path())
+        chooser.open(self, None, on_open)
+
 
 class App(Adw.Application):
     def __init__(self):
         super().__init__(application_id=APP_ID)
         self.connect("activate", self._on_activate)
+        self.connect("shutdown", self._on_shutdown)
+        trace.watch_main_loop(GLib.timeout_add)
 
     def _on_activate(self, *_):
         win = self.props.active_window or MainWindow(self)
         a = Gio.SimpleAction(name="about"); a.connect("activate", self._on_about); self.add_action(a)
+        ta = Gio.SimpleAction(name="trace"); ta.connect("activate", self._on_trace); self.add_action(ta)
         qa = Gio.SimpleAction(name="quit"); qa.connect("activate", lambda *_: self.quit()); self.add_action(qa)
         self.set_accels_for_action("app.quit", ["<Control>q"])
+        self.set_accels_for_action("win.undo", ["<Control>z"])
+        self.set_accels_for_action("win.redo", ["<Control><Shift>z", "<Control>y"])
+        self.set_accels_for_action("win.previous-week", ["<Alt>Left"])
+        self.set_accels_for_action("win.next-week", ["<Alt>Right"])
+        self.set_accels_for_action("win.this-week", ["<Alt>Home"])
         win.present()
 
+    def _on_shutdown(self, *_):
+        # app.quit (Ctrl+Q) does not emit close-request, so save undo history here too.
+        for win in self.get_windows():
+            if isinstance(win, MainWindow):
+                win._save_history()
+        close_schedule_store()
+        trace.save()
+
+    def _on_trace(self, *_):
+        """Show span totals and main-loop latency while MITTSCHEMA_TRACE is set."""
+        page = Adw.PreferencesPage()
+        group = Adw.PreferencesGroup(title=_("Spans"), description=_("Slowest first"))
+        page.add(group)
+        for name, n, total, peak in trace.summary():
+            group.add(Adw.ActionRow(title=name, subtitle=_("%d × · %.1f ms total · %.1f ms mean · %.1f ms max") % (
+                n, total, total / n, peak)))
+
+        def on_save(*_):
+            path = trace.save()
+            group.set_description(_("Saved to %s") % path if path else _("Could not save the trace"))
+        save_btn = Gtk.Button(label=_("Save Trace"))
+        save_btn.connect("clicked", on_save)
+        header = Adw.HeaderBar()
+        header.pack_start(save_btn)
+        dialog = Adw.Dialog(title=_("Performance Trace"), content_width=480, content_height=520)
+        view = Adw.ToolbarView()
+        view.add_top_bar(header)
+        view.set_content(page)
+        dialog.set_child(view)
+        dialog.present(self.props.active_window)
+
+    @trace.traced("dialog: about", "dialog")
     def _on_about(self, *_):
         dialog = Adw.AboutDialog(
             application_name=_("My Schedule Pro"), application_icon=APP_ID, version=__version__,
@@ -220,5 +736,13 @@ class App(Adw.Application):
 
 
 def main():
+    try:
+        locale.setlocale(locale.LC_ALL, "")
+    except locale.Error:
+        pass
+    for d in [os.path.join(os.path.dirname(os.path.dirname(__file__)), "po"), "/usr/share/locale"]:
+        if os.path.isdir(d):
+            locale.bindtextdomain("mittschema", d)
+            break
     app = App()
     return app.run()
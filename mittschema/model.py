@@ -0,0 +1,211 @@
+"""Typed schedule model: Week → Day → Activity, kept in time order.
+
+Two JSON layouts are in use and both round-trip losslessly once in order:
+
+* flat, ``{day: [{"time": "08:00", "name": ...}]}`` (schedule.json);
+* periods, ``{"0": {"0": [{"name": ..., "emoji": ...}]}}`` (the period grid).
+
+An activity with an ``image`` (a picture file path) is a picture card.
+Times are parsed once to minutes since midnight; activities without a
+parseable time sort after timed ones, in insertion order.  Days read from
+older files that are out of order are sorted (stably) on load, since
+inserting bisects.  Names and emoji are interned, since the same handful
+repeat across a week.
+"""
+import bisect
+import sys
+
+UNTIMED = 24 * 60
+
+
+def parse_time(text):
+    """Minutes since midnight for "8:30", "08.30" or "8"; None if unparseable."""
+    if not isinstance(text, str):
+        return None
+    parts = text.strip().replace(".", ":").split(":")
+    try:
+        h = int(parts[0])
+        m = int(parts[1]) if len(parts) > 1 and parts[1] else 0
+    except ValueError:
+        return None
+    if 0 <= h < 24 and 0 <= m < 60:
+        return h * 60 + m
+    return None
+
+
+def _intern(s):
+    return sys.intern(s) if isinstance(s, str) else s
+
+
+class Activity:
+    """One activity; ``time`` keeps the text as written, ``minutes`` its value."""
+    __slots__ = ("name", "emoji", "time", "minutes", "period", "image", "extra")
+
+    def __init__(self, name=None, time=None, emoji=None, period=None, extra=None, image=None):
+        self.name = _intern(name)
+        self.emoji = _intern(emoji)
+        self.image = image
+        self.time = time
+        self.minutes = parse_time(time)
+        self.period = period
+        self.extra = extra or None
+
+    @property
+    def key(self):
+        """Sort key within a day: period, then time, untimed last."""
+        return (self.period or 0, UNTIMED if self.minutes is None else self.minutes)
+
+    @classmethod
+    def from_json(cls, d, period=None):
+        extra = {k: v for k, v in d.items() if k not in ("name", "emoji", "time", "image")}
+        return cls(d.get("name"), d.get("time"), d.get("emoji"), period, extra, d.get("image"))
+
+    def to_json(self):
+        d = {}
+        if self.time is not None:
+            d["time"] = self.time
+        if self.name is not None:
+            d["name"] = self.name
+        if self.emoji is not None:
+            d["emoji"] = self.emoji
+        if self.image is not None:
+            d["image"] = self.image
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __repr__(self):
+        return f"Activity({self.name!r}, time={self.time!r}, period={self.period!r})"
+
+
+class Day:
+    """A day's activities in key order, with the keys kept alongside for bisect."""
+    __slots__ = ("key", "periods", "activities", "_keys")
+
+    def __init__(self, key, periods=None):
+        self.key = key
+        self.periods = periods  # period keys, in file order, for the periods layout
+        self.activities = []
+        self._keys = []
+
+    def __len__(self):
+        return len(self.activities)
+
+    def __iter__(self):
+        return iter(self.activities)
+
+    def __getitem__(self, i):
+        return self.activities[i]
+
+    def index_for(self, act):
+        """Where insert would put act: after any activity with the same key."""
+        return bisect.bisect_right(self._keys, act.key)
+
+    def insert(self, act, i=None):
+        """Insert act in key order, or at i when replaying an edit; returns the index.
+
+        In the periods layout an activity without a period goes in the first.
+        """
+        if self.periods is not None and act.period is None:
+            act.period = 0
+        if i is None:
+            i = self.index_for(act)
+        self._keys.insert(i, act.key)
+        self.activities.insert(i, act)
+        return i
+
+    def append(self, act):
+        """Add at the end without sorting; call sort once all are added."""
+        if self.periods is not None and act.period is None:
+            act.period = 0
+        self._keys.append(act.key)
+        self.activities.append(act)
+
+    def pop(self, i):
+        del self._keys[i]
+        return self.activities.pop(i)
+
+    def retime(self, i, time):
+        """Change one activity's time and move it into place; returns the new index."""
+        act = self.pop(i)
+        act.time = time
+        act.minutes = parse_time(time)
+        return self.insert(act)
+
+    def in_period(self, period):
+        return [a for a in self.activities if a.period == period]
+
+    def is_ordered(self):
+        return all(a <= b for a, b in zip(self._keys, self._keys[1:]))
+
+    def sort(self):
+        """Put the activities in key order, keeping ties as they were; True if any moved."""
+        if self.is_ordered():
+            return False
+        self.activities.sort(key=lambda a: a.key)
+        self._keys = [a.key for a in self.activities]
+        return True
+
+
+class Week:
+    """Days in file order; ``layout`` is "flat" or "periods"."""
+    __slots__ = ("days", "layout", "_by_key")
+
+    def __init__(self, layout="flat"):
+        self.days = []
+        self.layout = layout
+        self._by_key = {}
+
+    def __getitem__(self, key):
+        return self._by_key[key]
+
+    def __contains__(self, key):
+        return key in self._by_key
+
+    def __iter__(self):
+        return iter(self.days)
+
+    def __len__(self):
+        return sum(len(d) for d in self.days)
+
+    def day(self, key, periods=None):
+        """Return the day for key, adding an empty one if needed.
+
+        A new day in the periods layout takes the other days' periods by default.
+        """
+        d = self._by_key.get(key)
+        if d is None:
+            if periods is None and self.layout == "periods":
+                periods = list(self.days[0].periods or ()) if self.days else []
+                periods = periods or ["0"]
+            d = self._by_key[key] = Day(key, periods)
+            self.days.append(d)
+        return d
+
+    @classmethod
+    def from_json(cls, data):
+        periods = any(isinstance(v, dict) for v in data.values())
+        week = cls("periods" if periods else "flat")
+        for key, value in data.items():
+            if periods:
+                day = week.day(key, list(value))
+                for i, (pkey, acts) in enumerate(value.items()):
+                    for a in acts:
+                        day.append(Activity.from_json(a, i))
+            else:
+                day = week.day(key)
+                for a in value:
+                    day.append(Activity.from_json(a))
+            day.sort()
+        return week
+
+    def to_json(self):
+        if self.layout == "flat":
+            return {d.key: [a.to_json() for a in d] for d in self.days}
+        out = {}
+        for d in self.days:
+            periods = out[d.key] = {p: [] for p in d.periods or ()}
+            keys = list(periods)
+            for a in d:
+                periods[keys[a.period]].append(a.to_json())
+        return out
@@ -0,0 +1,252 @@
+"""Week-grid PDF layout: days as columns, times as rows, paginated in one pass."""
+import sys
+from collections import deque
+from datetime import datetime
+
+from mittschema.model import parse_time
+
+PAGE_W, PAGE_H = 842, 595  # A4 landscape
+MARGIN = 30
+TIME_COL = 56
+PAD = 4
+HEADER_FONT = "Sans Bold 11"
+CELL_FONT = "Sans 9"
+PICTURE = 36  # points per picture in a cell
+PICTURE_PX = 144  # thumbnail size drawn into it, about 300 dpi
+
+
+def _time_key(t):
+    m = parse_time(t)
+    return (0, m, t) if m is not None else (1, 0, t or "")
+
+
+def build_grid(items):
+    """Group {"day", "time", "activity", "image"} items into (days, [(time, {day: [(text, image)]})])."""
+    days, rows = {}, {}
+    for item in items:
+        day = item.get("day", "")
+        days.setdefault(day, None)
+        text = " ".join(str(v) for v in (item.get("emoji"), item.get("activity") or item.get("name")) if v)
+        rows.setdefault(item.get("time", ""), {}).setdefault(day, []).append((text, item.get("image") or None))
+    return list(days), sorted(rows.items(), key=lambda r: _time_key(r[0]))
+
+
+class _PangoText:
+    """Wrapped text through one reused Pango layout, with cached heights."""
+
+    def __init__(self, ctx, font):
+        import gi
+        gi.require_version("Pango", "1.0")
+        gi.require_version("PangoCairo", "1.0")
+        from gi.repository import Pango, PangoCairo
+        self._pc = PangoCairo
+        self._scale = Pango.SCALE
+        self._layout = PangoCairo.create_layout(ctx)
+        PangoCairo.context_set_resolution(self._layout.get_context(), 72)  # PDF units are points
+        self._layout.context_changed()
+        self._layout.set_font_description(Pango.FontDescription.from_string(font))
+        self._layout.set_wrap(Pango.WrapMode.WORD_CHAR)
+        self._cache = {}
+        self._current = None
+
+    def _set(self, text, width):
+        if self._current != (text, width):
+            self._layout.set_width(int(width * self._scale))
+            self._layout.set_text(text, -1)
+            self._current = (text, width)
+
+    def height(self, text, width):
+        key = (text, width)
+        h = self._cache.get(key)
+        if h is None:
+            self._set(text, width)
+            h = self._cache[key] = self._layout.get_pixel_size()[1]
+        return h
+
+    def draw(self, ctx, text, x, y, width):
+        self._set(text, width)
+        ctx.move_to(x, y)
+        self._pc.show_layout(ctx, self._layout)
+
+
+class _ToyText:
+    """Fallback for cairo without Pango: greedy word wrap with cached lines."""
+
+    def __init__(self, ctx, font):
+        size = float(font.rsplit(" ", 1)[-1])
+        self._face = ("Sans", 0, 1 if "Bold" in font else 0)
+        self._size = size
+        self._line_h = size * 1.3
+        self._ctx = ctx
+        self._cache = {}
+
+    def _lines(self, text, width):
+        key = (text, width)
+        lines = self._cache.get(key)
+        if lines is None:
+            self._apply(self._ctx)
+            lines = []
+            for para in text.split("\n"):
+                line = ""
+                for word in para.split():
+                    cand = f"{line} {word}" if line else word
+                    if line and self._ctx.text_extents(cand).x_advance > width:
+                        lines.append(line)
+                        line = word
+                    else:
+                        line = cand
+                lines.append(line)
+            self._cache[key] = lines
+        return lines
+
+    def _apply(self, ctx):
+        ctx.select_font_face(*self._face)
+        ctx.set_font_size(self._size)
+
+    def height(self, text, width):
+        return len(self._lines(text, width)) * self._line_h
+
+    def draw(self, ctx, text, x, y, width):
+        lines = self._lines(text, width)
+        self._apply(ctx)
+        for i, line in enumerate(lines):
+            ctx.move_to(x, y + self._size + i * self._line_h)
+            ctx.show_text(line)
+
+
+def _text_engine(ctx, font):
+    try:
+        return _PangoText(ctx, font)
+    except (ImportError, ValueError):
+        return _ToyText(ctx, font)
+
+
+class _Pictures:
+    """Picture surfaces from the shared thumbnail cache, loaded once per export."""
+
+    def __init__(self, cairo):
+        self._cairo = cairo
+        self._surfaces = {}
+
+    def get(self, path):
+        if path not in self._surfaces:
+            try:
+                from mittschema.images import get_image_cache
+                thumb = get_image_cache().thumbnail(path, PICTURE_PX)
+                self._surfaces[path] = self._cairo.ImageSurface.create_from_png(thumb)
+            except Exception as e:  # no GdkPixbuf, unreadable or undecodable file
+                print(f"{path}: {e}", file=sys.stderr)
+                self._surfaces[path] = None
+        return self._surfaces[path]
+
+
+def _pictures_height(n, width):
+    per_row = max(1, int((width + PAD) // (PICTURE + PAD)))
+    return -(-n // per_row) * (PICTURE + PAD)
+
+
+def _draw_pictures(ctx, surfaces, x, y, width):
+    per_row = max(1, int((width + PAD) // (PICTURE + PAD)))
+    for i, surface in enumerate(surfaces):
+        if surface is None:
+            continue
+        scale = PICTURE / max(surface.get_width(), surface.get_height(), 1)
+        ctx.save()
+        ctx.translate(x + (i % per_row) * (PICTURE + PAD), y + (i // per_row) * (PICTURE + PAD))
+        ctx.scale(scale, scale)
+        ctx.set_source_surface(surface, 0, 0)
+        ctx.paint()
+        ctx.restore()
+
+
+def _split_row(by_day, fits):
+    """Split a row into what fits, per day, and the rest; each day keeps at least one activity."""
+    head, rest = {}, {}
+    for day, acts in by_day.items():
+        lo, hi = 1, len(acts)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if fits({day: acts[:mid]}):
+                lo = mid
+            else:
+                hi = mid - 1
+        head[day] = acts[:lo]
+        if acts[lo:]:
+            rest[day] = acts[lo:]
+    return head, rest
+
+
+def render_week_pdf(cairo, items, title, output_path, footer=""):
+    """Render items as a week grid, one page at a time; returns the page count."""
+    days, rows = build_grid(items)
+    surface = cairo.PDFSurface(output_path, PAGE_W, PAGE_H)
+    ctx = cairo.Context(surface)
+    head = _text_engine(ctx, HEADER_FONT)
+    cell = _text_engine(ctx, CELL_FONT)
+    col_w = (PAGE_W - 2 * MARGIN - TIME_COL) / max(len(days), 1)
+    text_w = col_w - 2 * PAD
+    time_w = TIME_COL - PAD
+    date = datetime.now().strftime("%Y-%m-%d")
+    bottom = PAGE_H - MARGIN - 12
+    header_h = max([head.height(d, text_w) for d in days] + [0]) + 2 * PAD
+    pictures = _Pictures(cairo)
+    page = 0
+
+    def start_page():
+        ctx.set_source_rgb(0, 0, 0)
+        head.draw(ctx, f"{title} — {date}", MARGIN, MARGIN - 16, PAGE_W - 2 * MARGIN)
+        y = MARGIN + 8
+        for i, day in enumerate(days):
+            x = MARGIN + TIME_COL + i * col_w
+            ctx.set_source_rgb(0.86, 0.9, 0.97)
+            ctx.rectangle(x, y, col_w, header_h)
+            ctx.fill()
+            ctx.set_source_rgb(0, 0, 0)
+            head.draw(ctx, day, x + PAD, y + PAD, text_w)
+        return y + header_h
+
+    def end_page():
+        ctx.set_source_rgb(0.5, 0.5, 0.5)
+        cell.draw(ctx, f"{footer} — {page + 1}", MARGIN, PAGE_H - MARGIN, PAGE_W - 2 * MARGIN)
+        surface.show_page()
+
+    def measure(time_label, by_day):
+        texts = {day: "\n".join(t for t, _ in acts if t) for day, acts in by_day.items()}
+        pics = {day: [pictures.get(i) for _, i in acts if i] for day, acts in by_day.items()}
+        tops = {day: _pictures_height(len(p), text_w) if p else 0 for day, p in pics.items()}
+        h = max([tops[d] + cell.height(t, text_w) for d, t in texts.items()]
+                + [cell.height(time_label, time_w)]) + 2 * PAD
+        return texts, pics, tops, h
+
+    y = top = start_page()
+    pending = deque(rows)
+    while pending:
+        time_label, by_day = pending.popleft()
+        texts, pics, tops, h = measure(time_label, by_day)
+        if y + h > bottom and y > top:
+            end_page()
+            page += 1
+            y = start_page()
+        if y + h > bottom:
+            # Taller than a page: draw what fits and continue the row on the next one.
+            part, rest = _split_row(by_day, lambda p: y + measure(time_label, p)[3] <= bottom)
+            if rest:
+                pending.appendleft((time_label, rest))
+                texts, pics, tops, h = measure(time_label, part)
+        ctx.set_source_rgb(0.8, 0.8, 0.8)
+        ctx.set_line_width(0.5)
+        ctx.move_to(MARGIN, y)
+        ctx.line_to(PAGE_W - MARGIN, y)
+        ctx.stroke()
+        ctx.set_source_rgb(0.3, 0.3, 0.3)
+        cell.draw(ctx, time_label, MARGIN, y + PAD, time_w)
+        ctx.set_source_rgb(0, 0, 0)
+        for i, day in enumerate(days):
+            if day in texts:
+                x = MARGIN + TIME_COL + i * col_w + PAD
+                _draw_pictures(ctx, pics[day], x, y + PAD, text_w)
+                cell.draw(ctx, texts[day], x, y + PAD + tops[day], text_w)
+        y += h
+    end_page()
+    surface.finish()
+    return page + 1
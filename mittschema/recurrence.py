@@ -0,0 +1,248 @@
+"""Repeating activities: RRULE-style rules expanded into concrete weeks on demand.
+
+A rule is an activity plus an RRULE subset (FREQ DAILY, WEEKLY, MONTHLY or
+YEARLY, with INTERVAL, BYDAY, BYMONTHDAY, UNTIL and COUNT), a first date
+and exception dates; an exception "YYYY-MM-DD/YYYY-MM-DD" skips a whole
+range, such as a term break.  Whether a rule falls on a day is worked out
+arithmetically, so expanding a week costs the same in any year.  Expanded
+weeks are kept in an LRU.  Changing a rule's dates drops only the cached
+weeks whose occurrences changed, and changing its activity drops the weeks
+it falls in.  Rules are saved in rules.json through a JournaledStore;
+imports no GTK.
+"""
+import sys
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+from mittschema.model import UNTIMED, parse_time
+
+FREQS = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAY_CODES = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+MAX_YEARS = 100  # how far COUNT is followed
+
+
+def week_of(day):
+    """The Monday of day's week."""
+    return day - timedelta(days=day.weekday())
+
+
+def _rrule_date(value):
+    return datetime.strptime(value[:8], "%Y%m%d").date()
+
+
+class Rule:
+    """One repeating activity; instances are replaced, not changed, when edited."""
+    __slots__ = ("id", "activity", "rrule", "dtstart", "exdates", "freq", "interval", "byday", "bymonthday",
+                 "until", "count", "key", "last", "_skip", "_ranges")
+
+    def __init__(self, id, activity, rrule="FREQ=WEEKLY", dtstart=None, exdates=()):
+        self.id = id
+        self.activity = dict(activity)
+        self.rrule = rrule
+        self.dtstart = dtstart or date.today()
+        self.exdates = list(exdates)
+        parts = dict(p.split("=", 1) for p in rrule.upper().split(";") if "=" in p)
+        self.freq = parts.get("FREQ", "WEEKLY")
+        if self.freq not in FREQS:
+            raise ValueError(f"unsupported FREQ {self.freq!r}")
+        self.interval = max(int(parts.get("INTERVAL", 1)), 1)
+        self.byday = ({WEEKDAY_CODES.index(d.strip()[-2:]) for d in parts["BYDAY"].split(",")}
+                      if "BYDAY" in parts else None)
+        self.bymonthday = {int(d) for d in parts["BYMONTHDAY"].split(",")} if "BYMONTHDAY" in parts else None
+        self.until = _rrule_date(parts["UNTIL"]) if "UNTIL" in parts else None
+        self.count = int(parts["COUNT"]) if "COUNT" in parts else None
+        minutes = parse_time(self.activity.get("time"))
+        self.key = UNTIMED if minutes is None else minutes
+        self._skip = set()
+        self._ranges = []
+        for e in self.exdates:
+            if "/" in e:
+                first, last = e.split("/", 1)
+                self._ranges.append((date.fromisoformat(first), date.fromisoformat(last)))
+            else:
+                self._skip.add(date.fromisoformat(e))
+        self.last = self.until
+        if self.count is not None:
+            self.last = self._nth(self.count)
+
+    def _matches(self, day):
+        """Whether day fits the pattern, ignoring the start, end and exceptions."""
+        start = self.dtstart
+        if self.freq == "DAILY":
+            return (day - start).days % self.interval == 0 and (self.byday is None or day.weekday() in self.byday)
+        if self.freq == "WEEKLY":
+            weeks = (day - week_of(start)).days // 7
+            return weeks % self.interval == 0 and day.weekday() in (self.byday or {start.weekday()})
+        if self.freq == "MONTHLY":
+            months = (day.year - start.year) * 12 + day.month - start.month
+            return months % self.interval == 0 and day.day in (self.bymonthday or {start.day})
+        return ((day.year - start.year) % self.interval == 0
+                and (day.month, day.day) == (start.month, start.day))
+
+    def _nth(self, n):
+        """The date of the nth occurrence; exceptions still count, as in RFC 5545."""
+        end = self.dtstart + timedelta(days=366 * MAX_YEARS)
+        day = self._count_off(max(n, 1), end)
+        if day is None or day > end or (self.until is not None and day > self.until):
+            return self.until or end
+        return day
+
+    def _count_off(self, n, end):
+        """The nth match of the pattern from dtstart, counted a period at a time; None if none by end."""
+        start, step = self.dtstart, self.interval
+        if self.freq == "DAILY":
+            # Weekdays repeat every 7 steps, so count whole cycles of 7.
+            hits = [k for k in range(7) if self.byday is None or (start.weekday() + k * step) % 7 in self.byday]
+            if not hits:
+                return None
+            cycles, i = divmod(n - 1, len(hits))
+            return start + timedelta(days=(cycles * 7 + hits[i]) * step)
+        if self.freq == "WEEKLY":
+            days = sorted(self.byday or {start.weekday()})
+            first = [d for d in days if d >= start.weekday()]
+            if n <= len(first):
+                return week_of(start) + timedelta(days=first[n - 1])
+            weeks, i = divmod(n - len(first) - 1, len(days))
+            return week_of(start) + timedelta(weeks=(weeks + 1) * step, days=days[i])
+        if self.freq == "MONTHLY":
+            wanted = sorted(self.bymonthday or {start.day})
+            months = start.year * 12 + start.month - 1
+            while True:
+                first = date(months // 12, months % 12 + 1, 1)
+                if first > end:
+                    return None
+                for d in wanted:
+                    try:
+                        day = first.replace(day=d)
+                    except ValueError:
+                        continue  # no such day in this month
+                    if day >= start:
+                        n -= 1
+                        if n == 0:
+                            return day
+                months += step
+        for year in range(start.year, end.year + 1, step):
+            try:
+                day = start.replace(year=year)
+            except ValueError:
+                continue  # 29 February
+            n -= 1
+            if n == 0:
+                return day
+        return None
+
+    def occurs(self, day):
+        if day < self.dtstart or (self.last is not None and day > self.last) or day in self._skip:
+            return False
+        if any(first <= day <= last for first, last in self._ranges):
+            return False
+        return self._matches(day)
+
+    def in_week(self, monday):
+        """Weekday indexes (Monday 0) the rule falls on in the week starting monday."""
+        if self.dtstart > monday + timedelta(days=6) or (self.last is not None and self.last < monday):
+            return []
+        return [i for i in range(7) if self.occurs(monday + timedelta(days=i))]
+
+    def skipping(self, day):
+        """A copy of this rule that skips day."""
+        return Rule(self.id, self.activity, self.rrule, self.dtstart, self.exdates + [day.isoformat()])
+
+    @classmethod
+    def from_json(cls, d):
+        return cls(d["id"], d.get("activity", {}), d.get("rrule", "FREQ=WEEKLY"),
+                   date.fromisoformat(d["dtstart"]), d.get("exdates", ()))
+
+    def to_json(self):
+        d = {"id": self.id, "activity": self.activity, "rrule": self.rrule, "dtstart": self.dtstart.isoformat()}
+        if self.exdates:
+            d["exdates"] = self.exdates
+        return d
+
+    def __repr__(self):
+        return f"Rule({self.id!r}, {self.activity.get('name')!r}, {self.rrule!r}, {self.dtstart})"
+
+
+def new_rule(activity, rrule, dtstart):
+    return Rule(uuid.uuid4().hex, activity, rrule, dtstart)
+
+
+class RecurrenceSet:
+    """Rules by id with an LRU of expanded weeks; edits are mirrored to ``store`` if given."""
+
+    def __init__(self, rules=(), store=None, max_weeks=64):
+        self.rules = {r.id: r for r in rules}
+        self.store = store
+        self._weeks = OrderedDict()  # Monday -> seven lists of rules, in time order
+        self._max_weeks = max_weeks
+        self.expanded = 0  # weeks expanded so far, for benchmarks
+
+    @classmethod
+    def from_store(cls, store, **kwargs):
+        rules = []
+        for d in store.data.get("rules", []):
+            try:
+                rules.append(Rule.from_json(d))
+            except (KeyError, ValueError) as e:
+                print(f"{store.path}: skipping rule {d.get('id')!r}: {e}", file=sys.stderr)
+        return cls(rules, store, **kwargs)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def week(self, monday):
+        """The rules falling on each day of the week starting monday, expanded once."""
+        days = self._weeks.get(monday)
+        if days is not None:
+            self._weeks.move_to_end(monday)
+            return days
+        days = tuple([] for _ in range(7))
+        for rule in self.rules.values():
+            for i in rule.in_week(monday):
+                days[i].append(rule)
+        for rules in days:
+            rules.sort(key=lambda r: r.key)
+        self._weeks[monday] = days
+        self.expanded += 1
+        while len(self._weeks) > self._max_weeks:
+            self._weeks.popitem(last=False)
+        return days
+
+    def put(self, rule):
+        """Add rule, or replace the rule with its id."""
+        old = self.rules.get(rule.id)
+        self.rules[rule.id] = rule
+        if self.store is not None:
+            i = self._index(rule.id)
+            if i is None:
+                self.store.insert(["rules"], len(self.store.data.get("rules", [])), rule.to_json())
+            else:
+                self.store.set(["rules", i], rule.to_json())
+        self._invalidate(old, rule)
+
+    def remove(self, rule_id):
+        old = self.rules.pop(rule_id, None)
+        if self.store is not None:
+            i = self._index(rule_id)
+            if i is not None:
+                self.store.delete(["rules"], i)
+        self._invalidate(old)
+        return old
+
+    def skip(self, rule_id, day):
+        """Leave out one occurrence."""
+        self.put(self.rules[rule_id].skipping(day))
+
+    def _index(self, rule_id):
+        return next((i for i, d in enumerate(self.store.data.get("rules", [])) if d.get("id") == rule_id), None)
+
+    def _invalidate(self, old, new=None):
+        """Drop the cached weeks where the rule's occurrences changed."""
+        def days(rule, monday):
+            return rule.in_week(monday) if rule is not None else []
+        same = old is not None and new is not None and old.activity == new.activity
+        for monday in list(self._weeks):
+            before, after = days(old, monday), days(new, monday)
+            if (before or after) and (before != after or not same):
+                del self._weeks[monday]
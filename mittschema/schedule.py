@@ -0,0 +1,113 @@
+"""Schedule data shared by the window and the command line; imports no GTK."""
+import gettext
+import heapq
+import os
+
+from mittschema import trace
+from mittschema.model import UNTIMED, parse_time
+from mittschema.persistence import JournaledStore
+
+for d in [os.path.join(os.path.dirname(os.path.dirname(__file__)), "po"), "/usr/share/locale"]:
+    if os.path.isdir(d):
+        gettext.bindtextdomain("mittschema", d)
+        break
+gettext.textdomain("mittschema")
+_ = gettext.gettext
+
+WEEKDAYS = [_("Monday"), _("Tuesday"), _("Wednesday"), _("Thursday"), _("Friday"), _("Saturday"), _("Sunday")]
+
+
+def config_dir():
+    """Return ~/.config/mittschema, honouring XDG_CONFIG_HOME like GLib does."""
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    p = os.path.join(base, "mittschema")
+    os.makedirs(p, exist_ok=True)
+    return p
+
+
+def empty_week():
+    return {day: [] for day in WEEKDAYS}
+
+
+def schedule_path():
+    return os.path.join(config_dir(), "schedule.json")
+
+
+def rules_path():
+    return os.path.join(config_dir(), "rules.json")
+
+
+_store = None
+_rules = None
+_weeks = None
+
+def schedule_store(path=None, **kwargs):
+    """Return the journaled store for schedule.json (or path), opening it once.
+
+    kwargs, such as already-read ``contents``, go to JournaledStore.
+    """
+    global _store
+    if _store is None:
+        _store = JournaledStore(path or schedule_path(), empty_week, **kwargs)
+    return _store
+
+@trace.traced("load schedule", "io")
+def load_schedule():
+    return schedule_store().data
+
+@trace.traced("save schedule", "io")
+def save_schedule(schedule):
+    schedule_store().set([], schedule)
+
+def rules_store(path=None, **kwargs):
+    """Return the journaled store for rules.json (repeating activities), opening it once.
+
+    kwargs go to JournaledStore, as for schedule_store().
+    """
+    global _rules
+    if _rules is None:
+        _rules = JournaledStore(path or rules_path(), lambda: {"rules": []}, **kwargs)
+    return _rules
+
+def week_shards(root=None, dispatch=None):
+    """Return the per-week stores under weeks/ (or root), created once.
+
+    Weeks without their own file start as a copy of schedule.json, the
+    default week.  dispatch, normally GLib.idle_add, runs get_async callbacks.
+    """
+    global _weeks
+    if _weeks is None:
+        from mittschema.weeks import WeekShards
+        _weeks = WeekShards(root or os.path.join(config_dir(), "weeks"), lambda: schedule_store().data,
+                            dispatch=dispatch)
+    return _weeks
+
+def close_schedule_store():
+    """Flush pending edits; call before the process exits."""
+    if _weeks:
+        _weeks.close()
+    if _store:
+        _store.close()
+    if _rules:
+        _rules.close()
+
+
+def _time_key(act):
+    minutes = parse_time(act.get("time"))
+    return UNTIMED if minutes is None else minutes
+
+
+def export_items(schedule, rules=None, monday=None):
+    """Rows for the exporters; the day lists are copied so edits may continue.
+
+    With a RecurrenceSet and the Monday of a week, that week's repeating
+    activities are merged in by time.
+    """
+    days = [(day, list(activities)) for day, activities in schedule.items()]
+    if rules is not None and len(rules):
+        week = rules.week(monday)
+        repeats = {day: [r.activity for r in week[i]] for i, day in enumerate(WEEKDAYS)}
+        days = [(day, list(heapq.merge(acts, repeats.pop(day, []), key=_time_key))) for day, acts in days]
+        days += [(day, acts) for day, acts in repeats.items() if acts]
+    return ({"day": day, "time": act.get("time", ""), "activity": act.get("name", ""), "image": act.get("image", "")}
+            for day, activities in days for act in activities)
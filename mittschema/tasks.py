@@ -0,0 +1,111 @@
+"""Background task queue for long-running work such as exports."""
+import threading
+import time
+
+
+class Cancelled(Exception):
+    """Raised inside a task once it has been cancelled."""
+
+
+class Task:
+    """Handle for one queued unit of work."""
+
+    def __init__(self, label, report):
+        self.label = label
+        self.future = None
+        self._report = report
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def progress(self, n):
+        """Report n units of work done."""
+        self._report(n)
+
+    def check(self):
+        if self._cancel.is_set():
+            raise Cancelled()
+
+    def track(self, items, every=0.25):
+        """Yield items, reporting progress and stopping when cancelled."""
+        last = time.monotonic()
+        n = 0
+        for n, item in enumerate(items, 1):
+            self.check()
+            now = time.monotonic()
+            if now - last >= every:
+                last = now
+                self.progress(n)
+            yield item
+        self.progress(n)
+
+
+class TaskQueue:
+    """Run tasks in submission order on a worker thread.
+
+    Callbacks (``on_progress(task, n)``, ``on_done(task, error)`` and
+    ``on_changed()``) are handed to ``dispatch``, normally ``GLib.idle_add``,
+    so they run on the main loop.  ``error`` is None on success and a
+    Cancelled instance if the task was cancelled.
+    """
+
+    def __init__(self, dispatch, workers=1, name="mittschema-task"):
+        self._dispatch = dispatch
+        self._workers = workers
+        self._name = name
+        self._executor = None
+        self._tasks = []
+        self.on_changed = None
+
+    @property
+    def busy(self):
+        return bool(self._tasks)
+
+    def submit(self, label, fn, on_progress=None, on_done=None):
+        """Queue fn(task); returns the Task."""
+        def report(n):
+            if on_progress:
+                self._dispatch(on_progress, task, n)
+
+        def run():
+            error = None
+            try:
+                task.check()
+                fn(task)
+            except Exception as e:
+                error = e
+            self._dispatch(self._finish, task, error, on_done)
+
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix=self._name)
+        task = Task(label, report)
+        self._tasks.append(task)
+        task.future = self._executor.submit(run)
+        task.future.add_done_callback(
+            lambda f: f.cancelled() and self._dispatch(self._finish, task, Cancelled(), on_done))
+        self._changed()
+        return task
+
+    def _finish(self, task, error, on_done):
+        if task not in self._tasks:
+            return
+        self._tasks.remove(task)
+        if on_done:
+            on_done(task, error)
+        self._changed()
+
+    def _changed(self):
+        if self.on_changed:
+            self.on_changed()
+
+    def cancel_all(self):
+        for task in list(self._tasks):
+            task.cancel()
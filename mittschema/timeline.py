@@ -0,0 +1,125 @@
+"""Activity timeline for the week and a scheduler that sleeps between events.
+
+Times are minutes since Monday 00:00 ("week minutes").  The scheduler takes
+``timeout_add(seconds, fn)`` and ``source_remove(id)``, normally
+``GLib.timeout_add_seconds`` and ``GLib.source_remove``, and wakes only at
+the next clock minute (when a clock is shown), reminder or activity start.
+"""
+import bisect
+import time
+
+DAY = 24 * 60
+WEEK = 7 * DAY
+MAX_SLEEP = 15 * 60  # seconds; re-checks the wall clock after suspend or a clock change
+
+
+def week_minute(lt=None):
+    """Current week minute, from a time.struct_time (local time by default)."""
+    lt = lt or time.localtime()
+    return lt.tm_wday * DAY + lt.tm_hour * 60 + lt.tm_min
+
+
+class Timeline:
+    """Activity starts in week order with O(log n) now/next lookups.
+
+    Entries are ``(day_index, minutes, payload)`` with Monday as day 0.
+    """
+
+    def __init__(self, entries=()):
+        entries = sorted(((d * DAY + m, p) for d, m, p in entries), key=lambda e: e[0])
+        self._starts = [e[0] for e in entries]
+        self._payloads = [e[1] for e in entries]
+
+    def __len__(self):
+        return len(self._starts)
+
+    def current(self, t):
+        """(start, payload) of the activity running at t: the last one started that day."""
+        i = bisect.bisect_right(self._starts, t) - 1
+        if i < 0 or self._starts[i] // DAY != t // DAY:
+            return None
+        return self._starts[i], self._payloads[i]
+
+    def next(self, t):
+        """(start, payload) of the first activity after t, wrapping into next week."""
+        if not self._starts:
+            return None
+        i = bisect.bisect_right(self._starts, t)
+        if i == len(self._starts):
+            return self._starts[0] + WEEK * (t // WEEK + 1), self._payloads[0]
+        return self._starts[i], self._payloads[i]
+
+
+class Scheduler:
+    """Drive a clock, current-activity changes and reminders from a Timeline.
+
+    ``on_tick(struct_time)`` runs each minute when ``clock`` is set,
+    ``on_change(previous, current, transition)`` when the current activity
+    changes (``transition`` is False when a new timeline caused it rather than
+    the time of day) and ``on_reminder(next)`` once, ``remind_before``
+    minutes ahead of each start.
+    """
+
+    def __init__(self, timeout_add, source_remove, on_tick=None, on_change=None, on_reminder=None,
+                 remind_before=5, clock=True, now=time.localtime):
+        self._now = now
+        self._timeout_add = timeout_add
+        self._source_remove = source_remove
+        self.on_tick = on_tick
+        self.on_change = on_change
+        self.on_reminder = on_reminder
+        self.remind_before = remind_before
+        self.clock = clock
+        self.timeline = Timeline()
+        self.current = None
+        self.wakeups = 0
+        self._reminded = None
+        self._source = 0
+
+    def set_timeline(self, timeline):
+        """Swap in a rebuilt timeline and re-evaluate now."""
+        self.timeline = timeline
+        self.current = None  # payloads may name different activities now
+        self.start()
+
+    def start(self):
+        self.stop()
+        self._wake(False)
+
+    def stop(self):
+        if self._source:
+            self._source_remove(self._source)
+            self._source = 0
+
+    def _fire(self):
+        self._source = 0
+        self.wakeups += 1
+        self._wake(True)
+        return False
+
+    def _wake(self, transition):
+        lt = self._now()
+        t = week_minute(lt)
+        cur = self.timeline.current(t)
+        if cur != self.current:
+            prev, self.current = self.current, cur
+            if self.on_change:
+                self.on_change(prev, cur, transition)
+        nxt = self.timeline.next(t)
+        if (transition and nxt and self.on_reminder and 0 < nxt[0] - t <= self.remind_before
+                and self._reminded != nxt[0]):
+            self._reminded = nxt[0]
+            self.on_reminder(nxt)
+        if self.clock and self.on_tick:
+            self.on_tick(lt)
+        self._source = self._timeout_add(self.delay(t, lt.tm_sec), self._fire)
+
+    def delay(self, t, sec=0):
+        """Seconds to sleep from week minute t (plus sec seconds) to the next event."""
+        minutes = [1] if self.clock else [DAY - t % DAY]  # the current activity ends at midnight
+        nxt = self.timeline.next(t)
+        if nxt:
+            minutes.append(nxt[0] - t)
+            if nxt[0] - self.remind_before > t:
+                minutes.append(nxt[0] - self.remind_before - t)
+        return max(1, min(min(minutes) * 60 - sec, MAX_SLEEP))
@@ -0,0 +1,187 @@
+"""Optional timing spans, written as Chrome trace JSON; imports no GTK.
+
+Tracing is off unless MITTSCHEMA_TRACE is set when this module is first
+imported: to a file path, or to 1 for ~/.cache/mittschema/trace-<pid>.json.
+When it is off, ``span()`` returns one shared do-nothing context manager and
+``@traced`` returns the function unchanged, so instrumented code costs next
+to nothing.  When it is on, each span becomes a complete ("X") event with
+its thread, the main-loop latency sampled by ``watch_main_loop`` becomes a
+counter track, and the file is written at exit; open it in chrome://tracing or
+ui.perfetto.dev.  ``summary()`` gives per-span totals for an in-app view.
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+ENV = "MITTSCHEMA_TRACE"
+MAX_EVENTS = 200_000  # oldest events are dropped beyond this; totals are kept
+STALL_MS = 50  # main-loop delays above this are also recorded as spans
+
+
+def _output(value):
+    if value.lower() not in ("1", "yes", "true", "on"):
+        return value
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "mittschema", f"trace-{os.getpid()}.json")
+
+
+class Tracer:
+    """Collects events in memory and keeps count, total and max per span name."""
+
+    def __init__(self, path, max_events=MAX_EVENTS):
+        self.path = path
+        self._events = deque(maxlen=max_events)
+        self._stats = {}  # name -> [count, total ns, max ns]
+        self._threads = {}  # tid -> name
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._t0 = time.perf_counter_ns()
+
+    def complete(self, name, cat, start, end, args=None):
+        """Record a span from start to end (perf_counter_ns)."""
+        thread = threading.current_thread()
+        dur = end - start
+        event = {"name": name, "cat": cat, "ph": "X", "pid": self._pid, "tid": thread.ident,
+                 "ts": (start - self._t0) / 1000, "dur": dur / 1000}
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+            self._threads.setdefault(thread.ident, thread.name)
+            self._total(name, dur)
+
+    def sample(self, name, value):
+        """Record value (ns) as a counter event; it is totalled like a span."""
+        with self._lock:
+            self._events.append({"name": name, "ph": "C", "pid": self._pid, "tid": 0,
+                                 "ts": (time.perf_counter_ns() - self._t0) / 1000, "args": {"ms": value / 1e6}})
+            self._total(name, value)
+
+    def _total(self, name, dur):
+        stats = self._stats.get(name)
+        if stats is None:
+            self._stats[name] = [1, dur, dur]
+        else:
+            stats[0] += 1
+            stats[1] += dur
+            stats[2] = max(stats[2], dur)
+
+    def summary(self):
+        """[(name, count, total ms, max ms)], the most expensive first."""
+        with self._lock:
+            rows = [(name, n, total / 1e6, peak / 1e6) for name, (n, total, peak) in self._stats.items()]
+        return sorted(rows, key=lambda r: -r[2])
+
+    def write(self, path=None):
+        """Write the trace file; returns its path, or None if it could not be written."""
+        from mittschema.persistence import write_atomic
+        path = path or self.path
+        with self._lock:
+            meta = [{"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+                    for tid, name in self._threads.items()]
+            events = meta + list(self._events)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            write_atomic(path, json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}).encode())
+        except OSError as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            return None
+        return path
+
+
+class _Null:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        _tracer.complete(self.name, self.cat, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+NULL = _Null()
+_tracer = Tracer(_output(os.environ[ENV])) if os.environ.get(ENV) else None
+if _tracer is not None:
+    atexit.register(_tracer.write)
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, cat="app", **args):
+    """Context manager timing its block as one span."""
+    if _tracer is None:
+        return NULL
+    return _Span(name, cat, args)
+
+
+def traced(name=None, cat="app"):
+    """Decorator timing every call as a span named name (default: the function's)."""
+    def wrap(fn):
+        if _tracer is None:
+            return fn
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _tracer.complete(label, cat, start, time.perf_counter_ns())
+        return call
+    return wrap
+
+
+def watch_main_loop(timeout_add, interval_ms=100):
+    """Sample how late a repeating timeout fires; pass GLib.timeout_add.
+
+    A busy main loop delays the timeout, so the delay is how long input and
+    redraws were waiting.  Each sample is a "main loop latency" counter;
+    delays over STALL_MS are also recorded as "main loop stall" spans.
+    """
+    if _tracer is None:
+        return
+    due = [time.perf_counter_ns() + interval_ms * 1_000_000]
+
+    def sample():
+        now = time.perf_counter_ns()
+        late = max(now - due[0], 0)
+        _tracer.sample("main loop latency", late)
+        if late > STALL_MS * 1_000_000:
+            _tracer.complete("main loop stall", "main-loop", due[0], now)
+        due[0] = now + interval_ms * 1_000_000
+        return True
+    timeout_add(interval_ms, sample)
+
+
+def summary():
+    return _tracer.summary() if _tracer is not None else []
+
+
+def save(path=None):
+    """Write the trace now (it is also written at exit); returns the path or None."""
+    return _tracer.write(path) if _tracer is not None else None
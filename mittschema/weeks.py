@@ -0,0 +1,128 @@
+"""Concrete weeks stored one file per ISO week; imports no GTK.
+
+``weeks/2026-W42.json`` holds that week's activities in the flat layout.
+A week without a file shows the default week (schedule.json) until its
+first edit, which writes the file.  Only the weeks asked for are opened:
+each is a JournaledStore, kept in a small LRU and flushed when it drops
+out, and neighbours can be opened ahead on a worker thread.  So startup
+reads one week and memory stays flat however many weeks have been kept.
+"""
+import copy
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from mittschema import trace
+from mittschema.persistence import JournaledStore
+from mittschema.recurrence import week_of
+
+
+def week_key(monday):
+    year, week, _ = monday.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class WeekShards:
+    """Per-week JournaledStores under root; ``template()`` returns the default week."""
+
+    def __init__(self, root, template, keep=5, dispatch=None):
+        self.root = root
+        self._template = template
+        self._keep = keep
+        self._dispatch = dispatch
+        self._open = OrderedDict()  # Monday -> JournaledStore
+        self._opening = {}  # Monday -> Future
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(1, thread_name_prefix="mittschema-weeks")
+
+    def path(self, monday):
+        return os.path.join(self.root, week_key(monday) + ".json")
+
+    def exists(self, monday):
+        return os.path.exists(self.path(monday))
+
+    def _load(self, monday):
+        with trace.span("load week", "io", week=week_key(monday)):
+            return JournaledStore(self.path(monday), lambda: copy.deepcopy(self._template()))
+
+    def get(self, monday):
+        """The store for the week starting monday, opening it if needed (blocks)."""
+        monday = week_of(monday)
+        with self._lock:
+            store = self._open.get(monday)
+            if store is not None:
+                self._open.move_to_end(monday)
+                return store
+            future = self._opening.get(monday)
+        store = future.result() if future is not None else self._load(monday)
+        return self._keep_open(monday, store)
+
+    def _keep_open(self, monday, store):
+        evicted = []
+        with self._lock:
+            self._opening.pop(monday, None)
+            store = self._open.setdefault(monday, store)
+            self._open.move_to_end(monday)
+            while len(self._open) > self._keep:
+                evicted.append(self._open.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+        return store
+
+    def get_async(self, monday, callback):
+        """Open the week on the worker and pass its store to callback through dispatch.
+
+        callback gets None if the week could not be opened.
+        """
+        monday = week_of(monday)
+        with self._lock:
+            store = self._open.get(monday)
+            if store is not None:
+                self._open.move_to_end(monday)
+        if store is not None:
+            callback(store)
+            return
+        future = self._submit(monday)
+        future.add_done_callback(lambda f: self._dispatch(self._deliver, monday, f, callback))
+
+    def _deliver(self, monday, future, callback):
+        try:
+            store = self._keep_open(monday, future.result())
+        except Exception as e:  # retrying would fail the same way; leave the file alone
+            print(f"{self.path(monday)}: {e}", file=sys.stderr)
+            with self._lock:
+                self._opening.pop(monday, None)
+            store = None
+        callback(store)
+        return False
+
+    def _submit(self, monday):
+        with self._lock:
+            future = self._opening.get(monday)
+            if future is None:
+                future = self._opening[monday] = self._pool.submit(self._load, monday)
+        return future
+
+    def prefetch(self, mondays):
+        """Open weeks ahead of time, in the background."""
+        for monday in mondays:
+            monday = week_of(monday)
+            with self._lock:
+                if monday in self._open:
+                    continue
+            self._submit(monday).add_done_callback(
+                lambda f, m=monday: f.exception() is None and self._keep_open(m, f.result()))
+
+    def neighbours(self, monday, n=1):
+        return [monday + timedelta(weeks=i) for i in range(-n, n + 1) if i]
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        with self._lock:
+            stores = list(self._open.values())
+            self._open.clear()
+        for store in stores:
+            store.close()
@@ -1,22 +1,67 @@
-"""Accessibility features: zoom, high contrast, ATK."""
+"""Accessibility features: zoom, high contrast, ATK.
+
+The stylesheet is built and loaded once per display.  Zoom steps and high
+contrast are CSS classes on the window, so changing them restyles that
+window only and never reparses CSS.  Key-repeat bursts are coalesced to at
+most one class change per frame.  The scale and contrast are written to
+the settings store, which saves itself in the background.
+"""
 import gi
 gi.require_version('Gtk', '4.0')
-from gi.repository import Gtk, Gdk, Gio
+from gi.repository import Gtk, Gdk, Gio, GLib
+
+ZOOM_STEPS = [p / 100 for p in range(50, 301, 10)]
+
+_CSS = "\n".join(
+    [f'window.zoom-{round(s * 100)} {{ font-size: {s}em; }}' for s in ZOOM_STEPS if s != 1.0]
+    + ['window.high-contrast { border: 2px solid @accent_color; font-weight: bold; }']
+)
+_installed = set()
+
+
+def _zoom_class(scale):
+    return f'zoom-{round(scale * 100)}'
+
+
+def _nearest_step(scale):
+    return min(ZOOM_STEPS, key=lambda s: abs(s - scale))
+
+
+def apply_large_text(window=None, scale=None):
+    """Load the zoom/contrast stylesheet for the display (once) and, given a window, set its zoom."""
+    display = window.get_display() if window is not None else Gdk.Display.get_default()
+    if display is not None and display not in _installed:
+        css = Gtk.CssProvider()
+        css.load_from_string(_CSS)
+        Gtk.StyleContext.add_provider_for_display(display, css, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION + 1)
+        _installed.add(display)
+    if window is not None and scale is not None:
+        for s in ZOOM_STEPS:
+            window.remove_css_class(_zoom_class(s))
+        scale = _nearest_step(scale)
+        if scale != 1.0:
+            window.add_css_class(_zoom_class(scale))
 
 
 class AccessibilityManager:
-    """Manages accessibility features for a GTK4 window."""
+    """Manages accessibility features for a GTK4 window.
+
+    ``settings`` holds ``font_scale`` and ``high_contrast``; pass the app's
+    config store so that changes are saved.
+    """
 
-    def __init__(self, window, app=None):
+    def __init__(self, window, app=None, settings=None):
         self._window = window
         self._app = app or window.get_application()
-        self._font_scale = 1.0
-        self._high_contrast = False
-        self._css = Gtk.CssProvider()
-        Gtk.StyleContext.add_provider_for_display(
-            Gdk.Display.get_default(), self._css,
-            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION + 1
-        )
+        self._settings = settings if settings is not None else {}
+        self._font_scale = _nearest_step(self._settings.get('font_scale', 1.0))
+        self._high_contrast = bool(self._settings.get('high_contrast', False))
+        self._applied_scale = None
+        self._tick_id = 0
+        apply_large_text(window, self._font_scale)
+        self._applied_scale = self._font_scale
+        if self._high_contrast:
+            window.add_css_class('high-contrast')
         self._setup_actions()
 
     def _setup_actions(self):
@@ -35,27 +80,39 @@ class AccessibilityManager:
                 self._app.add_action(action)
                 self._app.set_accels_for_action(f'app.{name}', accels)
 
-    def _apply_css(self):
-        css = f'window {{ font-size: {self._font_scale}em; }}'
-        if self._high_contrast:
-            css += """
-            window.high-contrast {
-                border: 2px solid @accent_color;
-                font-weight: bold;
-            }"""
-        self._css.load_from_string(css.encode())
+    @property
+    def font_scale(self):
+        return self._font_scale
+
+    def _set_scale(self, scale):
+        self._font_scale = _nearest_step(scale)
+        if not self._tick_id:
+            # Apply on the next frame; further presses before then only move the target.
+            self._tick_id = self._window.add_tick_callback(self._on_tick)
+        self._changed()
+
+    def _on_tick(self, widget, clock):
+        self._tick_id = 0
+        if self._font_scale != self._applied_scale:
+            if self._applied_scale != 1.0:
+                widget.remove_css_class(_zoom_class(self._applied_scale))
+            if self._font_scale != 1.0:
+                widget.add_css_class(_zoom_class(self._font_scale))
+            self._applied_scale = self._font_scale
+        return GLib.SOURCE_REMOVE
+
+    def _changed(self):
+        self._settings['font_scale'] = self._font_scale
+        self._settings['high_contrast'] = self._high_contrast
 
     def _zoom_in(self):
-        self._font_scale = min(self._font_scale + 0.1, 3.0)
-        self._apply_css()
+        self._set_scale(min(self._font_scale + 0.1, ZOOM_STEPS[-1]))
 
     def _zoom_out(self):
-        self._font_scale = max(self._font_scale - 0.1, 0.5)
-        self._apply_css()
+        self._set_scale(max(self._font_scale - 0.1, ZOOM_STEPS[0]))
 
     def _zoom_reset(self):
-        self._font_scale = 1.0
-        self._apply_css()
+        self._set_scale(1.0)
 
     def _toggle_hc(self):
         self._high_contrast = not self._high_contrast
@@ -63,4 +120,4 @@ class AccessibilityManager:
             self._window.add_css_class('high-contrast')
         else:
             self._window.remove_css_class('high-contrast')
-        self._apply_css()
+        self._changed()
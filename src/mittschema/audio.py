@@ -0,0 +1,248 @@
+"""Notification sounds through one long-lived backend.
+
+The backend is chosen once: a GSound (libcanberra) context, else reused
+GStreamer playbins kept prerolled per sound, else ``canberra-gtk-play`` or
+``paplay`` spawned from the main loop.  Sounds play through a queue whose
+overlap policy decides what happens when one is requested while another is
+still playing: ``"queue"`` plays it afterwards, ``"restart"`` cuts the current
+one, ``"drop"`` ignores it.  Start latency is recorded where the backend
+can tell when playback begins: GStreamer reports it, while GSound and the
+spawned players only report when a sound ends, so they record none.
+"""
+import os
+import shutil
+import sys
+import time
+from collections import OrderedDict, deque
+
+SOUND_DIRS = ["/usr/share/sounds/freedesktop/stereo"]
+EXTENSIONS = (".oga", ".ogg", ".wav")
+
+
+def sound_file(name):
+    for d in SOUND_DIRS:
+        for ext in EXTENSIONS:
+            path = os.path.join(d, name + ext)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+class _CanberraBackend:
+    name = "canberra"
+    measures_start = False  # play_full only calls back once the sound has finished
+
+    def __init__(self):
+        import gi
+        gi.require_version("GSound", "1.0")
+        from gi.repository import Gio, GSound
+        self._gsound = GSound
+        self._gio = Gio
+        self._ctx = GSound.Context()
+        self._ctx.init()
+        self._cancel = None
+
+    def preload(self, name):
+        self._ctx.cache({self._gsound.ATTR_EVENT_ID: name})
+
+    def start(self, name, started, done):
+        self._cancel = self._gio.Cancellable()
+        self._ctx.play_full({self._gsound.ATTR_EVENT_ID: name}, self._cancel, lambda *_: done())
+
+    def stop(self):
+        if self._cancel:
+            self._cancel.cancel()
+            self._cancel = None
+
+
+class _GstBackend:
+    name = "gstreamer"
+    measures_start = True
+    _AUDIO_ONLY = 0x2  # GST_PLAY_FLAG_AUDIO
+
+    def __init__(self, cache_size=8):
+        import gi
+        gi.require_version("Gst", "1.0")
+        from gi.repository import Gst
+        Gst.init(None)
+        if Gst.ElementFactory.find("playbin") is None:
+            raise ImportError("playbin is not available")
+        self._gst = Gst
+        self._bins = OrderedDict()  # name -> prerolled playbin, least recently used first
+        self._cache_size = cache_size
+        self._playing = None
+        self._started = self._done = None
+
+    def _bin(self, name):
+        pb = self._bins.get(name)
+        if pb is not None:
+            self._bins.move_to_end(name)
+            return pb
+        path = sound_file(name)
+        if path is None:
+            return None
+        Gst = self._gst
+        pb = Gst.ElementFactory.make("playbin", None)
+        pb.set_property("uri", Gst.filename_to_uri(path))
+        pb.set_property("flags", self._AUDIO_ONLY)
+        bus = pb.get_bus()
+        bus.add_signal_watch()
+        bus.connect("message", self._on_message, pb)
+        pb.set_state(Gst.State.PAUSED)  # preroll: decoded and ready to go
+        self._bins[name] = pb
+        while len(self._bins) > self._cache_size:
+            _, old = self._bins.popitem(last=False)
+            old.get_bus().remove_signal_watch()
+            old.set_state(Gst.State.NULL)
+        return pb
+
+    def preload(self, name):
+        self._bin(name)
+
+    def start(self, name, started, done):
+        pb = self._bin(name)
+        if pb is None:
+            done()
+            return
+        self._playing, self._started, self._done = pb, started, done
+        pb.seek_simple(self._gst.Format.TIME, self._gst.SeekFlags.FLUSH, 0)
+        pb.set_state(self._gst.State.PLAYING)
+
+    def stop(self):
+        pb, self._playing = self._playing, None
+        if pb is not None:
+            pb.set_state(self._gst.State.PAUSED)
+            pb.seek_simple(self._gst.Format.TIME, self._gst.SeekFlags.FLUSH, 0)
+
+    def _on_message(self, bus, msg, pb):
+        T = self._gst.MessageType
+        if pb is not self._playing:
+            return
+        if msg.type == T.STATE_CHANGED and msg.src is pb and msg.parse_state_changed()[1] == self._gst.State.PLAYING:
+            if self._started:
+                self._started()
+                self._started = None
+        elif msg.type in (T.EOS, T.ERROR):
+            if msg.type == T.ERROR:
+                print(f"Sound: {msg.parse_error()[0].message}", file=sys.stderr)
+            self.stop()
+            self._done()
+
+
+class _CommandBackend:
+    measures_start = False  # a spawned player's start is not visible from here
+
+    def __init__(self):
+        for cmd in ("canberra-gtk-play", "paplay"):
+            if shutil.which(cmd):
+                self.name = cmd
+                break
+        else:
+            raise ImportError("no sound player found")
+        from gi.repository import GLib
+        self._glib = GLib
+        self._pid = None
+
+    def preload(self, name):
+        pass
+
+    def start(self, name, started, done):
+        GLib = self._glib
+        if self.name == "paplay":
+            path = sound_file(name)
+            if path is None:
+                done()
+                return
+            argv = ["paplay", path]
+        else:
+            argv = ["canberra-gtk-play", "-i", name]
+        try:
+            pid = GLib.spawn_async(argv, flags=GLib.SpawnFlags.SEARCH_PATH | GLib.SpawnFlags.DO_NOT_REAP_CHILD |
+                                   GLib.SpawnFlags.STDOUT_TO_DEV_NULL | GLib.SpawnFlags.STDERR_TO_DEV_NULL)[0]
+        except GLib.Error as e:
+            print(f"Sound: {e.message}", file=sys.stderr)
+            done()
+            return
+        self._pid = pid
+
+        def reaped(pid, status):
+            GLib.spawn_close_pid(pid)
+            if self._pid == pid:
+                self._pid = None
+                done()
+        GLib.child_watch_add(GLib.PRIORITY_DEFAULT, pid, reaped)
+
+    def stop(self):
+        self._pid = None  # let it finish; the next sound starts right away
+
+
+class AudioPlayer:
+    """Play named freedesktop sounds with a queue and an overlap policy."""
+
+    BACKENDS = (_CanberraBackend, _GstBackend, _CommandBackend)
+
+    def __init__(self, overlap="queue", max_queued=3, preload=("complete", "bell")):
+        self.overlap = overlap
+        self.backend = None
+        for cls in self.BACKENDS:
+            try:
+                self.backend = cls()
+                break
+            except Exception as e:  # ImportError, ValueError from gi, or GLib.Error
+                last = e
+        print(f"Sound backend: {self.backend.name if self.backend else f'none ({last})'}", file=sys.stderr)
+        self.latencies = deque(maxlen=100)  # seconds from play() to playback start, if the backend reports it
+        self._queue = deque(maxlen=max_queued)
+        self._busy = False
+        self._token = 0
+        if self.backend:
+            for name in preload:
+                try:
+                    self.backend.preload(name)
+                except Exception as e:
+                    print(f"Sound {name}: {e}", file=sys.stderr)
+
+    def play(self, name):
+        if self.backend is None:
+            return
+        requested = time.perf_counter()
+        if self._busy:
+            if self.overlap == "drop":
+                return
+            if self.overlap == "queue":
+                self._queue.append((name, requested))
+                return
+            self.backend.stop()
+        self._start(name, requested)
+
+    def _start(self, name, requested):
+        self._busy = True
+        self._token += 1
+        token = self._token
+        self.backend.start(name, lambda: self.latencies.append(time.perf_counter() - requested),
+                           lambda: self._done(token))
+
+    def _done(self, token):
+        if token != self._token:
+            return  # a sound cut short by "restart"
+        self._busy = False
+        if self._queue:
+            name, _ = self._queue.popleft()
+            self._start(name, time.perf_counter())
+
+    def latency_ms(self):
+        """Median start latency in milliseconds, or None before anything played."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[len(ordered) // 2] * 1000
+
+
+_player = None
+
+def get_player():
+    """The process-wide player, created (and its backend reported) on first use."""
+    global _player
+    if _player is None:
+        _player = AudioPlayer()
+    return _player
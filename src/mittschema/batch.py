@@ -0,0 +1,99 @@
+"""Batch export of every profile into one zip archive."""
+import csv
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from mittschema.export import export_csv, export_json, export_pdf, pdf_available
+from mittschema.profiles import ProfileManager
+
+FORMATS = {"csv": export_csv, "json": export_json, "pdf": export_pdf}
+
+
+def profile_rows(data, day_names=None, period_names=None):
+    """Yield export rows for a {day: {period: [activity]}} profile schedule."""
+    for d, periods in data.items():
+        if not isinstance(periods, dict):
+            continue
+        for p, acts in periods.items():
+            if not isinstance(acts, list):
+                continue
+            day = day_names[int(d)] if day_names and d.isdigit() and int(d) < len(day_names) else d
+            period = period_names[int(p)] if period_names and p.isdigit() and int(p) < len(period_names) else p
+            for a in acts:
+                if isinstance(a, dict):
+                    yield {"date": day, "details": f'{period}: {a.get("name", "")}', "result": ""}
+
+
+def _render_profile(app_name, backend, name, formats, outdir, day_names, period_names):
+    """Worker: load one profile and write each format into outdir."""
+    t0 = time.perf_counter()
+    data = ProfileManager(app_name, backend).load_data(name)
+    timings = {"load": time.perf_counter() - t0}
+    files = []
+    for fmt in formats:
+        path = os.path.join(outdir, f"{name}.{fmt}")
+        t0 = time.perf_counter()
+        FORMATS[fmt](profile_rows(data, day_names, period_names), path)
+        timings[fmt] = time.perf_counter() - t0
+        files.append((f"{name}/schedule.{fmt}", path))
+    return name, files, timings
+
+
+def export_all_profiles(app_name, out_path, backend="json", formats=None,
+                        day_names=None, period_names=None, workers=None, task=None, names=None):
+    """Render every profile in a process pool and stream the files into one zip.
+
+    formats defaults to csv, json and, when pycairo is installed, pdf.
+    Returns a list of per-profile timing dicts (seconds), which is also
+    written to the archive as timings.csv.  If task (a tasks.Task) is given
+    it is checked between profiles so the batch can be cancelled.  names
+    defaults to every profile, listed by a fresh ProfileManager.
+    """
+    if formats is None:
+        formats = ("csv", "json", "pdf") if pdf_available() else ("csv", "json")
+    if names is None:
+        names = ProfileManager(app_name, backend).list_profiles()
+    report = []
+    outdir = tempfile.mkdtemp(prefix="mittschema-batch-")
+    # spawn: the caller may be a threaded GTK process, which must not fork.
+    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        with zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            pending = {pool.submit(_render_profile, app_name, backend, n, formats, outdir,
+                                   day_names, period_names) for n in names}
+            submitted = time.perf_counter()
+            while pending:
+                done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                if task is not None:
+                    task.check()
+                for future in done:
+                    name, files, timings = future.result()
+                    for arcname, path in files:
+                        zf.write(path, arcname)
+                        os.remove(path)
+                    timings["profile"] = name
+                    timings["finished"] = time.perf_counter() - submitted
+                    report.append(timings)
+                    if task is not None:
+                        task.progress(len(report))
+            buf = io.StringIO()
+            writer = csv.DictWriter(buf, ["profile", "load", *formats, "finished"])
+            writer.writeheader()
+            writer.writerows({k: (f"{v:.4f}" if isinstance(v, float) else v) for k, v in r.items()} for r in report)
+            zf.writestr("timings.csv", buf.getvalue())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(outdir, ignore_errors=True)
+    return report
+
+
+def slowest(report):
+    """(profile, seconds) of the profile that took longest to load and render in a report."""
+    r = max(report, key=lambda r: sum(v for k, v in r.items() if k not in ("profile", "finished")))
+    return r["profile"], sum(v for k, v in r.items() if k not in ("profile", "finished"))
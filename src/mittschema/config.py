@@ -0,0 +1,153 @@
+"""The app's small JSON config files, served from memory.
+
+Each file is a ConfigStore, read once on first use.  Changing a value
+notifies the store's listeners and marks it dirty.  One background thread
+writes all dirty stores together, ``delay`` seconds after the last change,
+through the same synced-temp-file-and-rename as the schedule snapshots.
+The config root follows XDG_CONFIG_HOME the way GLib.get_user_config_dir does.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+from mittschema.persistence import write_atomic
+
+_MISSING = object()
+
+
+def config_dir(app_name="mittschema"):
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, app_name)
+
+
+class ConfigStore:
+    """One JSON object file, used like a dict; assignments are saved in the background."""
+
+    def __init__(self, service, path, default=None):
+        self._service = service
+        self.path = path
+        self._listeners = []
+        try:
+            with open(path, "rb") as f:
+                self.data = json.loads(f.read())
+        except FileNotFoundError:
+            self.data = dict(default or {})
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            self.data = dict(default or {})
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __setitem__(self, key, value):
+        self.update({key: value})
+
+    def update(self, values):
+        changed = {k: v for k, v in values.items() if self.data.get(k, _MISSING) != v}
+        if not changed:
+            return
+        with self._service._lock:
+            self.data.update(changed)
+        self._service._mark(self)
+        for key, value in changed.items():
+            for fn in list(self._listeners):
+                fn(self, key, value)
+
+    def connect(self, fn):
+        """Call fn(store, key, value) after each change."""
+        self._listeners.append(fn)
+        return fn
+
+    def disconnect(self, fn):
+        self._listeners.remove(fn)
+
+
+class ConfigService:
+    """Owns the config stores of one app and their background writer."""
+
+    def __init__(self, app_name="mittschema", root=None, delay=0.5):
+        self.root = root or config_dir(app_name)
+        self._delay = delay
+        self._stores = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()
+        self._last_change = 0.0
+        self._thread = None
+        self._closed = False
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def store(self, name, default=None):
+        """The store for <root>/<name>.json, read from disk the first time only."""
+        s = self._stores.get(name)
+        if s is None:
+            s = self._stores[name] = ConfigStore(self, self.path(name + ".json"), default)
+        return s
+
+    def _mark(self, store):
+        with self._lock:
+            self._dirty.add(store)
+            self._last_change = time.monotonic()
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="mittschema-config", daemon=True)
+                self._thread.start()
+            self._wake.notify()
+
+    def _run(self):
+        with self._lock:
+            while not self._closed:
+                if not self._dirty:
+                    self._wake.wait()
+                    continue
+                wait = self._last_change + self._delay - time.monotonic()
+                if wait > 0:
+                    self._wake.wait(wait)
+                    continue
+                self._lock.release()
+                try:
+                    self.flush()
+                finally:
+                    self._lock.acquire()
+
+    def flush(self):
+        """Write every dirty store now."""
+        with self._write_lock:
+            with self._lock:
+                batch = [(s.path, json.dumps(s.data, ensure_ascii=False, indent=2).encode()) for s in self._dirty]
+                self._dirty.clear()
+            for path, raw in batch:
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    write_atomic(path, raw)
+                except OSError as e:
+                    print(f"{path}: {e}", file=sys.stderr)
+
+    def close(self):
+        """Write outstanding changes and stop the writer."""
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        self.flush()
+
+
+_services = {}
+
+def get_config(app_name="mittschema"):
+    """The process-wide service for app_name; it is flushed at exit."""
+    s = _services.get(app_name)
+    if s is None:
+        s = _services[app_name] = ConfigService(app_name)
+        atexit.register(s.close)
+    return s
@@ -1,10 +1,11 @@
 """Export functionality for mittschema."""
 import csv
+import gzip
 import json
 import gettext
 import os
 from datetime import datetime
-from mittschema import __version__
+from mittschema import __version__, trace
 
 _ = gettext.gettext
 
@@ -16,9 +17,22 @@ def _footer():
     return f"{APP_LABEL} v{__version__} — {WEBSITE}"
 
 
-def export_csv(data, filepath):
-    """Export data to CSV with branding footer."""
-    with open(filepath, "w", newline="", encoding="utf-8") as f:
+def _open(filepath, compress=None):
+    """Open filepath for writing text, gzip-compressed if asked or named *.gz."""
+    if compress is None:
+        compress = str(filepath).endswith(".gz")
+    if compress:
+        return gzip.open(filepath, "wt", newline="", encoding="utf-8")
+    return open(filepath, "w", newline="", encoding="utf-8")
+
+
+@trace.traced("export csv", "export")
+def export_csv(data, filepath, compress=None):
+    """Export data to CSV with branding footer.
+
+    data may be any iterable of entries; rows are streamed to the file.
+    """
+    with _open(filepath, compress) as f:
         writer = csv.writer(f)
         writer.writerow([_("Date"), _("Details"), _("Result")])
         for entry in data:
@@ -27,24 +41,78 @@ def export_csv(data, filepath):
         writer.writerow([_footer()])
 
 
-def export_json(data, filepath):
-    """Export data to JSON with branding."""
-    out = {
+@trace.traced("export json", "export")
+def export_json(data, filepath, compress=None):
+    """Export data to JSON with branding, streaming one entry per line."""
+    head = {
         "app": APP_LABEL,
         "version": __version__,
         "_website": WEBSITE,
         "exported": datetime.now().isoformat(),
-        "data": data,
     }
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
+    with _open(filepath, compress) as f:
+        f.write(json.dumps(head, ensure_ascii=False)[:-1] + ', "data": [')
+        sep = "\n"
+        for entry in data:
+            f.write(sep)
+            f.write(json.dumps(entry, ensure_ascii=False))
+            sep = ",\n"
+        f.write("\n]}\n")
+
+
+@trace.traced("export ndjson", "export")
+def export_ndjson(data, filepath, compress=None):
+    """Export data as newline-delimited JSON, one entry per line."""
+    with _open(filepath, compress) as f:
+        for entry in data:
+            f.write(json.dumps(entry, ensure_ascii=False))
+            f.write("\n")
 
 
-def export_pdf(data, filepath):
-    """Export data to simple text-PDF with branding footer."""
-    lines = [f"{APP_LABEL} — {_('Export')}", ""]
+def _pdf_lines(data):
     for entry in data:
-        lines.append(f"{entry.get('date', '')} | {entry.get('details', '')} | {entry.get('result', '')}")
-    lines.extend(["", _footer()])
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+        yield f"{entry.get('date', '')} | {entry.get('details', '')} | {entry.get('result', '')}"
+
+
+def pdf_available():
+    """Whether export_pdf can run: it needs pycairo."""
+    try:
+        import cairo  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@trace.traced("export pdf", "export")
+def export_pdf(data, filepath, compress=None):
+    """Export data to PDF with branding footer.
+
+    Needs pycairo (RuntimeError without it); PDF output is never gzipped.
+    """
+    if compress or str(filepath).endswith(".gz"):
+        raise ValueError(_("PDF export cannot be gzip-compressed"))
+    try:
+        import cairo
+    except ImportError:
+        raise RuntimeError(_("PDF export needs pycairo")) from None
+
+    width, height = 595, 842
+    surface = cairo.PDFSurface(str(filepath), width, height)
+    ctx = cairo.Context(surface)
+    ctx.set_font_size(20)
+    ctx.move_to(40, 50)
+    ctx.show_text(f"{APP_LABEL} — {_('Export')}")
+    ctx.set_font_size(11)
+    y = 90
+    for line in _pdf_lines(data):
+        if y > height - 50:
+            surface.show_page()
+            y = 40
+        ctx.move_to(40, y)
+        ctx.show_text(line[:90])
+        y += 18
+    ctx.set_font_size(9)
+    ctx.set_source_rgb(0.5, 0.5, 0.5)
+    ctx.move_to(40, height - 20)
+    ctx.show_text(f"{_footer()} — {datetime.now().strftime('%Y-%m-%d')}")
+    surface.finish()
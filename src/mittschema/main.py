@@ -1,13 +1,19 @@
-import os
 """Mitt schema - Weekly visual schedule."""
 import sys, os, json, gettext, locale
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, Gio, GLib, Gdk
-from mittschema import __version__
+from mittschema import __version__, trace
 from mittschema.accessibility import apply_large_text
 from mittschema.accessibility import AccessibilityManager
+from mittschema.config import config_dir, get_config
+from mittschema.images import get_image_cache
+from mittschema.persistence import JournaledStore
+from mittschema.profiles import ProfileManager
+from mittschema.tasks import Cancelled, TaskQueue
+from mittschema.timeline import Scheduler, Timeline
+from mittschema.undo_redo import Delete, Insert, Move, UndoRedoManager
 
 TEXTDOMAIN = "mittschema"
 for p in [os.path.join(os.path.dirname(__file__), "locale"), "/usr/share/locale"]:
@@ -18,11 +24,15 @@ for p in [os.path.join(os.path.dirname(__file__), "locale"), "/usr/share/locale"
 gettext.textdomain(TEXTDOMAIN)
 _ = gettext.gettext
 
-CONFIG_DIR = os.path.join(GLib.get_user_config_dir(), "mittschema")
+CONFIG_DIR = config_dir()
 SCHEDULE_FILE = os.path.join(CONFIG_DIR, "schedule.json")
 
+EXPORTS = TaskQueue(GLib.idle_add, name="mittschema-export")
+
 DAYS = [_("Monday"), _("Tuesday"), _("Wednesday"), _("Thursday"), _("Friday"), _("Saturday"), _("Sunday")]
 PERIODS = [_("Morning"), _("Afternoon"), _("Evening")]
+PERIOD_STARTS = [8 * 60, 12 * 60, 17 * 60]  # minutes since midnight
+CELL_IMAGE = 64  # picture height in a grid cell, in logical pixels
 DEFAULT_ACTIVITIES = [
     {"name": _("School"), "emoji": "\U0001f3eb"},
     {"name": _("Lunch"), "emoji": "\U0001f35d"},
@@ -36,35 +46,28 @@ DEFAULT_ACTIVITIES = [
     {"name": _("Free time"), "emoji": "\u2b50"},
 ]
 
+_store = None
+
+def _schedule_store(**kwargs):
+    global _store
+    if _store is None:
+        _store = JournaledStore(SCHEDULE_FILE, lambda: {str(d): {str(p): [] for p in range(3)} for d in range(7)},
+                                **kwargs)
+    return _store
+
+@trace.traced("load schedule", "io")
 def _load_schedule():
-    try:
-        with open(SCHEDULE_FILE) as f: return json.load(f)
-    except: return {d: {p: [] for p in range(3)} for d in range(7)}
+    return _schedule_store().data
 
+@trace.traced("save schedule", "io")
 def _save_schedule(s):
-    os.makedirs(CONFIG_DIR, exist_ok=True)
-    with open(SCHEDULE_FILE, "w") as f: json.dump(s, f, ensure_ascii=False, indent=2)
-
+    _schedule_store().set([], s)
 
 
-def _settings_path():
-    xdg = os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
-    d = os.path.join(xdg, "mittschema")
-    os.makedirs(d, exist_ok=True)
-    return os.path.join(d, "settings.json")
 
 def _load_settings():
-    p = _settings_path()
-    if os.path.exists(p):
-        import json
-        with open(p) as f:
-            return json.load(f)
-    return {}
-
-def _save_settings(s):
-    import json
-    with open(_settings_path(), "w") as f:
-        json.dump(s, f, indent=2)
+    """settings.json as a config store: read once, saved in the background on change."""
+    return get_config().store("settings")
 
 class ScheduleApp(Adw.Application):
     def __init__(self):
@@ -73,24 +76,88 @@ class ScheduleApp(Adw.Application):
 
     def do_activate(self):
         apply_large_text()
-        win = self.props.active_window or ScheduleWindow(application=self)
+        win = self.props.active_window
+        if win is None:
+            win = ScheduleWindow(application=self)
+            _restore_session(win, "mittschema")
+            self.a11y = AccessibilityManager(win, self, self.settings)
         win.present()
         if not self.settings.get("welcome_shown"):
             self._show_welcome(win)
 
+    # ── Welcome Dialog ───────────────────────────────────────
+
+    @trace.traced("dialog: welcome", "dialog")
+    def _show_welcome(self, win):
+        dialog = Adw.Dialog()
+        dialog.set_title(_("Welcome"))
+        dialog.set_content_width(420)
+        dialog.set_content_height(480)
+
+        page = Adw.StatusPage()
+        page.set_icon_name("mittschema")
+        page.set_title(_("Welcome to My Schedule"))
+        page.set_description(_(
+            "A weekly visual schedule for structure and routine.\n\n✓ Plan activities for each day\n✓ Visual weekly overview\n✓ Color-coded activities\n✓ Simple and clear layout"
+        ))
+
+        btn = Gtk.Button(label=_("Get Started"))
+        btn.add_css_class("suggested-action")
+        btn.add_css_class("pill")
+        btn.set_halign(Gtk.Align.CENTER)
+        btn.set_margin_top(12)
+        btn.connect("clicked", self._on_welcome_close, dialog)
+        page.set_child(btn)
+
+        box = Adw.ToolbarView()
+        hb = Adw.HeaderBar()
+        hb.set_show_title(False)
+        box.add_top_bar(hb)
+        box.set_content(page)
+        dialog.set_child(box)
+        dialog.present(win)
+
+    def _on_welcome_close(self, btn, dialog):
+        self.settings["welcome_shown"] = True
+        dialog.close()
 
     def do_startup(self):
         Adw.Application.do_startup(self)
+        self.settings = _load_settings()
+        # The profile index follows the directory through a file monitor, not rescans.
+        self.profiles = ProfileManager("mittschema")
+        self.profiles.watch()
+        from mittschema.plugins import PluginManager
+        self.plugins = PluginManager("mittschema")
         for name, cb, accel in [
             ("quit", lambda *_: self.quit(), "<Control>q"),
             ("about", self._on_about, None),
             ("export", self._on_export, "<Control>e"),
+            ("export-all", self._on_export_all, None),
+            ("plugins", self._on_plugins, None),
+            ("trace", self._on_trace, None),
         ]:
             a = Gio.SimpleAction.new(name, None)
             a.connect("activate", cb)
             self.add_action(a)
             if accel: self.set_accels_for_action(f"app.{name}", [accel])
-
+        self.set_accels_for_action("win.undo", ["<Control>z"])
+        self.set_accels_for_action("win.redo", ["<Control><Shift>z", "<Control>y"])
+        # Pick and report the sound backend once the first frame is up.
+        GLib.idle_add(_init_audio)
+        trace.watch_main_loop(GLib.timeout_add)
+
+    def do_shutdown(self):
+        for win in self.get_windows():
+            if isinstance(win, ScheduleWindow):
+                win.save_history()
+        if _store:
+            _store.close()
+        get_config().close()
+        trace.save()
+        Adw.Application.do_shutdown(self)
+
+    @trace.traced("dialog: about", "dialog")
     def _on_about(self, *_):
         d = Adw.AboutDialog(application_name=_("My Schedule"), application_icon="mittschema",
             version=__version__, developer_name="Daniel Nylander", website="https://www.autismappar.se",
@@ -98,17 +165,102 @@ class ScheduleApp(Adw.Application):
             copyright="\u00a9 2026 Daniel Nylander")
         d.present(self.props.active_window)
 
+    @trace.traced("dialog: plugins", "dialog")
+    def _on_plugins(self, *_):
+        """Show per-plugin import and hook times."""
+        page = Adw.PreferencesPage()
+        group = Adw.PreferencesGroup(title=_("Plugins"))
+        page.add(group)
+        if not self.plugins.plugins:
+            group.set_description(_("No plugins installed"))
+        for p in sorted(self.plugins.plugins.values(), key=lambda p: -(p.import_time + p.hook_time)):
+            if p.error:
+                state = _("Error: %s") % p.error
+            elif p.module is None:
+                state = _("Not loaded")
+            else:
+                state = _("Import %.1f ms") % (p.import_time * 1000)
+            hooks = _("Hooks %.1f ms in %d calls") % (p.hook_time * 1000, p.calls)
+            group.add(Adw.ActionRow(title=p.name, subtitle=f"{state} · {hooks}\n{', '.join(p.hooks)}"))
+        d = Adw.Dialog(title=_("Plugin Diagnostics"), content_width=420, content_height=480)
+        view = Adw.ToolbarView()
+        view.add_top_bar(Adw.HeaderBar())
+        view.set_content(page)
+        d.set_child(view)
+        d.present(self.props.active_window)
+
+    def _on_trace(self, *_):
+        """Show span totals and main-loop latency while MITTSCHEMA_TRACE is set."""
+        page = Adw.PreferencesPage()
+        group = Adw.PreferencesGroup(title=_("Spans"), description=_("Slowest first"))
+        page.add(group)
+        for name, n, total, peak in trace.summary():
+            group.add(Adw.ActionRow(title=name, subtitle=_("%d × · %.1f ms total · %.1f ms mean · %.1f ms max") % (
+                n, total, total / n, peak)))
+
+        def on_save(*_):
+            path = trace.save()
+            group.set_description(_("Saved to %s") % path if path else _("Could not save the trace"))
+        save_btn = Gtk.Button(label=_("Save Trace"))
+        save_btn.connect("clicked", on_save)
+        header = Adw.HeaderBar()
+        header.pack_start(save_btn)
+        d = Adw.Dialog(title=_("Performance Trace"), content_width=480, content_height=520)
+        view = Adw.ToolbarView()
+        view.add_top_bar(header)
+        view.set_content(page)
+        d.set_child(view)
+        d.present(self.props.active_window)
+
     def _on_export(self, *_):
         w = self.props.active_window
         if w: w.do_export()
 
+    def _on_export_all(self, *_):
+        w = self.props.active_window
+        if w: w.do_export_all()
+
+
+class _CellEdits:
+    """Undo target: store edits that re-render the touched cell."""
+
+    def __init__(self, win):
+        self._win = win
+
+    def insert(self, path, index, value):
+        _schedule_store().insert(path, index, value)
+        self._win._cell_changed(path)
+
+    def delete(self, path, index):
+        act = _schedule_store().delete(path, index)
+        self._win._cell_changed(path)
+        return act
+
+    def set(self, path, value):
+        _schedule_store().set(path, value)
+        self._win._cell_changed(path)
+
 
 class ScheduleWindow(Adw.ApplicationWindow):
     def __init__(self, **kwargs):
         super().__init__(**kwargs, default_width=800, default_height=650, title=_("My Schedule"))
-        self.schedule = _load_schedule()
+        self.schedule = {}
+        self._cells = {}  # (day, period) -> Gtk.StringList of activity labels
+        self._cell_cards = {}
+        self._add_btns = []
+        self._loaded = False
+        self.history = UndoRedoManager(path=os.path.join(CONFIG_DIR, "undo.json"))
+        self.edits = _CellEdits(self)
         self._build_ui()
-
+        Gio.File.new_for_path(SCHEDULE_FILE).load_contents_async(None, self._on_schedule_loaded)
+        self._lit = None
+        self.clock = Scheduler(GLib.timeout_add_seconds, GLib.source_remove, on_tick=self._update_clock,
+                               on_change=self._on_period_changed, on_reminder=self._on_reminder)
+        self.clock.start()
+        self.connect("destroy", self._on_destroy)
+        self.connect("close-request", self._on_close_request)
+
+    @trace.traced("build ui", "ui")
     def _build_ui(self):
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         self.set_content(box)
@@ -116,16 +268,36 @@ class ScheduleWindow(Adw.ApplicationWindow):
         box.append(header)
 
         menu = Gio.Menu()
+        menu.append(_("Undo"), "win.undo")
+        menu.append(_("Redo"), "win.redo")
         menu.append(_("Export"), "app.export")
+        menu.append(_("Export All Profiles"), "app.export-all")
+        menu.append(_("Plugin Diagnostics"), "app.plugins")
+        if trace.enabled():
+            menu.append(_("Performance Trace"), "app.trace")
         menu.append(_("About My Schedule"), "app.about")
         menu.append(_("Quit"), "app.quit")
         header.pack_end(Gtk.MenuButton(icon_name="open-menu-symbolic", menu_model=menu))
+        for name, fn in (("undo", self.history.undo), ("redo", self.history.redo)):
+            a = Gio.SimpleAction.new(name, None)
+            a.connect("activate", lambda a, p, fn=fn: fn(self.edits))
+            a.set_enabled(False)
+            self.add_action(a)
+        self.history.on_changed = lambda: (
+            self.lookup_action("undo").set_enabled(self.history.can_undo()),
+            self.lookup_action("redo").set_enabled(self.history.can_redo()))
 
         theme_btn = Gtk.Button(icon_name="weather-clear-night-symbolic",
                                tooltip_text=_("Toggle dark/light theme"))
         theme_btn.connect("clicked", self._toggle_theme)
         header.pack_end(theme_btn)
 
+        cancel_btn = Gtk.Button(icon_name="process-stop-symbolic", tooltip_text=_("Cancel Export"),
+                                visible=EXPORTS.busy)
+        cancel_btn.connect("clicked", lambda *_: EXPORTS.cancel_all())
+        header.pack_end(cancel_btn)
+        EXPORTS.on_changed = lambda: cancel_btn.set_visible(EXPORTS.busy)
+
         # Week grid
         scroll = Gtk.ScrolledWindow(vexpand=True)
         grid = Gtk.Grid(column_homogeneous=True, row_homogeneous=False,
@@ -149,18 +321,25 @@ class ScheduleWindow(Adw.ApplicationWindow):
                 cell = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
                 cell.add_css_class("card")
                 cell.set_size_request(90, 80)
-
-                key_d = str(col)
-                key_p = str(row)
-                activities = self.schedule.get(key_d, {}).get(key_p, [])
-
-                for act in activities:
-                    act_label = Gtk.Label(label=f'{act.get("emoji", "")} {act.get("name", "")}')
-                    act_label.set_wrap(True)
-                    cell.append(act_label)
-
-                add_btn = Gtk.Button(icon_name="list-add-symbolic")
+                drop = Gtk.DropTarget.new(str, Gdk.DragAction.MOVE)
+                drop.connect("drop", self._on_drop, col, row)
+                cell.add_controller(drop)
+
+                # A list view recycles its rows, so a crowded cell only builds the visible ones.
+                acts = Gtk.StringList()
+                factory = Gtk.SignalListItemFactory()
+                factory.connect("setup", self._setup_act_row, col, row)
+                factory.connect("bind", self._bind_act_row, col, row)
+                view = Gtk.ListView(model=Gtk.NoSelection(model=acts), factory=factory)
+                cell.append(Gtk.ScrolledWindow(child=view, propagate_natural_height=True, max_content_height=240,
+                                               hscrollbar_policy=Gtk.PolicyType.NEVER))
+                self._cells[(col, row)] = acts
+                self._cell_cards[(col, row)] = cell
+                self._render_cell(col, row)
+
+                add_btn = Gtk.Button(icon_name="list-add-symbolic", sensitive=False)
                 add_btn.add_css_class("flat")
+                self._add_btns.append(add_btn)
                 add_btn.connect("clicked", self._on_add_activity, col, row)
                 cell.append(add_btn)
 
@@ -174,8 +353,119 @@ class ScheduleWindow(Adw.ApplicationWindow):
         self.status_label.set_margin_start(12)
         self.status_label.set_margin_bottom(4)
         box.append(self.status_label)
-        GLib.timeout_add_seconds(1, self._update_clock)
 
+    def _on_schedule_loaded(self, gfile, result):
+        try:
+            contents = gfile.load_contents_finish(result)[1]
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.NOT_FOUND):
+                # Opening the store on an empty week would drop its journal: stay read-only.
+                self.status_label.set_label(_("Could not read the schedule: %s") % e.message)
+                return
+            contents = None
+        with trace.span("load schedule", "io"):
+            self.schedule = _schedule_store(contents=contents).data
+        for day, period in self._cells:
+            self._render_cell(day, period)
+        self._update_timeline()
+        self._loaded = True
+        self.history.load(self.schedule)
+        for btn in self._add_btns:
+            btn.set_sensitive(True)
+
+    def _on_close_request(self, *_):
+        _save_session(self, "mittschema")
+        self.save_history()
+        return False
+
+    def save_history(self):
+        """Keep undo across restarts; also called at shutdown, as app.quit skips close-request."""
+        if self._loaded:
+            self.history.save(self.schedule)
+
+    def _cell_changed(self, path):
+        self._render_cell(int(path[0]), int(path[1]))
+        self._update_timeline()
+
+    def _update_timeline(self):
+        self.clock.set_timeline(Timeline((day, PERIOD_STARTS[period], (day, period)) for day, period in self._cells
+                                         if self.schedule.get(str(day), {}).get(str(period))))
+
+    def _on_period_changed(self, prev, cur, transition):
+        if self._lit is not None:
+            self._lit.remove_css_class("accent")
+        self._lit = self._cell_cards[cur[1]] if cur is not None else None
+        if self._lit is not None:
+            self._lit.add_css_class("accent")
+        if cur is not None and transition:
+            self.status_label.set_label(_("Now: %s") % self._cell_names(*cur[1]))
+            _play_sound('complete')
+
+    def _on_reminder(self, nxt):
+        self.status_label.set_label(_("Coming up: %s") % self._cell_names(*nxt[1]))
+        _play_sound('bell')
+
+    def _cell_names(self, day, period):
+        return ", ".join(a.get("name", "") for a in self.schedule.get(str(day), {}).get(str(period), []))
+
+    def _render_cell(self, day, period):
+        """Refresh the activity labels of one period×day cell."""
+        acts = self._cells[(day, period)]
+        acts.splice(0, acts.get_n_items(), [f'{a.get("emoji", "")} {a.get("name", "")}'
+                                            for a in self.schedule.get(str(day), {}).get(str(period), [])])
+
+    def _setup_act_row(self, factory, list_item, day, period):
+        row = Gtk.Box(spacing=2)
+        row.picture = Gtk.Picture(content_fit=Gtk.ContentFit.CONTAIN, height_request=CELL_IMAGE, visible=False)
+        row.picture.image = None
+        row.append(row.picture)
+        row.label = Gtk.Label(hexpand=True, wrap=True)
+        row.append(row.label)
+        rm = Gtk.Button(icon_name="window-close-symbolic", tooltip_text=_("Remove"))
+        rm.add_css_class("flat")
+        rm.connect("clicked", lambda *_: self._remove_activity(day, period, list_item.get_position()))
+        row.append(rm)
+        drag = Gtk.DragSource(actions=Gdk.DragAction.MOVE)
+        drag.connect("prepare", lambda *_: Gdk.ContentProvider.new_for_value(
+            f"{day}:{period}:{list_item.get_position()}"))
+        row.add_controller(drag)
+        list_item.set_child(row)
+
+    def _bind_act_row(self, factory, list_item, day, period):
+        row = list_item.get_child()
+        row.label.set_label(list_item.get_item().get_string())
+        act = self.schedule.get(str(day), {}).get(str(period), [])[list_item.get_position()]
+        path = act.get("image") or None
+        picture = row.picture
+        picture.image = path
+        picture.set_paintable(None)
+        picture.set_visible(path is not None)
+        if path is None:
+            return
+        picture.set_alternative_text(act.get("name", ""))
+
+        def done(texture):
+            if picture.image == path:  # not rebound meanwhile
+                picture.set_paintable(texture)
+        get_image_cache().request(path, CELL_IMAGE * picture.get_scale_factor(), done)
+
+    def _remove_activity(self, day, period, i):
+        path = [str(day), str(period)]
+        act = self.schedule[path[0]][path[1]][i]
+        self.history.do(Delete(path, i, act), self.edits)
+        self.status_label.set_label(_("Removed: %s") % act.get("name", ""))
+
+    def _on_drop(self, target, value, x, y, day, period):
+        src_day, src_period, i = (int(v) for v in value.split(":"))
+        if (src_day, src_period) == (day, period):
+            return False
+        src, dst = [str(src_day), str(src_period)], [str(day), str(period)]
+        act = self.schedule[src[0]][src[1]][i]
+        n = len(self.schedule.get(dst[0], {}).get(dst[1], []))
+        self.history.do(Move(src, i, dst, n, act, None), self.edits)
+        return True
+
+    @trace.traced("dialog: add activity", "dialog")
     def _on_add_activity(self, btn, day, period):
         d = Adw.MessageDialog(transient_for=self, heading=_("Add Activity"))
         d.set_body(_("Choose an activity:"))
@@ -187,6 +477,7 @@ class ScheduleWindow(Adw.ApplicationWindow):
             flow.append(lbl)
         d.set_extra_child(flow)
         d.add_response("cancel", _("Cancel"))
+        d.add_response("picture", _("Picture…"))
         d.add_response("add", _("Add"))
         d.set_response_appearance("add", Adw.ResponseAppearance.SUGGESTED)
 
@@ -195,111 +486,137 @@ class ScheduleWindow(Adw.ApplicationWindow):
                 sel = flow.get_selected_children()
                 if sel:
                     idx = sel[0].get_index()
-                    act = DEFAULT_ACTIVITIES[idx]
-                    key_d = str(day)
-                    key_p = str(period)
-                    if key_d not in self.schedule:
-                        self.schedule[key_d] = {}
-                    if key_p not in self.schedule[key_d]:
-                        self.schedule[key_d][key_p] = []
-                    self.schedule[key_d][key_p].append(dict(act))
-                    _save_schedule(self.schedule)
-                    # Rebuild UI
-                    self._build_ui()
+                    self._add_activity(day, period, dict(DEFAULT_ACTIVITIES[idx]))
+            elif resp == "picture":
+                self._choose_picture(lambda path: self._add_activity(
+                    day, period, {"name": os.path.splitext(os.path.basename(path))[0], "image": path}))
         d.connect("response", on_resp)
         d.present()
 
+    def _add_activity(self, day, period, act):
+        key_d, key_p = str(day), str(period)
+        n = len(self.schedule.get(key_d, {}).get(key_p, []))
+        self.history.do(Insert([key_d, key_p], n, act), self.edits)
+        self.get_application().plugins.call("on_activity_added", dict(act), day, period)
+
+    @trace.traced("dialog: choose picture", "dialog")
+    def _choose_picture(self, callback):
+        """Ask for a picture file and pass its path to callback."""
+        images = Gtk.FileFilter(name=_("Pictures"))
+        images.add_pixbuf_formats()
+        filters = Gio.ListStore(item_type=Gtk.FileFilter)
+        filters.append(images)
+
+        def on_open(dialog, result):
+            try:
+                f = dialog.open_finish(result)
+            except GLib.Error:
+                return  # dismissed
+            if f is not None and f.get_path():
+                callback(f.get_path())
+        Gtk.FileDialog(title=_("Choose Picture"), filters=filters).open(self, None, on_open)
+
     def do_export(self):
         from mittschema.export import export_csv, export_json
-        os.makedirs(CONFIG_DIR, exist_ok=True)
         ts = GLib.DateTime.new_now_local().format("%Y%m%d_%H%M%S")
-        data = []
-        for d in range(7):
-            for p in range(3):
-                acts = self.schedule.get(str(d), {}).get(str(p), [])
+        paths = [os.path.join(CONFIG_DIR, f"export_{ts}.{ext}") for ext in ("csv", "json")]
+        # Snapshot the cells now: the export runs on a worker while edits continue.
+        cells = [(d, p, list(self.schedule.get(str(d), {}).get(str(p), []))) for d in range(7) for p in range(3)]
+
+        def rows():
+            for d, p, acts in cells:
                 for a in acts:
-                    data.append({"date": DAYS[d], "details": f'{PERIODS[p]}: {a.get("name", "")}', "result": ""})
-        export_csv(data, os.path.join(CONFIG_DIR, f"export_{ts}.csv"))
-        export_json(data, os.path.join(CONFIG_DIR, f"export_{ts}.json"))
+                    yield {"date": DAYS[d], "details": f'{PERIODS[p]}: {a.get("name", "")}', "result": ""}
+
+        def work(task):
+            os.makedirs(CONFIG_DIR, exist_ok=True)
+            export_csv(task.track(rows()), paths[0])
+            export_json(task.track(rows()), paths[1])
+
+        def progress(task, n):
+            self.status_label.set_label(_("Exporting… %d rows") % n)
+
+        def done(task, error):
+            if error is None:
+                self.status_label.set_label(_("Exported to %s") % CONFIG_DIR)
+                return
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            if isinstance(error, Cancelled):
+                self.status_label.set_label(_("Export cancelled"))
+            else:
+                self.status_label.set_label(_("Export error: %s") % str(error))
+
+        if EXPORTS.busy:
+            self.status_label.set_label(_("Export queued"))
+        EXPORTS.submit(ts, work, progress, done)
+
+    def do_export_all(self):
+        from mittschema.batch import export_all_profiles, slowest
+        ts = GLib.DateTime.new_now_local().format("%Y%m%d_%H%M%S")
+        path = os.path.join(CONFIG_DIR, f"profiles_{ts}.zip")
+        names = self.get_application().profiles.list_profiles()
+        report = []
+
+        def work(task):
+            os.makedirs(CONFIG_DIR, exist_ok=True)
+            report.extend(export_all_profiles("mittschema", path, day_names=DAYS, period_names=PERIODS, task=task,
+                                              names=names))
+
+        def progress(task, n):
+            self.status_label.set_label(_("Exporting profiles… %d done") % n)
+
+        def done(task, error):
+            if error is None and report:
+                name, secs = slowest(report)
+                self.status_label.set_label(_("Exported %d profiles to %s in %.1f s; slowest: %s, %.2f s") % (
+                    len(report), path, max(r["finished"] for r in report), name, secs))
+                return
+            if error is None:
+                self.status_label.set_label(_("Exported to %s") % path)
+                return
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            if isinstance(error, Cancelled):
+                self.status_label.set_label(_("Export cancelled"))
+            else:
+                self.status_label.set_label(_("Export error: %s") % str(error))
+
+        if EXPORTS.busy:
+            self.status_label.set_label(_("Export queued"))
+        EXPORTS.submit(ts, work, progress, done)
 
     def _toggle_theme(self, *_):
         mgr = Adw.StyleManager.get_default()
         mgr.set_color_scheme(Adw.ColorScheme.FORCE_LIGHT if mgr.get_dark() else Adw.ColorScheme.FORCE_DARK)
 
-    def _update_clock(self):
-        self.status_label.set_label(GLib.DateTime.new_now_local().format("%Y-%m-%d %H:%M:%S"))
-        return True
+    def _update_clock(self, lt):
+        self.status_label.set_label(GLib.DateTime.new_now_local().format("%Y-%m-%d %H:%M"))
+
+    def _on_destroy(self, *_):
+        self.clock.stop()
 
 
 def main():
     app = ScheduleApp()
     app.run(sys.argv)
 
-if __name__ == "__main__":
-    main()
-
-    # ── Welcome Dialog ───────────────────────────────────────
-
-    def _show_welcome(self, win):
-        dialog = Adw.Dialog()
-        dialog.set_title(_("Welcome"))
-        dialog.set_content_width(420)
-        dialog.set_content_height(480)
-
-        page = Adw.StatusPage()
-        page.set_icon_name("mittschema")
-        page.set_title(_("Welcome to My Schedule"))
-        page.set_description(_(
-            "A weekly visual schedule for structure and routine.\n\n✓ Plan activities for each day\n✓ Visual weekly overview\n✓ Color-coded activities\n✓ Simple and clear layout"
-        ))
-
-        btn = Gtk.Button(label=_("Get Started"))
-        btn.add_css_class("suggested-action")
-        btn.add_css_class("pill")
-        btn.set_halign(Gtk.Align.CENTER)
-        btn.set_margin_top(12)
-        btn.connect("clicked", self._on_welcome_close, dialog)
-        page.set_child(btn)
-
-        box = Adw.ToolbarView()
-        hb = Adw.HeaderBar()
-        hb.set_show_title(False)
-        box.add_top_bar(hb)
-        box.set_content(page)
-        dialog.present(win)
-
-    def _on_welcome_close(self, btn, dialog):
-        self.settings["welcome_shown"] = True
-        _save_settings(self.settings)
-        dialog.close()
-
-
 
 # --- Session restore ---
-import json as _json
-import os as _os
-
 def _save_session(window, app_name):
-    config_dir = _os.path.join(_os.path.expanduser('~'), '.config', app_name)
-    _os.makedirs(config_dir, exist_ok=True)
-    state = {'width': window.get_width(), 'height': window.get_height(),
-             'maximized': window.is_maximized()}
-    try:
-        with open(_os.path.join(config_dir, 'session.json'), 'w') as f:
-            _json.dump(state, f)
-    except OSError:
-        pass
+    get_config(app_name).store('session').update({
+        'width': window.get_width(), 'height': window.get_height(), 'maximized': window.is_maximized()})
 
 def _restore_session(window, app_name):
-    path = _os.path.join(_os.path.expanduser('~'), '.config', app_name, 'session.json')
-    try:
-        with open(path) as f:
-            state = _json.load(f)
-        window.set_default_size(state.get('width', 800), state.get('height', 600))
-        if state.get('maximized'):
-            window.maximize()
-    except (FileNotFoundError, _json.JSONDecodeError, OSError):
-        pass
+    state = get_config(app_name).store('session')
+    window.set_default_size(state.get('width', 800), state.get('height', 600))
+    if state.get('maximized'):
+        window.maximize()
 
 
 # --- Fullscreen toggle (F11) ---
@@ -316,42 +633,24 @@ def _setup_fullscreen(window, app):
 
 
 # --- Plugin system ---
-import importlib.util
-import os as _pos
-
-def _load_plugins(app_name):
+def _load_plugins(app_name, parallel=False):
     """Load plugins from ~/.config/<app>/plugins/."""
-    plugin_dir = _pos.path.join(_pos.path.expanduser('~'), '.config', app_name, 'plugins')
-    plugins = []
-    if not _pos.path.isdir(plugin_dir):
-        return plugins
-    for fname in sorted(_pos.listdir(plugin_dir)):
-        if fname.endswith('.py') and not fname.startswith('_'):
-            path = _pos.path.join(plugin_dir, fname)
-            try:
-                spec = importlib.util.spec_from_file_location(fname[:-3], path)
-                mod = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(mod)
-                plugins.append(mod)
-            except Exception as e:
-                print(f"Plugin {fname}: {e}")
-    return plugins
+    from mittschema.plugins import PluginManager
+    return PluginManager(app_name).load_all(parallel)
 
 
 # --- Sound notifications ---
 def _play_sound(sound_name='complete'):
-    """Play a system notification sound."""
-    try:
-        import subprocess
-        # Try canberra-gtk-play first, then paplay
-        for cmd in [
-            ['canberra-gtk-play', '-i', sound_name],
-            ['paplay', f'/usr/share/sounds/freedesktop/stereo/{sound_name}.oga'],
-        ]:
-            try:
-                subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                return
-            except FileNotFoundError:
-                continue
-    except Exception:
-        pass
+    """Play a system notification sound through the shared audio backend."""
+    from mittschema.audio import get_player
+    get_player().play(sound_name)
+
+
+def _init_audio():
+    from mittschema.audio import get_player
+    get_player()
+    return GLib.SOURCE_REMOVE
+
+
+if __name__ == "__main__":
+    main()
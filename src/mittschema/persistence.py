@@ -0,0 +1,305 @@
+"""Journaled JSON persistence: cheap appends, atomic background snapshots."""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+from mittschema import trace
+
+_READ = object()
+
+
+def _digest(raw):
+    return hashlib.blake2b(raw, digest_size=16).hexdigest() if raw is not None else None
+
+
+def _walk(node, path, leaf=dict):
+    for i, key in enumerate(path):
+        if isinstance(node, list):
+            node = node[key]
+        else:
+            node = node.setdefault(key, leaf() if i == len(path) - 1 else {})
+    return node
+
+
+def _apply(data, entry):
+    """Apply one journal entry to data and return the affected value."""
+    op, path = entry["op"], entry["path"]
+    if op == "set":
+        if not path:
+            value = dict(entry["value"])
+            data.clear()
+            data.update(value)
+            return data
+        _walk(data, path[:-1])[path[-1]] = entry["value"]
+        return entry["value"]
+    if op == "insert":
+        _walk(data, path, list).insert(entry["index"], entry["value"])
+        return entry["value"]
+    if op == "delete":
+        return _walk(data, path, list).pop(entry["index"])
+    raise ValueError(f"unknown journal op {op!r}")
+
+
+def _read_journal(path):
+    """Return (base digest, entries) of a journal file, or None if missing."""
+    try:
+        with open(path, "rb") as f:
+            lines = f.read().split(b"\n")
+    except OSError:
+        return None
+    try:
+        base = json.loads(lines[0])["base"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    entries = []
+    for line in lines[1:]:
+        if not line:
+            continue
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            break  # torn tail from a crash mid-append
+    return base, entries
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def write_atomic(path, raw):
+    """Write bytes to path via a synced temp file and rename."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path)
+
+
+class JournaledStore:
+    """A JSON document held in memory whose edits are appended to a journal.
+
+    Each edit is applied to ``data`` and handed to a background thread, which
+    appends it as one line to ``<path>.journal``.  The same thread writes a
+    full snapshot once edits have been quiet for ``delay`` seconds, or once
+    ``compact_after`` entries have piled up, and then drops the journal it
+    covered.  On start-up the snapshot is loaded and any journal still
+    belonging to it is replayed.  Snapshots are fsynced but journal lines are
+    not, so recent edits survive the application crashing, not a power cut.
+    Pass ``contents`` (bytes, or None for a missing file) when the snapshot
+    has already been read, e.g. asynchronously by the caller.
+    """
+
+    def __init__(self, path, default, delay=1.0, compact_after=500, contents=_READ):
+        self.path = str(path)
+        self._journal_path = self.path + ".journal"
+        self._old_path = self._journal_path + ".old"
+        self._default = default
+        self._delay = delay
+        self._compact_after = compact_after
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()
+        self._fd = None
+        self._lines = []
+        self._pending = 0
+        self._last_edit = 0.0
+        self._thread = None
+        self._closed = False
+        self.data = self._recover(contents)
+
+    def _recover(self, raw):
+        try:
+            if raw is _READ:
+                raw = None
+                with open(self.path, "rb") as f:
+                    raw = f.read()
+            if raw is None:
+                raise FileNotFoundError(self.path)
+            data = json.loads(raw)
+        except FileNotFoundError:
+            raw, data = None, self._default()
+        except (OSError, ValueError) as e:
+            print(f"{self.path}: unreadable ({e}), moved aside to .corrupt", file=sys.stderr)
+            try:
+                os.replace(self.path, self.path + ".corrupt")
+            except OSError:
+                pass
+            raw, data = None, self._default()
+        self._base = _digest(raw)
+        chain = []
+        for path in (self._old_path, self._journal_path):
+            journal = _read_journal(path)
+            if journal is None or not (chain or journal[0] == self._base):
+                _remove(path)  # belongs to another snapshot, or unreadable
+                continue
+            for entry in journal[1]:
+                try:
+                    _apply(data, entry)
+                except (KeyError, IndexError, TypeError, ValueError):
+                    break
+            chain.append(path)
+        self.data = data
+        if not chain:
+            return data
+        self._pending = 1
+        if self.flush():
+            _remove(self._journal_path)
+        elif self._journal_path in chain:
+            # Keep appending to it: truncating it would lose the edits just replayed.
+            try:
+                self._fd = os.open(self._journal_path, os.O_WRONLY | os.O_APPEND)
+            except OSError:
+                pass
+        return data
+
+    # ── Edits ────────────────────────────────────────────────
+
+    def set(self, path, value):
+        return self._edit({"op": "set", "path": list(path), "value": value})
+
+    def insert(self, path, index, value):
+        return self._edit({"op": "insert", "path": list(path), "index": index, "value": value})
+
+    def delete(self, path, index):
+        return self._edit({"op": "delete", "path": list(path), "index": index})
+
+    def _edit(self, entry):
+        line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+        with self._lock:
+            result = _apply(self.data, entry)
+            self._lines.append(line)
+            self._pending += 1
+            self._last_edit = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mittschema-snapshot", daemon=True)
+                self._thread.start()
+            self._wake.notify()
+        return result
+
+    def _open_journal(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fd = os.open(self._journal_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+        os.write(self._fd, (json.dumps({"base": self._base}) + "\n").encode())
+
+    # ── Snapshots ────────────────────────────────────────────
+
+    def _run(self):
+        with self._lock:
+            while not self._closed:
+                if self._lines:
+                    self._write_lines()
+                if not self._pending:
+                    self._wake.wait()
+                    continue
+                wait = self._last_edit + self._delay - time.monotonic()
+                if wait > 0 and self._pending < self._compact_after:
+                    self._wake.wait(wait)
+                    continue
+                self._lock.release()
+                try:
+                    ok = self.flush()
+                except Exception as e:  # keep the writer alive; the edits stay pending
+                    print(f"{self.path}: snapshot failed: {e}", file=sys.stderr)
+                    ok = False
+                finally:
+                    self._lock.acquire()
+                if not ok and not self._closed:
+                    self._wake.wait(max(self._delay, 1.0))  # retry later, not in a tight loop
+
+    def _write_lines(self):
+        """Append queued journal lines (lock held)."""
+        try:
+            if self._fd is None:
+                self._open_journal()
+            os.write(self._fd, b"".join(self._lines))
+        except OSError as e:
+            print(f"{self._journal_path}: {e}", file=sys.stderr)
+        self._lines.clear()
+
+    def _rotate(self):
+        """Serialize data and retire the journal it covers (lock held).
+
+        Returns None, with nothing changed, if the journal could not be moved.
+        """
+        if self._lines:
+            self._write_lines()  # keep the journal complete in case the snapshot fails
+        raw = json.dumps(self.data, ensure_ascii=False).encode()
+        if self._fd is not None:
+            try:
+                if os.path.exists(self._old_path):
+                    # A previous snapshot failed; keep one chain for recovery.
+                    with open(self._old_path, "rb") as f:
+                        old = f.read()
+                    with open(self._journal_path, "rb") as f:
+                        f.readline()
+                        write_atomic(self._old_path, old + f.read())
+                    os.unlink(self._journal_path)
+                else:
+                    os.replace(self._journal_path, self._old_path)
+            except FileNotFoundError:
+                pass  # removed underneath us; the snapshot still holds its edits
+            except OSError as e:
+                print(f"{self._journal_path}: {e}", file=sys.stderr)
+                return None
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+        self._base = _digest(raw)
+        self._pending = 0
+        return raw
+
+    def flush(self):
+        """Write a snapshot now if there are unsaved edits; False on failure."""
+        with self._write_lock:
+            with self._lock:
+                if not self._pending:
+                    return True
+                pending = self._pending
+                raw = self._rotate()
+            if raw is None:
+                return False
+            try:
+                with trace.span("write snapshot", "io", file=os.path.basename(self.path), bytes=len(raw)):
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    write_atomic(self.path, raw)
+                _remove(self._old_path)
+            except OSError as e:
+                print(f"{self.path}: snapshot failed: {e}", file=sys.stderr)
+                with self._lock:
+                    self._pending += pending  # the next pass tries again
+                return False
+            return True
+
+    def close(self):
+        """Flush outstanding edits and stop the background writer."""
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        self.flush()
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,178 @@
+"""Lazy plugin loading from ~/.config/<app>/plugins/.
+
+A plugin is a ``.py`` file.  It declares the hooks it implements with a
+module-level literal, e.g. ``HOOKS = ["on_activity_added"]``; without one,
+every top-level function counts as a hook.  The declaration is read with
+``ast`` and kept in an index keyed by file mtime and size, so start-up only
+stats the plugin files.  A plugin module is executed the first time one of
+its hooks is called, from bytecode cached under ~/.cache/<app>/plugins/.
+"""
+import ast
+import json
+import marshal
+import os
+import sys
+import time
+import types
+
+from mittschema import trace
+from mittschema.config import config_dir
+
+
+class Plugin:
+    """Manifest entry, load state and timing for one plugin file."""
+
+    def __init__(self, name, path, hooks=(), stamp=None):
+        self.name = name
+        self.path = path
+        self.hooks = list(hooks)
+        self.stamp = stamp
+        self.module = None
+        self.error = None
+        self.import_time = 0.0
+        self.hook_time = 0.0
+        self.calls = 0
+
+
+def _stamp(st):
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _declared_hooks(tree):
+    funcs = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "HOOKS" for t in node.targets):
+            try:
+                return [str(h) for h in ast.literal_eval(node.value)]
+            except ValueError:
+                pass
+        elif isinstance(node, ast.FunctionDef) and not node.name.startswith("_"):
+            funcs.append(node.name)
+    return funcs
+
+
+class PluginManager:
+    """Index plugins at start-up and import each one on first use."""
+
+    def __init__(self, app_name):
+        self._dir = os.path.join(config_dir(app_name), "plugins")
+        cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        self._cache_dir = os.path.join(cache, app_name, "plugins")
+        self._index_path = os.path.join(self._cache_dir, "index.json")
+        self.plugins = {}
+        self.scan()
+
+    @trace.traced("scan plugins", "plugins")
+    def scan(self):
+        """Refresh the manifest; only new or changed files are parsed."""
+        try:
+            with open(self._index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        plugins, dirty = {}, False
+        try:
+            names = sorted(os.listdir(self._dir))
+        except OSError:
+            names = []
+        for fname in names:
+            if not fname.endswith(".py") or fname.startswith("_"):
+                continue
+            path = os.path.join(self._dir, fname)
+            try:
+                stamp = _stamp(os.stat(path))
+            except OSError:
+                continue
+            name = fname[:-3]
+            entry = index.get(name)
+            if not entry or entry.get("stamp") != stamp:
+                try:
+                    with open(path, "rb") as f:
+                        hooks = _declared_hooks(ast.parse(f.read(), path))
+                except (OSError, SyntaxError, ValueError) as e:
+                    print(f"Plugin {fname}: {e}", file=sys.stderr)
+                    hooks = []
+                entry = {"stamp": stamp, "hooks": hooks}
+                dirty = True
+            known = self.plugins.get(name)
+            plugins[name] = known if known and known.stamp == stamp else Plugin(name, path, entry["hooks"], stamp)
+        self.plugins = plugins
+        if dirty or set(index) != set(plugins):
+            try:
+                os.makedirs(self._cache_dir, exist_ok=True)
+                with open(self._index_path, "w") as f:
+                    json.dump({p.name: {"stamp": p.stamp, "hooks": p.hooks} for p in plugins.values()}, f)
+            except OSError:
+                pass
+
+    def _code(self, plugin):
+        mtime, size = plugin.stamp
+        cached = os.path.join(self._cache_dir, f"{plugin.name}.{sys.implementation.cache_tag}.{mtime}.{size}.bin")
+        try:
+            with open(cached, "rb") as f:
+                return marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        with open(plugin.path, "rb") as f:
+            code = compile(f.read(), plugin.path, "exec")
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            for old in os.listdir(self._cache_dir):
+                if old.startswith(f"{plugin.name}.") and old.endswith(".bin"):
+                    os.unlink(os.path.join(self._cache_dir, old))
+            with open(cached + ".tmp", "wb") as f:
+                marshal.dump(code, f)
+            os.replace(cached + ".tmp", cached)
+        except OSError:
+            pass
+        return code
+
+    def load(self, plugin):
+        """Import one plugin if it is not loaded yet; returns the module or None."""
+        if plugin.module is not None or plugin.error is not None:
+            return plugin.module
+        t0 = time.perf_counter()
+        try:
+            with trace.span("load plugin", "plugins", plugin=plugin.name):
+                mod = types.ModuleType(plugin.name)
+                mod.__file__ = plugin.path
+                exec(self._code(plugin), mod.__dict__)
+            plugin.module = mod
+        except Exception as e:
+            plugin.error = str(e)
+            print(f"Plugin {os.path.basename(plugin.path)}: {e}", file=sys.stderr)
+        plugin.import_time = time.perf_counter() - t0
+        return plugin.module
+
+    def load_all(self, parallel=False):
+        """Import every plugin now, optionally on a thread pool."""
+        pending = [p for p in self.plugins.values() if p.module is None and p.error is None]
+        if parallel and len(pending) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(thread_name_prefix="mittschema-plugin") as pool:
+                list(pool.map(self.load, pending))
+        else:
+            for p in pending:
+                self.load(p)
+        return [p.module for p in self.plugins.values() if p.module is not None]
+
+    def call(self, hook, *args):
+        """Call hook on every plugin declaring it; returns the non-None results."""
+        results = []
+        for plugin in self.plugins.values():
+            if hook not in plugin.hooks:
+                continue
+            mod = self.load(plugin)
+            fn = getattr(mod, hook, None)
+            if fn is None:
+                continue
+            t0 = time.perf_counter()
+            try:
+                result = fn(*args)
+                if result is not None:
+                    results.append(result)
+            except Exception as e:
+                print(f"Plugin {plugin.name}.{hook}: {e}", file=sys.stderr)
+            plugin.hook_time += time.perf_counter() - t0
+            plugin.calls += 1
+        return results
@@ -1,47 +1,280 @@
-
 # --- User profiles ---
+import copy as _pcopy
 import json as _pjson
 import os as _pos2
+import threading as _pthreading
+from collections import OrderedDict as _OrderedDict
+
+from mittschema import trace as _trace
+from mittschema.config import get_config as _get_config
 
 class ProfileManager:
-    """Simple user profile management for barn-appar."""
+    """Simple user profile management for barn-appar.
 
-    def __init__(self, app_name):
+    The profile list is indexed in memory and kept current by a
+    Gio.FileMonitor on the profiles directory once ``watch()`` is called (else
+    by a directory mtime check).  Parsed profile data sits in an LRU cache
+    capped at ``cache_bytes`` of serialized JSON, and the profiles next to the
+    current one are prefetched in the background, so switching is usually a
+    cache hit.  Every write bumps the profile's generation, so a prefetch that
+    read older data cannot put it back into the cache.  load_data returns a
+    copy: call save_data to keep changes.
+    """
+
+    def __init__(self, app_name, backend='json', cache_bytes=32 << 20, prefetch=True):
+        """backend is 'json' (one file per profile) or 'sqlite' (profiles.db)."""
         self._app_name = app_name
-        self._dir = _pos2.path.join(_pos2.path.expanduser('~'), '.config', app_name, 'profiles')
+        self._config = _get_config(app_name)
+        self._dir = self._config.path('profiles')
         _pos2.makedirs(self._dir, exist_ok=True)
+        self._db = None
+        if backend == 'sqlite':
+            from mittschema.sqlite_store import SqliteProfileStore, migrate_json_profiles
+            self._db = SqliteProfileStore(_pos2.path.join(self._dir, 'profiles.db'))
+            migrate_json_profiles(self._dir, self._db, self._json_current())
+        self._lock = _pthreading.RLock()
+        self._cache = _OrderedDict()  # name -> (data, size, stamp)
+        self._cache_size = 0
+        self._cache_bytes = cache_bytes
+        self._prefetch = prefetch
+        self._pool = None
+        self._index = None
+        self._dir_mtime = None
+        self._monitor = None
+        self._writes = {}  # name -> generation, bumped on every write
         self._current = self._load_current()
 
+    def _json_current(self):
+        """The current profile as the JSON backend records it, or None."""
+        self._state = self._config.store('profiles')
+        if 'current' not in self._state:
+            try:  # written by earlier versions
+                with open(_pos2.path.join(self._dir, '.current')) as f:
+                    self._state.data['current'] = f.read().strip()
+            except OSError:
+                pass
+        return self._state.get('current')
+
     def _load_current(self):
-        try:
-            with open(_pos2.path.join(self._dir, '.current')) as f:
-                return f.read().strip()
-        except (FileNotFoundError, OSError):
-            return 'default'
+        if self._db:
+            return self._db.get_meta('current', 'default')
+        return self._json_current() or 'default'
 
     @property
     def current(self):
         return self._current
 
     def switch(self, name):
-        self._current = name
-        with open(_pos2.path.join(self._dir, '.current'), 'w') as f:
-            f.write(name)
+        with _trace.span('switch profile', 'profiles', profile=name):
+            self._current = name
+            if self._prefetch:
+                self._prefetch_around(name)
+            if self._db:
+                self._db.set_meta('current', name)
+                return
+            self._state['current'] = name
+
+    # ── Index ────────────────────────────────────────────────
+
+    def watch(self):
+        """Keep the index current from Gio.FileMonitor events; False without GLib."""
+        if self._monitor is not None or self._db:
+            return self._monitor is not None
+        try:
+            from gi.repository import Gio
+        except ImportError:
+            return False
+        self._monitor = Gio.File.new_for_path(self._dir).monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+        self._monitor.connect('changed', self._on_dir_changed)
+        return True
+
+    def _on_dir_changed(self, monitor, gfile, other, event):
+        from gi.repository import Gio
+        E = Gio.FileMonitorEvent
+        gone = {E.DELETED: gfile, E.MOVED_OUT: gfile, E.RENAMED: gfile}.get(event)
+        new = {E.CREATED: gfile, E.MOVED_IN: gfile, E.RENAMED: other}.get(event)
+        if event in (E.CHANGED, E.CHANGES_DONE_HINT):
+            gone = gfile
+        for f, added in ((gone, False), (new, True)):
+            fname = f.get_basename() if f is not None else ''
+            if not fname.endswith('.json') or fname == '.json':
+                continue
+            name = fname[:-5]
+            self._evict(name)
+            if self._index is None or name == 'default' or event in (E.CHANGED, E.CHANGES_DONE_HINT):
+                continue
+            if added and name not in self._index:
+                self._index.append(name)
+                self._index[1:] = sorted(self._index[1:])
+            elif not added and name in self._index:
+                self._index.remove(name)
+
+    def _scan(self):
+        names = ['default']
+        with _pos2.scandir(self._dir) as it:
+            found = sorted(e.name[:-5] for e in it if e.name.endswith('.json') and e.name != '.json')
+        names.extend(n for n in found if n != 'default')
+        return names
 
     def list_profiles(self):
-        profiles = ['default']
-        for f in sorted(_pos2.listdir(self._dir)):
-            if f.endswith('.json') and f != '.current':
-                profiles.append(f[:-5])
-        return list(set(profiles))
+        if self._db:
+            return ['default'] + [p for p in self._db.list_profiles() if p != 'default']
+        if self._monitor is None:
+            try:
+                mtime = _pos2.stat(self._dir).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime != self._dir_mtime:
+                self._index, self._dir_mtime = None, mtime
+        if self._index is None:
+            self._index = self._scan()
+        return list(self._index)
 
-    def save_data(self, data):
-        with open(_pos2.path.join(self._dir, f'{self._current}.json'), 'w') as f:
-            _pjson.dump(data, f, ensure_ascii=False, indent=2)
+    # ── Data cache ───────────────────────────────────────────
 
-    def load_data(self):
+    def _path(self, name):
+        return _pos2.path.join(self._dir, f'{name}.json')
+
+    def _stamp(self, name):
+        """(generation, file mtime and size); the file part is None with sqlite."""
+        gen = self._writes.get(name, 0)
+        if self._db:
+            return gen, None
         try:
-            with open(_pos2.path.join(self._dir, f'{self._current}.json')) as f:
-                return _pjson.load(f)
-        except (FileNotFoundError, _pjson.JSONDecodeError):
-            return {}
+            st = _pos2.stat(self._path(name))
+            return gen, (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return gen, False
+
+    def _bump(self, name):
+        """Record a write to name: whatever was read before it is stale."""
+        with self._lock:
+            self._writes[name] = self._writes.get(name, 0) + 1
+            self._evict(name)
+
+    def _evict(self, name):
+        with self._lock:
+            entry = self._cache.pop(name, None)
+            if entry:
+                self._cache_size -= entry[1]
+
+    def _remember(self, name, data, size, stamp):
+        with self._lock:
+            if stamp[0] != self._writes.get(name, 0):
+                return  # read before a write
+            self._evict(name)
+            if size > self._cache_bytes:
+                return
+            self._cache[name] = (data, size, stamp)
+            self._cache_size += size
+            while self._cache_size > self._cache_bytes:
+                _, (_, old_size, _) = self._cache.popitem(last=False)
+                self._cache_size -= old_size
+
+    def _read(self, name):
+        stamp = self._stamp(name)
+        if self._db:
+            data = self._db.load(name)
+            return data, len(_pjson.dumps(data, ensure_ascii=False)), stamp
+        try:
+            with open(self._path(name), 'rb') as f:
+                raw = f.read()
+            return _pjson.loads(raw), len(raw), stamp
+        except (FileNotFoundError, ValueError):
+            return {}, 0, stamp
+
+    def _cached(self, name):
+        with self._lock:
+            entry = self._cache.get(name)
+            if entry is None:
+                return None
+            # Without a monitor a stat is still far cheaper than a parse.
+            gen, disk = entry[2]
+            if gen != self._writes.get(name, 0) or (self._monitor is None and disk != self._stamp(name)[1]):
+                self._evict(name)
+                return None
+            self._cache.move_to_end(name)
+            return entry[0]
+
+    def _prefetch_around(self, name):
+        names = self.list_profiles()
+        if name not in names:
+            return
+        i = names.index(name)
+        wanted = [n for n in (names[i - 1] if i else None, names[(i + 1) % len(names)]) if n and n != name]
+        if not wanted:
+            return
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._pool = ThreadPoolExecutor(1, thread_name_prefix='mittschema-prefetch')
+        for n in wanted:
+            self._pool.submit(self._warm, n)
+
+    def _warm(self, name):
+        if self._cached(name) is None:
+            self._remember(name, *self._read(name))
+
+    def save_data(self, data):
+        # The cache keeps its own copy, so later changes to data do not leak into it.
+        if self._db:
+            self._db.save(self._current, data)
+            self._bump(self._current)
+            self._remember(self._current, _pcopy.deepcopy(data), len(_pjson.dumps(data, ensure_ascii=False)),
+                           self._stamp(self._current))
+            return
+        raw = _pjson.dumps(data, ensure_ascii=False, indent=2)
+        with open(self._path(self._current), 'w') as f:
+            f.write(raw)
+        self._bump(self._current)
+        self._remember(self._current, _pcopy.deepcopy(data), len(raw.encode()), self._stamp(self._current))
+        if self._index is not None and self._current not in self._index:
+            self._index.append(self._current)
+            self._index[1:] = sorted(self._index[1:])
+
+    def load_data(self, name=None):
+        """Load the current profile's data, or another profile's by name, as a copy."""
+        name = name or self._current
+        data = self._cached(name)
+        if data is None:
+            data, size, stamp = self._read(name)
+            self._remember(name, data, size, stamp)
+        return _pcopy.deepcopy(data)
+
+    def add_activity(self, day, period, activity, index=None):
+        """Add one activity to the current profile; a single row with sqlite."""
+        if self._db:
+            row = self._db.add_activity(self._current, day, period, activity, index)
+            self._bump(self._current)
+            return row
+        data = self.load_data()
+        acts = data.setdefault(day, {}).setdefault(period, []) if period is not None else data.setdefault(day, [])
+        acts.insert(len(acts) if index is None else index, activity)
+        self.save_data(data)
+
+    def update_activity(self, day, period, index, activity):
+        """Replace the activity at index in the current profile; a single row with sqlite."""
+        if self._db:
+            self._db.update_activity(self._row_id(day, period, index), activity)
+            self._bump(self._current)
+            return
+        data = self.load_data()
+        acts = data[day][period] if period is not None else data[day]
+        acts[index] = activity
+        self.save_data(data)
+
+    def remove_activity(self, day, period, index):
+        """Remove the activity at index from the current profile; a single row with sqlite."""
+        if self._db:
+            self._db.delete_activity(self._row_id(day, period, index))
+            self._bump(self._current)
+            return
+        data = self.load_data()
+        acts = data[day][period] if period is not None else data[day]
+        del acts[index]
+        self.save_data(data)
+
+    def _row_id(self, day, period, index):
+        row = self._db.activity_id(self._current, day, period, index)
+        if row is None:
+            raise IndexError(f'no activity {index} in {day}/{period}')
+        return row
@@ -0,0 +1,250 @@
+"""SQLite storage for profiles and their schedules."""
+import functools
+import json
+import os
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS days (
+    id INTEGER PRIMARY KEY,
+    profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    UNIQUE (profile_id, key)
+);
+CREATE TABLE IF NOT EXISTS periods (
+    id INTEGER PRIMARY KEY,
+    day_id INTEGER NOT NULL REFERENCES days(id) ON DELETE CASCADE,
+    key TEXT,
+    UNIQUE (day_id, key)
+);
+CREATE TABLE IF NOT EXISTS activities (
+    id INTEGER PRIMARY KEY,
+    period_id INTEGER NOT NULL REFERENCES periods(id) ON DELETE CASCADE,
+    position REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS activities_by_period ON activities (period_id, position);
+"""
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache reuses the compiled form instead of re-preparing each call.
+_SQL_PROFILE_ID = "SELECT id FROM profiles WHERE name = ?"
+_SQL_ADD_PROFILE = "INSERT INTO profiles (name) VALUES (?) ON CONFLICT (name) DO NOTHING"
+_SQL_DAY_ID = "SELECT id FROM days WHERE profile_id = ? AND key = ?"
+_SQL_ADD_DAY = "INSERT INTO days (profile_id, key) VALUES (?, ?)"
+_SQL_PERIOD_ID = "SELECT id FROM periods WHERE day_id = ? AND key IS ?"
+_SQL_ADD_PERIOD = "INSERT INTO periods (day_id, key) VALUES (?, ?)"
+_SQL_POSITIONS = ("SELECT position FROM activities WHERE period_id = ? "
+                  "ORDER BY position LIMIT 2 OFFSET ?")
+_SQL_LAST_POSITION = "SELECT MAX(position) FROM activities WHERE period_id = ?"
+_SQL_COUNT = "SELECT COUNT(*) FROM activities WHERE period_id = ?"
+_SQL_ACTIVITY_AT = "SELECT id FROM activities WHERE period_id = ? ORDER BY position LIMIT 1 OFFSET ?"
+_SQL_ADD_ACTIVITY = "INSERT INTO activities (period_id, position, data) VALUES (?, ?, ?)"
+_SQL_UPDATE_ACTIVITY = "UPDATE activities SET data = ? WHERE id = ?"
+_SQL_DELETE_ACTIVITY = "DELETE FROM activities WHERE id = ?"
+_SQL_LOAD = """
+SELECT d.key, p.id, p.key, a.id, a.data FROM days d
+LEFT JOIN periods p ON p.day_id = d.id
+LEFT JOIN activities a ON a.period_id = p.id
+WHERE d.profile_id = ? ORDER BY d.id, p.id, a.position
+"""
+
+
+def _locked(fn):
+    @functools.wraps(fn)
+    def call(self, *args, **kwargs):
+        with self._lock:
+            return fn(self, *args, **kwargs)
+    return call
+
+
+class SqliteProfileStore:
+    """Profiles and schedules in one WAL-mode SQLite database.
+
+    A schedule is stored as days → periods → activities.  Day values that are
+    plain lists (the ``{weekday: [...]}`` layout) use a NULL period key.
+    Activity order is a fractional ``position`` so inserting between two
+    neighbours writes one row.  The connection is shared with prefetch
+    threads, so every public method holds one lock while it uses it.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(SCHEMA)
+
+    @_locked
+    def close(self):
+        self._db.close()
+
+    # ── Profiles ─────────────────────────────────────────────
+
+    @_locked
+    def get_meta(self, key, default=None):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    @_locked
+    def set_meta(self, key, value):
+        self._db.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                         "ON CONFLICT (key) DO UPDATE SET value = excluded.value", (key, value))
+
+    @_locked
+    def list_profiles(self):
+        return [r[0] for r in self._db.execute("SELECT name FROM profiles ORDER BY id")]
+
+    def _profile_id(self, name, create=False):
+        if create:
+            self._db.execute(_SQL_ADD_PROFILE, (name,))
+        row = self._db.execute(_SQL_PROFILE_ID, (name,)).fetchone()
+        return row[0] if row else None
+
+    def _period_id(self, profile_id, day, period):
+        row = self._db.execute(_SQL_DAY_ID, (profile_id, day)).fetchone()
+        day_id = row[0] if row else self._db.execute(_SQL_ADD_DAY, (profile_id, day)).lastrowid
+        row = self._db.execute(_SQL_PERIOD_ID, (day_id, period)).fetchone()
+        return row[0] if row else self._db.execute(_SQL_ADD_PERIOD, (day_id, period)).lastrowid
+
+    @_locked
+    def delete_profile(self, name):
+        self._db.execute("DELETE FROM profiles WHERE name = ?", (name,))
+
+    # ── Documents ────────────────────────────────────────────
+
+    @_locked
+    def load(self, name):
+        """Return a profile's data as the nested dict ProfileManager used to store."""
+        pid = self._profile_id(name)
+        if pid is None:
+            return {}
+        data = json.loads(self._db.execute("SELECT extra FROM profiles WHERE id = ?", (pid,)).fetchone()[0])
+        for day, period_id, period, act_id, raw in self._db.execute(_SQL_LOAD, (pid,)):
+            if period_id is None:
+                data.setdefault(day, {})
+                continue
+            if period is None:
+                acts = data.setdefault(day, [])
+            else:
+                acts = data.setdefault(day, {}).setdefault(period, [])
+            if act_id is not None:
+                acts.append(json.loads(raw))
+        return data
+
+    @_locked
+    def save(self, name, data):
+        """Replace a whole profile document in one transaction."""
+        with self._db:
+            self._db.execute("BEGIN")
+            pid = self._profile_id(name, create=True)
+            self._db.execute("DELETE FROM days WHERE profile_id = ?", (pid,))
+            extra = {}
+            rows = []
+            for day, value in data.items():
+                if isinstance(value, list):
+                    periods = {None: value}
+                elif isinstance(value, dict) and all(isinstance(v, list) for v in value.values()):
+                    periods = value
+                else:
+                    extra[day] = value
+                    continue
+                day_id = self._db.execute(_SQL_ADD_DAY, (pid, day)).lastrowid
+                for period, acts in periods.items():
+                    period_id = self._db.execute(_SQL_ADD_PERIOD, (day_id, period)).lastrowid
+                    rows.extend((period_id, float(i), json.dumps(a, ensure_ascii=False))
+                                for i, a in enumerate(acts))
+            self._db.executemany(_SQL_ADD_ACTIVITY, rows)
+            self._db.execute("UPDATE profiles SET extra = ? WHERE id = ?",
+                             (json.dumps(extra, ensure_ascii=False), pid))
+
+    # ── Single activities ────────────────────────────────────
+
+    @_locked
+    def add_activity(self, name, day, period, activity, index=None):
+        """Insert one activity at index (default: last) and return its row id."""
+        with self._db:
+            self._db.execute("BEGIN")
+            period_id = self._period_id(self._profile_id(name, create=True), day, period)
+            if index is not None and index >= self._db.execute(_SQL_COUNT, (period_id,)).fetchone()[0]:
+                index = None  # past the end: append
+            if index is None:
+                last = self._db.execute(_SQL_LAST_POSITION, (period_id,)).fetchone()[0]
+                pos = 0.0 if last is None else last + 1.0
+            else:
+                args = (period_id, max(index - 1, 0))
+                around = [r[0] for r in self._db.execute(_SQL_POSITIONS, args)]
+                if index and len(around) == 2 and around[1] - around[0] < 1e-6:
+                    self._renumber(period_id)
+                    around = [r[0] for r in self._db.execute(_SQL_POSITIONS, args)]
+                if index == 0:
+                    pos = around[0] - 1.0 if around else 0.0
+                elif len(around) == 2:
+                    pos = (around[0] + around[1]) / 2
+                else:
+                    pos = around[0] + 1.0 if around else 0.0
+            return self._db.execute(_SQL_ADD_ACTIVITY,
+                                    (period_id, pos, json.dumps(activity, ensure_ascii=False))).lastrowid
+
+    def _renumber(self, period_id):
+        ids = [r[0] for r in self._db.execute(
+            "SELECT id FROM activities WHERE period_id = ? ORDER BY position", (period_id,))]
+        self._db.executemany("UPDATE activities SET position = ? WHERE id = ?",
+                             [(float(i), a) for i, a in enumerate(ids)])
+
+    @_locked
+    def activity_id(self, name, day, period, index):
+        """Row id of the activity at index in a profile's day and period, or None."""
+        pid = self._profile_id(name)
+        row = pid is not None and self._db.execute(_SQL_DAY_ID, (pid, day)).fetchone()
+        row = row and self._db.execute(_SQL_PERIOD_ID, (row[0], period)).fetchone()
+        row = row and self._db.execute(_SQL_ACTIVITY_AT, (row[0], index)).fetchone()
+        return row[0] if row else None
+
+    @_locked
+    def update_activity(self, activity_id, activity):
+        self._db.execute(_SQL_UPDATE_ACTIVITY, (json.dumps(activity, ensure_ascii=False), activity_id))
+
+    @_locked
+    def delete_activity(self, activity_id):
+        self._db.execute(_SQL_DELETE_ACTIVITY, (activity_id,))
+
+
+def migrate_json_profiles(profiles_dir, store, current=None):
+    """Import per-profile JSON files into store once; returns the number imported.
+
+    current is the JSON backend's current profile, kept in its config store;
+    without it the ``.current`` file of earlier versions is read.
+    """
+    if store.get_meta("migrated_json"):
+        return 0
+    count = 0
+    with os.scandir(profiles_dir) as it:
+        names = sorted(e.name for e in it if e.name.endswith(".json"))
+    for fname in names:
+        try:
+            with open(os.path.join(profiles_dir, fname)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        store.save(fname[:-5], data if isinstance(data, dict) else {})
+        count += 1
+    if current is None:
+        try:
+            with open(os.path.join(profiles_dir, ".current")) as f:
+                current = f.read().strip()
+        except OSError:
+            pass
+    if current:
+        store.set_meta("current", current)
+    store.set_meta("migrated_json", "1")
+    return count
@@ -0,0 +1,242 @@
+"""Undo/redo of schedule edits as small command objects.
+
+A command records one edit (insert, delete, move or set) and replays it on a
+target with the JournaledStore edit API: ``insert(path, index, value)``,
+``delete(path, index)`` and ``set(path, value)``.  Windows pass an adapter
+that also updates their views.  Each stack is bounded by count and estimated
+bytes on its own, repeated moves or sets of the same item within ``merge_window``
+seconds become one step, and the stacks can be saved next to the schedule
+so undo survives a restart.
+"""
+import abc
+import copy
+import hashlib
+import json
+import sys
+import time
+from collections import deque
+
+from mittschema.persistence import write_atomic
+
+
+class Command(abc.ABC):
+    """One undoable edit."""
+    kind = ""
+    fields = ()
+
+    def __init__(self, *args):
+        # Values are copied in and out, so later edits to the live document
+        # cannot change what the history replays.
+        for name, value in zip(self.fields, args):
+            setattr(self, name, copy.deepcopy(value))
+        self.size = len(json.dumps(self.to_json(), ensure_ascii=False))
+
+    @abc.abstractmethod
+    def apply(self, target):
+        """Make the edit on target."""
+
+    @abc.abstractmethod
+    def revert(self, target):
+        """Undo the edit on target."""
+
+    def merge(self, other):
+        """Fold other, which directly followed this command, into it; True if done."""
+        return False
+
+    def to_json(self):
+        return {"kind": self.kind, **{name: getattr(self, name) for name in self.fields}}
+
+    @staticmethod
+    def from_json(d):
+        cls = COMMANDS[d["kind"]]
+        return cls(*(d.get(name) for name in cls.fields))
+
+
+class Insert(Command):
+    kind = "insert"
+    fields = ("path", "index", "value")
+
+    def apply(self, target):
+        target.insert(self.path, self.index, copy.deepcopy(self.value))
+
+    def revert(self, target):
+        target.delete(self.path, self.index)
+
+
+class Delete(Command):
+    kind = "delete"
+    fields = ("path", "index", "value")
+
+    def apply(self, target):
+        target.delete(self.path, self.index)
+
+    def revert(self, target):
+        target.insert(self.path, self.index, copy.deepcopy(self.value))
+
+
+class Move(Command):
+    """Move value from one list position to another; ``old`` is the value before, if it changed."""
+    kind = "move"
+    fields = ("src", "src_index", "dst", "dst_index", "value", "old")
+
+    def apply(self, target):
+        target.delete(self.src, self.src_index)
+        target.insert(self.dst, self.dst_index, copy.deepcopy(self.value))
+
+    def revert(self, target):
+        target.delete(self.dst, self.dst_index)
+        target.insert(self.src, self.src_index, copy.deepcopy(self.old if self.old is not None else self.value))
+
+    def merge(self, other):
+        if not isinstance(other, Move) or (other.src, other.src_index) != (self.dst, self.dst_index):
+            return False
+        if self.old is None and other.value != self.value:
+            self.old = self.value
+        self.dst, self.dst_index, self.value = other.dst, other.dst_index, other.value
+        return True
+
+
+class Set(Command):
+    kind = "set"
+    fields = ("path", "value", "old")
+
+    def apply(self, target):
+        target.set(self.path, self.value)
+
+    def revert(self, target):
+        target.set(self.path, self.old)
+
+    def merge(self, other):
+        if not isinstance(other, Set) or other.path != self.path:
+            return False
+        self.value = other.value
+        return True
+
+
+COMMANDS = {cls.kind: cls for cls in (Insert, Delete, Move, Set)}
+
+
+def _digest(document):
+    raw = json.dumps(document, ensure_ascii=False, sort_keys=True).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class UndoRedoManager:
+    """Undo and redo stacks of commands."""
+
+    def __init__(self, max_size=100, max_bytes=256 * 1024, merge_window=1.0, path=None):
+        self._undo_stack = deque()
+        self._redo_stack = deque()
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._merge_window = merge_window
+        self._undo_bytes = 0
+        self._redo_bytes = 0
+        self._last_push = 0.0
+        self.path = path
+        self.on_changed = None
+
+    def do(self, command, target):
+        """Apply command to target and record it."""
+        command.apply(target)
+        self.push(command)
+        return command
+
+    def push(self, command):
+        """Record a command that has already been applied."""
+        now = time.monotonic()
+        self._redo_stack.clear()
+        self._redo_bytes = 0
+        last = self._undo_stack[-1] if self._undo_stack else None
+        if last is not None and now - self._last_push < self._merge_window and last.merge(command):
+            self._undo_bytes -= last.size
+            last.size = len(json.dumps(last.to_json(), ensure_ascii=False))
+            self._undo_bytes += last.size
+        else:
+            self._undo_stack.append(command)
+            self._undo_bytes += command.size
+        self._last_push = now
+        self._undo_bytes = self._trim(self._undo_stack, self._undo_bytes)
+        self._changed()
+
+    def _trim(self, stack, nbytes):
+        """Drop the oldest end of stack until it fits; returns its new byte count."""
+        while stack and (len(stack) > self._max_size or nbytes > self._max_bytes):
+            nbytes -= stack.popleft().size
+        return nbytes
+
+    def undo(self, target):
+        """Revert the last command on target; returns it, or None if there is none."""
+        if not self._undo_stack:
+            return None
+        command = self._undo_stack.pop()
+        command.revert(target)
+        self._undo_bytes -= command.size
+        self._redo_stack.append(command)
+        self._redo_bytes += command.size
+        self._last_push = 0.0
+        self._changed()
+        return command
+
+    def redo(self, target):
+        """Re-apply the last undone command; returns it, or None if there is none."""
+        if not self._redo_stack:
+            return None
+        command = self._redo_stack.pop()
+        command.apply(target)
+        self._redo_bytes -= command.size
+        self._undo_stack.append(command)
+        self._undo_bytes += command.size
+        self._last_push = 0.0
+        self._changed()
+        return command
+
+    def can_undo(self):
+        return bool(self._undo_stack)
+
+    def can_redo(self):
+        return bool(self._redo_stack)
+
+    def clear(self):
+        self._undo_stack.clear()
+        self._redo_stack.clear()
+        self._undo_bytes = self._redo_bytes = 0
+        self._changed()
+
+    def _changed(self):
+        if self.on_changed:
+            self.on_changed()
+
+    # ── Persistence ──────────────────────────────────────────
+
+    def save(self, document):
+        """Write the stacks to path, tagged with a digest of document as it is now."""
+        if not self.path:
+            return
+        state = {"digest": _digest(document),
+                 "undo": [c.to_json() for c in self._undo_stack],
+                 "redo": [c.to_json() for c in self._redo_stack]}
+        try:
+            write_atomic(self.path, json.dumps(state, ensure_ascii=False).encode())
+        except OSError as e:
+            print(f"{self.path}: {e}", file=sys.stderr)
+
+    def load(self, document):
+        """Restore saved stacks if they were saved against this exact document."""
+        if not self.path:
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                state = json.loads(f.read())
+            if state.get("digest") != _digest(document):
+                return False
+            undo = [Command.from_json(c) for c in state.get("undo", [])]
+            redo = [Command.from_json(c) for c in state.get("redo", [])]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        self._undo_stack = deque(undo)
+        self._redo_stack = deque(redo)
+        self._undo_bytes = self._trim(self._undo_stack, sum(c.size for c in undo))
+        self._redo_bytes = self._trim(self._redo_stack, sum(c.size for c in redo))
+        self._changed()
+        return True
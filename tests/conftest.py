@@ -0,0 +1,31 @@
+"""Tests import the Pro package; ``src_import`` loads a module of the src tree instead.
+
+Both packages are named mittschema, so the src one is imported with the Pro
+modules taken out of sys.modules, and they are put back afterwards.
+"""
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _ours(name):
+    return name == "mittschema" or name.startswith("mittschema.")
+
+
+@pytest.fixture
+def src_import():
+    saved = {name: sys.modules.pop(name) for name in list(sys.modules) if _ours(name)}
+    sys.path.insert(0, str(ROOT / "src"))
+    importlib.invalidate_caches()
+    try:
+        yield importlib.import_module
+    finally:
+        sys.path.remove(str(ROOT / "src"))
+        for name in [name for name in sys.modules if _ours(name)]:
+            del sys.modules[name]
+        sys.modules.update(saved)
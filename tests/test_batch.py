@@ -0,0 +1,39 @@
+"""Export all profiles (src tree): the zip, its timing report and PDF without pycairo."""
+import zipfile
+
+import pytest
+
+
+@pytest.fixture
+def src(tmp_path, monkeypatch, src_import):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    yield src_import
+    src_import("mittschema.config").get_config("test").close()
+
+
+def test_export_all_profiles(src, tmp_path):
+    pm = src("mittschema.profiles").ProfileManager("test", prefetch=False)
+    for name in ("default", "anna"):
+        pm.switch(name)
+        pm.save_data({"0": {"0": [{"name": f"School {name}"}]}})
+    batch = src("mittschema.batch")
+    out = tmp_path / "profiles.zip"
+    report = batch.export_all_profiles("test", str(out), formats=("csv", "json"), day_names=["Monday"], workers=1)
+    assert sorted(r["profile"] for r in report) == ["anna", "default"]
+    with zipfile.ZipFile(out) as zf:
+        assert sorted(zf.namelist()) == ["anna/schedule.csv", "anna/schedule.json", "default/schedule.csv",
+                                         "default/schedule.json", "timings.csv"]
+        assert "School anna" in zf.read("anna/schedule.csv").decode()
+    name, secs = batch.slowest(report)
+    assert name in ("anna", "default") and secs >= 0
+
+
+def test_pdf_is_never_plain_text(src, tmp_path):
+    export = src("mittschema.export")
+    with pytest.raises(ValueError):
+        export.export_pdf([], str(tmp_path / "out.pdf"), compress=True)
+    if not export.pdf_available():
+        with pytest.raises(RuntimeError):
+            export.export_pdf([], str(tmp_path / "out.pdf"))
+        assert not (tmp_path / "out.pdf").exists()
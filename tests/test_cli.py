@@ -0,0 +1,55 @@
+"""Round trips through the command line: export, then validate and import the file."""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCHEDULE = {
+    "Monday": [{"time": "08:00", "name": "School"}, {"time": "17:30", "name": "Dinner"}],
+    "Wednesday": [{"time": "15:00", "name": "Swimming", "image": "/pictures/pool.png"}],
+}
+
+
+def _cli(tmp_path, *args):
+    env = dict(os.environ, PYTHONPATH=str(ROOT), HOME=str(tmp_path), XDG_CONFIG_HOME=str(tmp_path / "config"),
+               XDG_CACHE_HOME=str(tmp_path / "cache"))
+    return subprocess.run([sys.executable, "-m", "mittschema", *args], env=env, capture_output=True, text=True)
+
+
+def _days(schedule):
+    return {day: [(a.get("time", ""), a.get("name", ""), a.get("image", "")) for a in acts]
+            for day, acts in schedule.items() if acts}
+
+
+@pytest.mark.parametrize("fmt", ["csv", "json", "ndjson"])
+def test_export_round_trip(tmp_path, fmt):
+    source = tmp_path / "schedule.json"
+    source.write_text(json.dumps(SCHEDULE))
+    out = tmp_path / f"export.{fmt}"
+    r = _cli(tmp_path, "--schedule", str(source), "export", "-f", fmt, "-o", str(out))
+    assert r.returncode == 0, r.stderr
+
+    r = _cli(tmp_path, "validate", str(out))
+    assert r.returncode == 0, r.stdout + r.stderr
+
+    target = tmp_path / "imported.json"
+    r = _cli(tmp_path, "--schedule", str(target), "import", "--replace", str(out))
+    assert r.returncode == 0, r.stderr
+    assert _days(json.loads(target.read_text())) == _days(SCHEDULE)
+
+
+@pytest.mark.parametrize("command", ["validate", "stats"])
+def test_corrupt_schedule_left_alone(tmp_path, command):
+    source = tmp_path / "schedule.json"
+    text = json.dumps(SCHEDULE)[:40]
+    source.write_text(text)
+    r = _cli(tmp_path, "--schedule", str(source), command)
+    assert r.returncode == 1
+    assert str(source) in r.stderr
+    assert source.read_text() == text
+    assert not list(tmp_path.glob("schedule.json.*"))
@@ -0,0 +1,14 @@
+"""Background exports report failures instead of success."""
+from mittschema import export
+from mittschema.tasks import TaskQueue
+
+
+def test_pdf_without_cairo_is_an_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORTS", TaskQueue(lambda fn, *args: fn(*args)))
+    monkeypatch.setattr(export, "export_data_pdf", lambda items, title, path: False)
+    messages = []
+    task = export.run_export([{"day": "Monday", "time": "08:00", "activity": "School"}],
+                             str(tmp_path / "week.pdf"), "pdf", status_callback=messages.append)
+    task.future.result()
+    assert messages[-1] == "Export error: PDF export needs pycairo"
+    assert not (tmp_path / "week.pdf").exists()
@@ -0,0 +1,84 @@
+"""Timetable sync: UID/SEQUENCE diffing and replaying the changes on a store."""
+from datetime import date
+
+from mittschema import ics
+from mittschema.persistence import JournaledStore
+from mittschema.schedule import WEEKDAYS
+
+MONDAY = date(2026, 10, 12)
+
+
+def _event(uid, start, summary, seq=0, extra=""):
+    return (f"BEGIN:VEVENT\r\nUID:{uid}\r\nSEQUENCE:{seq}\r\nDTSTAMP:20261001T000000Z\r\n"
+            f"DTSTART:{start}\r\nSUMMARY:{summary}\r\n{extra}END:VEVENT\r\n")
+
+
+def _feed(path, *events):
+    path.write_text("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" + "".join(events) + "END:VCALENDAR\r\n", newline="")
+
+
+def _names(schedule):
+    return {day: [(a["time"], a["name"]) for a in acts] for day, acts in schedule.items() if acts}
+
+
+def test_first_sync_imports_the_week(tmp_path):
+    feed = tmp_path / "school.ics"
+    _feed(feed, _event("math", "20261012T091500", "Math"),
+          _event("art", "20261014T130000", "Art\\, clay", extra="LOCATION:Room 2\r\n"),
+          _event("old", "20261005T090000", "Last week"),
+          _event("gone", "20261013T090000", "Trip", extra="STATUS:CANCELLED\r\n"))
+    changes, state = ics.sync(str(feed), {}, MONDAY)
+    assert sorted((c.key, c.day, c.minutes) for c in changes) == [("art", 2, 780), ("math", 0, 555)]
+    art = next(c for c in changes if c.key == "art").activity
+    assert art["name"] == "Art, clay" and art["location"] == "Room 2"
+    assert set(state["events"]) == {"math", "art"}
+
+
+def test_resync_returns_only_differences(tmp_path):
+    feed = tmp_path / "school.ics"
+    _feed(feed, _event("math", "20261012T091500", "Math"), _event("art", "20261014T130000", "Art"))
+    _, state = ics.sync(str(feed), {}, MONDAY)
+    assert ics.sync(str(feed), state, MONDAY)[0] is None
+
+    _feed(feed, _event("math", "20261012T101500", "Math", seq=1),
+          _event("math", "20261012T081500", "Math (stale copy)", seq=0),
+          _event("pe", "20261015T080000", "PE"))
+    changes, state = ics.sync(str(feed), state, MONDAY)
+    assert sorted((c.key, c.minutes, c.activity is None) for c in changes) == [
+        ("art", None, True), ("math", 615, False), ("pe", 480, False)]
+    assert state["events"]["math"][0] == 1
+
+
+def test_unchanged_content_is_not_parsed(tmp_path):
+    feed = tmp_path / "school.ics"
+    _feed(feed, _event("math", "20261012T091500", "Math"))
+    _, state = ics.sync(str(feed), {}, MONDAY)
+    _feed(feed, _event("math", "20261012T091500", "Math"))  # rewritten: new mtime, same bytes
+    state["stamp"] = None
+    changes, state = ics.sync(str(feed), state, MONDAY)
+    assert changes is None and state["stamp"] is not None
+
+
+def test_apply_changes_keeps_time_order(tmp_path):
+    store = JournaledStore(str(tmp_path / "week.json"), lambda: {day: [] for day in WEEKDAYS})
+    store.insert(["Monday"], 0, {"time": "08:00", "name": "Breakfast"})
+    store.insert(["Monday"], 1, {"time": "12:00", "name": "Lunch"})
+    feed = tmp_path / "school.ics"
+    _feed(feed, _event("math", "20261012T091500", "Math"), _event("art", "20261014T130000", "Art"))
+    changes, state = ics.sync(str(feed), {}, MONDAY)
+    assert ics.apply_changes(changes, store.data, store, ics.flat_slot(WEEKDAYS)) == 2
+    assert _names(store.data) == {"Monday": [("08:00", "Breakfast"), ("09:15", "Math"), ("12:00", "Lunch")],
+                                  "Wednesday": [("13:00", "Art")]}
+
+    _feed(feed, _event("math", "20261012T140000", "Math", seq=1))
+    changes, _ = ics.sync(str(feed), state, MONDAY)
+    assert ics.apply_changes(changes, store.data, store, ics.flat_slot(WEEKDAYS)) == 3
+    assert _names(store.data) == {"Monday": [("08:00", "Breakfast"), ("12:00", "Lunch"), ("14:00", "Math")]}
+    store.close()
+
+
+def test_period_slot():
+    slot = ics.period_slot([480, 600, 720])
+    schedule = {"0": {"1": [{"name": "Snack"}]}}
+    assert slot(schedule, ics.Change("k", 0, 615, {})) == (["0", "1"], 1)
+    assert slot(schedule, ics.Change("k", 0, None, {})) == (["0", "0"], 0)
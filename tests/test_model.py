@@ -0,0 +1,62 @@
+"""Time parsing and keeping days in order: insert, retime and loading older files."""
+import pytest
+
+from mittschema.model import Activity, Day, Week, parse_time
+
+
+@pytest.mark.parametrize("text, minutes", [("8:30", 510), ("08.30", 510), ("8", 480), (" 17:05 ", 1025),
+                                           ("24:00", None), ("8:60", None), ("soon", None), ("", None), (None, None)])
+def test_parse_time(text, minutes):
+    assert parse_time(text) == minutes
+
+
+def _names(day):
+    return [a.name for a in day]
+
+
+def test_insert_keeps_time_order_and_ties_in_insertion_order():
+    day = Day("Monday")
+    for name, time in [("Lunch", "12:00"), ("Free play", None), ("School", "8:00"), ("Snack", "12:00"),
+                       ("Story", "")]:
+        day.insert(Activity(name, time))
+    assert _names(day) == ["School", "Lunch", "Snack", "Free play", "Story"]
+    assert day.is_ordered()
+
+
+def test_insert_at_index_replays_an_edit():
+    day = Day("Monday")
+    day.insert(Activity("School", "8:00"))
+    assert day.insert(Activity("Late", "9:00"), 0) == 0
+    assert not day.is_ordered()
+
+
+def test_retime_moves_into_place():
+    day = Day("Monday")
+    for name, time in [("School", "8:00"), ("Lunch", "12:00"), ("Dinner", "17:30")]:
+        day.insert(Activity(name, time))
+    assert day.retime(0, "13:00") == 1
+    assert _names(day) == ["Lunch", "School", "Dinner"] and day[1].minutes == 780
+    assert day.retime(2, "later") == 2 and day[2].minutes is None
+
+
+def test_from_json_sorts_older_files_stably():
+    week = Week.from_json({"Monday": [{"time": "12:00", "name": "Lunch"}, {"name": "Walk"},
+                                      {"time": "08:00", "name": "School"}, {"time": "12:00", "name": "Snack"}]})
+    assert _names(week["Monday"]) == ["School", "Lunch", "Snack", "Walk"]
+    assert week.to_json()["Monday"][0] == {"time": "08:00", "name": "School"}
+
+
+def test_periods_layout_round_trip():
+    data = {"0": {"0": [{"name": "Circle", "emoji": "⭕"}], "1": [{"name": "Lunch", "seen": True}]},
+            "1": {"0": [], "1": [{"name": "Gym"}]}}
+    week = Week.from_json(data)
+    assert week.layout == "periods" and week.to_json() == data
+
+
+def test_periods_layout_new_day_and_default_period():
+    week = Week.from_json({"0": {"0": [], "1": [{"name": "Lunch"}]}})
+    day = week.day("4")
+    assert day.periods == ["0", "1"]
+    day.insert(Activity("Music"))
+    day.insert(Activity("Art", period=1))
+    assert week.to_json()["4"] == {"0": [{"name": "Music"}], "1": [{"name": "Art"}]}
@@ -0,0 +1,59 @@
+"""Week-grid PDF layout: row order and pagination, drawn on a recording context."""
+from types import SimpleNamespace
+
+from mittschema import pdf_layout
+
+
+def test_rows_sorted_by_model_time():
+    items = [{"day": "Monday", "time": t, "activity": t or "none"} for t in ["9:00", "", "8.30", "8", "later"]]
+    days, rows = pdf_layout.build_grid(items)
+    assert days == ["Monday"]
+    assert [label for label, _ in rows] == ["8", "8.30", "9:00", "", "later"]
+
+
+class _Recorder:
+    """Enough of a cairo context for _ToyText; records where text is drawn."""
+
+    def __init__(self):
+        self.pages = [[]]
+        self.y = 0
+
+    def text_extents(self, text):
+        return SimpleNamespace(x_advance=5 * len(text))
+
+    def move_to(self, x, y):
+        self.y = y
+
+    def show_text(self, text):
+        self.pages[-1].append((self.y, text))
+
+    def __getattr__(self, name):
+        return lambda *args: None
+
+
+def _fake_cairo(recorder):
+    def show_page():
+        recorder.pages.append([])
+    surface = SimpleNamespace(show_page=show_page, finish=lambda: None)
+    return SimpleNamespace(PDFSurface=lambda *args: surface, Context=lambda surface: recorder)
+
+
+def test_long_row_continues_on_the_next_page(tmp_path):
+    items = [{"day": "Monday", "time": "", "activity": f"Activity {i}"} for i in range(120)]
+    items.append({"day": "Tuesday", "time": "08:00", "activity": "School"})
+    recorder = _Recorder()
+    pages = pdf_layout.render_week_pdf(_fake_cairo(recorder), items, "Week", str(tmp_path / "w.pdf"))
+    assert pages == len(recorder.pages) - 1 > 1
+    drawn = [text for page in recorder.pages for _, text in page]
+    assert [t for t in drawn if t.startswith("Activity")] == [f"Activity {i}" for i in range(120)]
+    bottom = pdf_layout.PAGE_H - pdf_layout.MARGIN - 12
+    for page in recorder.pages[:-1]:
+        assert all(y <= bottom for y, text in page if text.startswith("Activity"))
+
+
+def test_split_row_keeps_at_least_one():
+    by_day = {"Mon": list(range(10)), "Tue": [0]}
+    head, rest = pdf_layout._split_row(by_day, lambda part: len(next(iter(part.values()))) <= 4)
+    assert head == {"Mon": [0, 1, 2, 3], "Tue": [0]} and rest == {"Mon": [4, 5, 6, 7, 8, 9]}
+    head, rest = pdf_layout._split_row({"Mon": [0, 1]}, lambda part: False)
+    assert head == {"Mon": [0]} and rest == {"Mon": [1]}
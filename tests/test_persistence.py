@@ -0,0 +1,139 @@
+"""JournaledStore: journal replay, chained journals and damaged files."""
+import json
+import os
+import time
+
+import pytest
+
+from mittschema import persistence
+from mittschema.persistence import JournaledStore
+
+
+def _crash(store):
+    """Stop store as a killed process would: journal lines written, no snapshot."""
+    with store._lock:
+        store._write_lines()
+        store._closed = True
+        store._wake.notify()
+    if store._thread is not None:
+        store._thread.join()
+    if store._fd is not None:
+        os.close(store._fd)
+
+
+def _failing(*args):
+    raise OSError(28, "No space left on device")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "schedule.json")
+
+
+def _open(path):
+    return JournaledStore(path, lambda: {"days": []}, delay=60)
+
+
+def test_replay_after_crash(path):
+    store = _open(path)
+    store.set(["title"], "Week")
+    store.insert(["days"], 0, "Monday")
+    store.insert(["days"], 1, "Tuesday")
+    store.delete(["days"], 0)
+    _crash(store)
+    assert not os.path.exists(path)
+
+    store = _open(path)
+    assert store.data == {"days": ["Tuesday"], "title": "Week"}
+    store.close()
+    with open(path) as f:
+        assert json.load(f) == {"days": ["Tuesday"], "title": "Week"}
+    assert not os.path.exists(path + ".journal")
+
+
+def test_failed_snapshots_chain_journals(path, monkeypatch):
+    store = _open(path)
+    store.insert(["days"], 0, "Monday")
+    store.flush()
+    monkeypatch.setattr(persistence, "write_atomic", _failing)
+    store.insert(["days"], 1, "Tuesday")
+    assert not store.flush()
+    assert os.path.exists(path + ".journal.old")
+    store.insert(["days"], 2, "Wednesday")
+    assert not store.flush()  # the journal cannot be added to the chain either
+    assert os.path.exists(path + ".journal") and store._pending
+    _crash(store)
+    monkeypatch.undo()
+
+    store = _open(path)
+    assert store.data["days"] == ["Monday", "Tuesday", "Wednesday"]
+    store.close()
+    assert not os.path.exists(path + ".journal.old")
+
+
+def test_failed_flush_after_replay_keeps_journal(path, monkeypatch):
+    store = _open(path)
+    store.insert(["days"], 0, "Monday")
+    _crash(store)
+    monkeypatch.setattr(persistence, "write_atomic", _failing)
+    store = _open(path)
+    assert store.data["days"] == ["Monday"]
+    store.insert(["days"], 1, "Tuesday")
+    _crash(store)
+    monkeypatch.undo()
+
+    store = _open(path)
+    assert store.data["days"] == ["Monday", "Tuesday"]
+    store.close()
+
+
+def test_writer_survives_failed_snapshot(path, monkeypatch):
+    store = JournaledStore(path, dict, delay=0.01)
+    monkeypatch.setattr(persistence, "write_atomic", _failing)
+    store.set(["a"], 1)
+    time.sleep(0.1)
+    assert store._thread.is_alive() and store._pending
+    monkeypatch.undo()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    with open(path) as f:
+        assert json.load(f) == {"a": 1}
+    store.close()
+
+
+def test_torn_last_line(path):
+    store = _open(path)
+    store.insert(["days"], 0, "Monday")
+    store.insert(["days"], 1, "Tuesday")
+    _crash(store)
+    with open(path + ".journal", "rb+") as f:
+        f.truncate(os.path.getsize(path + ".journal") - 5)
+
+    store = _open(path)
+    assert store.data["days"] == ["Monday"]
+    store.close()
+
+
+def test_corrupt_snapshot_moved_aside(path, capsys):
+    with open(path, "w") as f:
+        f.write('{"days": ["Mon')
+    store = _open(path)
+    assert store.data == {"days": []}
+    assert "unreadable" in capsys.readouterr().err
+    with open(path + ".corrupt") as f:
+        assert f.read() == '{"days": ["Mon'
+    store.close()
+
+
+def test_journal_of_another_snapshot_ignored(path):
+    store = _open(path)
+    store.insert(["days"], 0, "Monday")
+    store.close()
+    with open(path + ".journal", "w") as f:
+        f.write(json.dumps({"base": "0" * 32}) + "\n")
+        f.write(json.dumps({"op": "insert", "path": ["days"], "index": 0, "value": "Sunday"}) + "\n")
+    store = _open(path)
+    assert store.data["days"] == ["Monday"]
+    assert not os.path.exists(path + ".journal")
+    store.close()
@@ -0,0 +1,62 @@
+"""ProfileManager (src tree) on both backends: index, cache copies, per-row edits."""
+import json
+
+import pytest
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def pm(request, tmp_path, monkeypatch, src_import):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    profiles = src_import("mittschema.profiles")
+    pm = profiles.ProfileManager("test", backend=request.param, prefetch=False)
+    yield pm
+    if pm._db:
+        pm._db.close()
+    src_import("mittschema.config").get_config("test").close()
+
+
+WEEK = {"0": {"0": [{"name": "School"}], "1": [{"name": "Lunch"}]}}
+
+
+def test_save_and_list(pm):
+    pm.switch("anna")
+    pm.save_data(WEEK)
+    assert pm.list_profiles() == ["default", "anna"]
+    assert pm.load_data("anna") == WEEK
+    assert pm.load_data("default") == {}
+
+
+def test_load_data_returns_a_copy(pm):
+    pm.save_data(WEEK)
+    pm.load_data()["0"]["0"].append({"name": "Stray"})
+    assert pm.load_data() == WEEK
+
+
+def test_read_before_a_write_is_not_cached(pm):
+    pm.save_data(WEEK)
+    stale = pm._read(pm.current)  # what a prefetch worker got just before the write
+    changed = {"0": {"0": [{"name": "Holiday"}]}}
+    pm.save_data(changed)
+    pm._remember(pm.current, *stale)
+    assert pm.load_data() == changed
+
+
+def test_row_edits(pm):
+    pm.save_data(WEEK)
+    pm.add_activity("0", "0", {"name": "Swim"})
+    pm.add_activity("0", "0", {"name": "Wake"}, index=0)
+    pm.update_activity("0", "1", 0, {"name": "Snack"})
+    pm.remove_activity("0", "0", 1)
+    data = pm.load_data()
+    assert [a["name"] for a in data["0"]["0"]] == ["Wake", "Swim"]
+    assert data["0"]["1"] == [{"name": "Snack"}]
+
+
+def test_new_file_appears_without_monitor(pm, tmp_path):
+    if pm._db:
+        pytest.skip("profiles live in the database")
+    pm.list_profiles()
+    (tmp_path / "config" / "test" / "profiles" / "bertil.json").write_text(json.dumps(WEEK))
+    assert "bertil" in pm.list_profiles()
+    assert pm.load_data("bertil") == WEEK
@@ -0,0 +1,96 @@
+"""Rule expansion, exceptions, COUNT and the RecurrenceSet week cache."""
+import random
+from datetime import date, timedelta
+
+from mittschema.recurrence import MAX_YEARS, RecurrenceSet, Rule, week_of
+
+MONDAY = date(2026, 10, 12)
+
+
+def _dates(rule, first, days):
+    return [first + timedelta(days=i) for i in range(days) if rule.occurs(first + timedelta(days=i))]
+
+
+def _walk_nth(rule, n):
+    """Reference for Rule._nth: try every day."""
+    day, end = rule.dtstart, rule.dtstart + timedelta(days=366 * MAX_YEARS)
+    while day <= end and (rule.until is None or day <= rule.until):
+        if rule._matches(day):
+            n -= 1
+            if n <= 0:
+                return day
+        day += timedelta(days=1)
+    return rule.until or end
+
+
+def test_weekly_byday_with_exceptions():
+    rule = Rule("r", {"name": "Swim", "time": "16:00"}, "FREQ=WEEKLY;BYDAY=MO,WE", MONDAY,
+                ["2026-10-14", "2026-10-19/2026-10-25"])
+    assert _dates(rule, MONDAY, 21) == [date(2026, 10, 12), date(2026, 10, 26), date(2026, 10, 28)]
+
+
+def test_count_includes_skipped_occurrences():
+    rule = Rule("r", {}, "FREQ=DAILY;COUNT=3", MONDAY, ["2026-10-13"])
+    assert rule.last == date(2026, 10, 14)
+    assert _dates(rule, MONDAY, 7) == [date(2026, 10, 12), date(2026, 10, 14)]
+
+
+def test_interval_and_until():
+    rule = Rule("r", {}, "FREQ=WEEKLY;INTERVAL=2;UNTIL=20261110", MONDAY)
+    assert _dates(rule, MONDAY, 60) == [date(2026, 10, 12), date(2026, 10, 26), date(2026, 11, 9)]
+
+
+def test_monthly_skips_short_months():
+    rule = Rule("r", {}, "FREQ=MONTHLY;BYMONTHDAY=31;COUNT=3", date(2026, 1, 31))
+    assert rule.last == date(2026, 5, 31)
+
+
+def _random_rule(rnd):
+    freq = rnd.choice(["DAILY", "WEEKLY", "MONTHLY", "YEARLY"])
+    parts = [f"FREQ={freq}", f"INTERVAL={rnd.randint(1, 4)}", f"COUNT={rnd.randint(1, 40)}"]
+    if freq in ("DAILY", "WEEKLY") and rnd.random() < 0.6:
+        parts.append("BYDAY=" + ",".join(rnd.sample(["MO", "TU", "WE", "TH", "FR", "SA", "SU"], rnd.randint(1, 3))))
+    if freq == "MONTHLY" and rnd.random() < 0.6:
+        parts.append("BYMONTHDAY=" + ",".join(str(d) for d in rnd.sample(range(1, 32), rnd.randint(1, 3))))
+    if rnd.random() < 0.3:
+        parts.append("UNTIL=" + (date(2026, 1, 1) + timedelta(days=rnd.randint(0, 900))).strftime("%Y%m%d"))
+    if freq == "YEARLY" and rnd.random() < 0.3:
+        start = date(2024, 2, 29)
+    else:
+        start = date(2026, 1, 1) + timedelta(days=rnd.randint(0, 400))
+    return Rule("r", {}, ";".join(parts), start)
+
+
+def test_count_end_matches_day_by_day():
+    rnd = random.Random(0)
+    for _ in range(300):
+        rule = _random_rule(rnd)
+        assert rule.last == _walk_nth(rule, rule.count), (rule.rrule, rule.dtstart)
+
+
+def test_week_is_cached_and_sorted():
+    rules = RecurrenceSet([Rule("b", {"time": "15:00"}, "FREQ=DAILY", MONDAY),
+                           Rule("a", {"time": "08:00"}, "FREQ=DAILY", MONDAY)])
+    week = rules.week(MONDAY)
+    assert [r.id for r in week[0]] == ["a", "b"]
+    assert rules.week(MONDAY) is week and rules.expanded == 1
+
+
+def test_week_lru_is_bounded():
+    rules = RecurrenceSet([Rule("a", {}, "FREQ=DAILY", MONDAY)], max_weeks=2)
+    for i in range(3):
+        rules.week(MONDAY + timedelta(weeks=i))
+    rules.week(MONDAY)
+    assert rules.expanded == 4
+
+
+def test_skip_drops_only_that_week():
+    rules = RecurrenceSet([Rule("a", {}, "FREQ=WEEKLY", MONDAY)])
+    this, later = rules.week(MONDAY), rules.week(MONDAY + timedelta(weeks=1))
+    rules.skip("a", MONDAY)
+    assert rules.week(MONDAY) is not this and rules.week(MONDAY)[0] == []
+    assert rules.week(MONDAY + timedelta(weeks=1)) is later
+
+
+def test_week_of():
+    assert week_of(date(2026, 10, 18)) == MONDAY
@@ -0,0 +1,15 @@
+"""Both packages carry their own copy of these modules; the copies must not drift apart."""
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SHARED = ["persistence", "tasks", "timeline", "undo_redo", "images", "trace"]
+
+
+@pytest.mark.parametrize("module", SHARED)
+def test_copies_identical(module):
+    pro = ROOT / "mittschema" / f"{module}.py"
+    src = ROOT / "src" / "mittschema" / f"{module}.py"
+    assert pro.read_bytes() == src.read_bytes(), f"{pro} and {src} differ; change both"
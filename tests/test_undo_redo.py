@@ -0,0 +1,50 @@
+"""UndoRedoManager: history bounds and saved stacks."""
+from mittschema.undo_redo import Set, UndoRedoManager
+
+
+class _Doc(dict):
+    def set(self, path, value):
+        self[path[0]] = value
+
+
+def _edits(history, doc, n):
+    for i in range(n):
+        history.do(Set([f"k{i}"], "x" * 100, None), doc)
+
+
+def test_undo_bytes_bounded():
+    doc = _Doc()
+    history = UndoRedoManager(max_bytes=1000, merge_window=0)
+    _edits(history, doc, 20)
+    assert 0 < len(history._undo_stack) < 20
+    assert sum(c.size for c in history._undo_stack) <= 1000
+
+
+def test_large_redo_keeps_undo(tmp_path):
+    doc = _Doc()
+    path = str(tmp_path / "history.json")
+    history = UndoRedoManager(max_bytes=1000, merge_window=0, path=path)
+    _edits(history, doc, 2)
+    history.undo(doc)
+    # A redo stack bigger than the cap, saved by an older build.
+    history._redo_stack.extend(Set([f"r{i}"], "y" * 100, None) for i in range(20))
+    history.save(doc)
+
+    restored = UndoRedoManager(max_bytes=1000, merge_window=0, path=path)
+    assert restored.load(doc)
+    assert restored.can_undo()
+    assert sum(c.size for c in restored._redo_stack) <= 1000
+    assert restored.undo(doc).path == ["k0"]
+
+
+def test_undo_redo_move_bytes():
+    doc = _Doc()
+    history = UndoRedoManager(max_bytes=1000, merge_window=0)
+    _edits(history, doc, 5)
+    before = history._undo_bytes
+    for _ in range(5):
+        history.undo(doc)
+    assert (history._undo_bytes, history._redo_bytes) == (0, before)
+    for _ in range(5):
+        history.redo(doc)
+    assert (history._undo_bytes, history._redo_bytes) == (before, 0)